@@ -1,7 +1,16 @@
 from logic_puzzles.puzzle import Puzzle, PuzzleState
+from logic_puzzles.validation import is_complete
 
 
 class AquariumPuzzleState(PuzzleState):
+    __slots__ = (
+        "rows_missing",
+        "cols_missing",
+        "rows_available",
+        "cols_available",
+        "water",
+    )
+
     water: list[list[int]]
     rows_missing: list[int]
     cols_missing: list[int]
@@ -81,6 +90,9 @@ class AquariumPuzzle(Puzzle):
 
         return cls(grid, rows, cols)
 
+    def encode_solution(self, state):
+        return state.water
+
     def __str__(self):
         def stringify_entry(entry):
             return "." if entry is None else str(entry)
@@ -104,6 +116,29 @@ class AquariumPuzzle(Puzzle):
 
         return "\n".join(res)
 
+    def validate(self, state):
+        water = state.water
+        if not is_complete(water, {0, 1}):
+            return False
+        if any(
+            target is not None and sum(water[r]) != target
+            for r, target in enumerate(self.rows)
+        ) or any(
+            target is not None and sum(row[c] for row in water) != target
+            for c, target in enumerate(self.cols)
+        ):
+            return False
+
+        # each aquarium is filled up to a level, all of the cells below it
+        # hold water and all of the ones above it are empty
+        for shape in self.shapes:
+            empty = [r for r, c in shape.cells if water[r][c] == 0]
+            full = [r for r, c in shape.cells if water[r][c] == 1]
+            if empty and full and max(empty) >= min(full):
+                return False
+
+        return True
+
     def _can_set_value(self, missing, available, count, value):
         if missing is None:
             return True
@@ -5,6 +5,16 @@ from logic_puzzles.grid_utils import (
     ARROWS,
     GridUtils,
 )
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    matches_givens,
+    get_components,
+    encode_grids,
+    batch_is_complete,
+    batch_matches_givens,
+)
+from functools import cached_property
 
 # Indicates the available directions to expand a boat
 BOAT_SHAPES = {
@@ -15,6 +25,16 @@ BOAT_SHAPES.update(((arrow, [(-dr, -dc)]) for arrow, (dr, dc) in ARROWS.items())
 
 
 class BattleshipsPuzzleState(PuzzleState):
+    __slots__ = (
+        "grid",
+        "row_cells_by_value",
+        "col_cells_by_value",
+        "found_boats",
+        "complete_boats",
+        "boat_locations",
+        "boat_available_locations_count",
+    )
+
     grid: list[list[int | None]]
     row_cells_by_value: list[int]
     col_cells_by_value: list[int]
@@ -155,6 +175,109 @@ class BattleshipsPuzzle(Puzzle):
     def max_boat_size(self):
         return len(self.boats) - 1
 
+    @cached_property
+    def givens_grid(self):
+        """The cells that are known from the shapes in the initial grid, None
+        for the unknown ones"""
+        res = [[None] * self.grid_utils.cols for _ in range(self.grid_utils.rows)]
+        for r, c in self.grid_utils.iter_grid():
+            cell_type = self.initial_grid[r][c]
+            if cell_type == ".":
+                continue
+            if cell_type == "x":
+                res[r][c] = 0
+                continue
+
+            res[r][c] = 1
+            if len(BOAT_SHAPES[cell_type]) == 1:
+                dr, dc = BOAT_SHAPES[cell_type][0]
+                res[r + dr][c + dc] = 1
+
+            invalid_directions = set(ALL_DIRECTIONS) - set(BOAT_SHAPES[cell_type])
+            for new_r, new_c in self.grid_utils.directions_iter(
+                r, c, invalid_directions, 1
+            ):
+                res[new_r][new_c] = 0
+
+        return res
+
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, {0, 1}):
+            return False
+        if not matches_givens(grid, self.givens_grid):
+            return False
+        if any(sum(row) != target for row, target in zip(grid, self.row_counts)):
+            return False
+        if any(sum(col) != target for col, target in zip(zip(*grid), self.col_counts)):
+            return False
+
+        # boats do not touch diagonally, which also keeps them straight
+        if any(
+            grid[new_r][new_c] == 1
+            for r, c in self.grid_utils.iter_grid()
+            if grid[r][c] == 1
+            for new_r, new_c in self.grid_utils.diagonal_iter(r, c, 1)
+        ):
+            return False
+
+        return self._check_boats(grid)
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], (0, 1))
+        given_codes = encode_grids([self.givens_grid], (0, 1))[0]
+        boats = codes == 1
+        padded = np.pad(boats, ((0, 0), (1, 1), (1, 1)))
+        diagonal = (
+            padded[:, :-2, :-2]
+            | padded[:, :-2, 2:]
+            | padded[:, 2:, :-2]
+            | padded[:, 2:, 2:]
+        )
+        res = (
+            batch_is_complete(codes)
+            & batch_matches_givens(codes, given_codes)
+            & (boats.sum(axis=2) == self.row_counts).all(axis=1)
+            & (boats.sum(axis=1) == self.col_counts).all(axis=1)
+            & ~(boats & diagonal).any(axis=(1, 2))
+        )
+
+        # the boats themselves are checked on the remaining states
+        return [
+            bool(valid) and self._check_boats(state.grid)
+            for valid, state in zip(res, states)
+        ]
+
+    def _check_boats(self, grid):
+        """Whether there are as many boats of each size as required and the
+        middle pieces (+) are between two others"""
+        for r, c in self.grid_utils.iter_grid():
+            if self.initial_grid[r][c] != "+":
+                continue
+
+            if not any(
+                all(
+                    self.grid_utils.in_range(new_r, new_c) and grid[new_r][new_c] == 1
+                    for new_r, new_c in ((r - dr, c - dc), (r + dr, c + dc))
+                )
+                for dr, dc in ((0, 1), (1, 0))
+            ):
+                return False
+
+        found_boats = [0] * len(self.boats)
+        for boat in get_components(
+            (r, c) for r, c in self.grid_utils.iter_grid() if grid[r][c] == 1
+        ):
+            if len(boat) > self.max_boat_size:
+                return False
+            found_boats[len(boat)] += 1
+
+        return found_boats == self.boats
+
     def iter_values(self):
         yield from (0, 1)
 
@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+import argparse
+import traceback
+import tracemalloc
+from io import StringIO
+from contextlib import nullcontext
+from main import PUZZLES, print_solutions, parse_rules
+from logic_puzzles.solver import SolverTimeoutException, SimpleBranchingSolver
+from logic_puzzles.sudoku_like import SudokuLike
+from logic_puzzles.value_order import VALUE_ORDERS
+from logic_puzzles.profiling import Profiler
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def iter_samples(puzzle_type):
+    """Yields the name, input path and expected output path of each sample"""
+    samples_dir = os.path.join(ROOT_DIR, puzzle_type, "samples")
+    if not os.path.isdir(samples_dir):
+        return
+
+    names = [
+        x[len("input") : -len(".txt")]
+        for x in os.listdir(samples_dir)
+        if x.startswith("input") and x.endswith(".txt")
+    ]
+    for name in sorted(names, key=int):
+        yield (
+            f"sample{name}",
+            os.path.join(samples_dir, f"input{name}.txt"),
+            os.path.join(samples_dir, f"output{name}.txt"),
+        )
+
+
+def make_solver(solver_cls, puzzle, args):
+    kwargs = {}
+    if args.value_order is not None and issubclass(solver_cls, SimpleBranchingSolver):
+        kwargs["value_order"] = args.value_order
+    if (
+        args.exact_cover
+        and issubclass(solver_cls, SudokuLike)
+        and solver_cls.supports_exact_cover
+    ):
+        kwargs["exact_cover"] = True
+    if args.deduction_rules and issubclass(solver_cls, SudokuLike):
+        kwargs["deduction_rules"] = args.deduction_rules
+
+    return solver_cls(
+        puzzle,
+        timeout_seconds=args.timeout,
+        target_solutions=args.target_solutions,
+        **kwargs,
+    )
+
+
+def run_sample(puzzle_type, input_path, output_path, args):
+    """Solves a sample, returns the time taken, the number of solutions and
+    whether they are valid and match the expected output"""
+    puzzle_cls, solver_cls = PUZZLES[puzzle_type]
+    with open(input_path) as file:
+        string = "\n".join(file)
+
+    start_time = time.perf_counter()
+    puzzle = puzzle_cls.from_string(string)
+    solutions = make_solver(solver_cls, puzzle, args).solve()
+    elapsed = time.perf_counter() - start_time
+
+    if not all(puzzle.validate_batch(solutions)):
+        return elapsed, len(solutions), "invalid"
+    if not os.path.exists(output_path):
+        return elapsed, len(solutions), "unchecked"
+
+    output = StringIO()
+    print_solutions(puzzle, solutions, output)
+    with open(output_path) as file:
+        status = "ok" if output.getvalue() == file.read() else "wrong"
+
+    return elapsed, len(solutions), status
+
+
+def measure_peak_memory(puzzle_type, input_path, args):
+    """Peak memory allocated while parsing and solving a sample, in bytes,
+    None if the solver timed out"""
+    puzzle_cls, solver_cls = PUZZLES[puzzle_type]
+    with open(input_path) as file:
+        string = "\n".join(file)
+
+    tracemalloc.start()
+    try:
+        puzzle = puzzle_cls.from_string(string)
+        make_solver(solver_cls, puzzle, args).solve()
+        _, peak = tracemalloc.get_traced_memory()
+    except SolverTimeoutException:
+        peak = None
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def benchmark_puzzle(puzzle_type, args):
+    total_time = 0.0
+    for name, input_path, output_path in iter_samples(puzzle_type):
+        best_time, solutions, status = None, "-", None
+        for _ in range(args.repeat):
+            try:
+                elapsed, solutions, status = run_sample(
+                    puzzle_type, input_path, output_path, args
+                )
+            except SolverTimeoutException:
+                status = "timeout"
+                break
+            except Exception as e:
+                if args.debug:
+                    raise
+                # keep going with the other samples, without hiding the bug
+                traceback.print_exc()
+                status = f"error ({type(e).__name__})"
+                break
+
+            best_time = elapsed if best_time is None else min(best_time, elapsed)
+
+        peak = "-"
+        if args.memory and best_time is not None:
+            # measured on a separate run, tracemalloc slows down the solvers
+            peak = measure_peak_memory(puzzle_type, input_path, args)
+            peak = f"{peak / 1024:.1f}" if peak is not None else "timeout"
+
+        total_time += best_time or 0.0
+        elapsed = f"{best_time:8.3f}s" if best_time is not None else f"{'-':>9}"
+        print(
+            f"{puzzle_type:<14} {name:<10} {elapsed} {solutions:>9} {peak:>10} {status}"
+        )
+
+    return total_time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Times the solvers on their samples and checks the solutions"
+    )
+    parser.add_argument(
+        "puzzles", nargs="*", help="Puzzle types, all of them if none is given"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Runs per sample, the best is kept"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="Timeout in seconds per sample"
+    )
+    parser.add_argument(
+        "--target_solutions",
+        type=int,
+        default=None,
+        help="Stop each solve after this many solutions, e.g. 1 for latency",
+    )
+    parser.add_argument(
+        "--value_order",
+        choices=VALUE_ORDERS.keys(),
+        default=None,
+        help="Order the values of each branch, for the solvers supporting it",
+    )
+    parser.add_argument(
+        "--exact_cover",
+        action="store_true",
+        help="Use dancing links for the solvers supporting it",
+    )
+    parser.add_argument(
+        "--deduction_rules",
+        type=parse_rules,
+        default=(),
+        metavar="RULES",
+        help="Comma separated candidate elimination rules, or all, for the "
+        "solvers supporting them",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Also report the peak memory of each solve, traced with tracemalloc",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Stop at the first sample raising an exception instead of "
+        "reporting it and moving on",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="DIR",
+        help="Profile each puzzle type, writing DIR/<puzzle>.pstats and .collapsed",
+    )
+    args = parser.parse_args()
+
+    for puzzle_type in args.puzzles:
+        if puzzle_type not in PUZZLES:
+            parser.error(f"unknown puzzle type {puzzle_type}")
+
+    return args
+
+
+def main():
+    args = parse_args()
+    if args.profile is not None:
+        os.makedirs(args.profile, exist_ok=True)
+
+    print(
+        f"{'puzzle':<14} {'sample':<10} {'time':>9} {'solutions':>9} "
+        f"{'peak KiB':>10} status"
+    )
+    total_time = 0.0
+    for puzzle_type in args.puzzles or PUZZLES.keys():
+        profiler = None
+        if args.profile is not None:
+            profiler = Profiler(os.path.join(args.profile, puzzle_type))
+
+        with profiler or nullcontext():
+            total_time += benchmark_puzzle(puzzle_type, args)
+
+        if profiler is not None:
+            profiler.print_summary(file=sys.stdout)
+
+    print(f"Total time: {total_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
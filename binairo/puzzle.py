@@ -2,12 +2,29 @@ from functools import cache
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
 from logic_puzzles.constraints import CountConstraint
+from logic_puzzles.counters import CounterLayout, Counters
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    matches_givens,
+    encode_grids,
+    batch_is_complete,
+    batch_matches_givens,
+)
 
 
 class BinairoPuzzleState(PuzzleState):
+    __slots__ = (
+        "grid",
+        "found_by_row",
+        "found_by_col",
+        "found_row_codes",
+        "found_col_codes",
+    )
+
     grid: list[list[int]]
-    found_by_row: dict[tuple[int, int], int | None]
-    found_by_col: dict[tuple[int, int], int | None]
+    found_by_row: Counters  # row, value -> count
+    found_by_col: Counters  # col, value -> count
     found_row_codes: dict[tuple[int], int]
     found_col_codes: dict[tuple[int], int]
 
@@ -27,6 +44,8 @@ class BinairoPuzzle(Puzzle):
     state: BinairoPuzzleState
     row_constraint: CountConstraint
     col_constraint: CountConstraint
+    row_layout: CounterLayout
+    col_layout: CounterLayout
 
     @classmethod
     def from_string(cls, string):
@@ -46,6 +65,8 @@ class BinairoPuzzle(Puzzle):
         self.col_constraint = CountConstraint(
             self.grid_utils.rows // 2, self.grid_utils.rows
         )
+        self.row_layout = CounterLayout(range(self.grid_utils.rows), self.iter_values())
+        self.col_layout = CounterLayout(range(self.grid_utils.cols), self.iter_values())
 
         if state is None:
             self.initialize_state()
@@ -64,16 +85,8 @@ class BinairoPuzzle(Puzzle):
     def initialize_state(self):
         self.state = BinairoPuzzleState(
             grid=[[None] * self.grid_utils.cols for _ in range(self.grid_utils.rows)],
-            found_by_row={
-                (r, value): 0
-                for r in range(self.grid_utils.rows)
-                for value in self.iter_values()
-            },
-            found_by_col={
-                (c, value): 0
-                for c in range(self.grid_utils.cols)
-                for value in self.iter_values()
-            },
+            found_by_row=self.row_layout.new_counters(),
+            found_by_col=self.col_layout.new_counters(),
             found_row_codes=dict(),
             found_col_codes=dict(),
         )
@@ -85,6 +98,57 @@ class BinairoPuzzle(Puzzle):
 
             self.set_value((r, c), value)
 
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, {0, 1}):
+            return False
+        if not matches_givens(grid, self.initial_grid):
+            return False
+
+        rows, cols = grid, [list(col) for col in zip(*grid)]
+        for lines, target in (
+            (rows, self.row_constraint.target),
+            (cols, self.col_constraint.target),
+        ):
+            if any(sum(line) != target for line in lines):
+                return False
+            if len(set(map(tuple, lines))) != len(lines):
+                return False
+            for line in lines:
+                if any(
+                    line[i] == line[i + 1] == line[i + 2] for i in range(len(line) - 2)
+                ):
+                    return False
+
+        return True
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], (0, 1))
+        given_codes = encode_grids([self.initial_grid], (0, 1))[0]
+        res = batch_is_complete(codes) & batch_matches_givens(codes, given_codes)
+
+        for lines, target in (
+            (codes, self.row_constraint.target),
+            (codes.transpose(0, 2, 1), self.col_constraint.target),
+        ):
+            res &= (lines.sum(axis=2) == target).all(axis=1)
+
+            three = (lines[:, :, :-2] == lines[:, :, 1:-1]) & (
+                lines[:, :, 1:-1] == lines[:, :, 2:]
+            )
+            res &= ~three.any(axis=(1, 2))
+
+            # each line as a binary number, equal numbers are equal lines
+            weights = 1 << np.arange(lines.shape[2], dtype=np.int64)
+            numbers = np.sort((lines * weights).sum(axis=2), axis=1)
+            res &= ~(numbers[:, 1:] == numbers[:, :-1]).any(axis=1)
+
+        return res.tolist()
+
     def iter_values(self):
         yield from (0, 1)
 
@@ -164,8 +228,8 @@ class BinairoPuzzle(Puzzle):
         return tuple(self.state.grid[r][c] for r in range(self.grid_utils.rows))
 
     def _update_value(self, r, c, value, delta):
-        self.state.found_by_row[r, value] += delta
-        self.state.found_by_col[c, value] += delta
+        self.state.found_by_row.add((r, value), delta)
+        self.state.found_by_col.add((c, value), delta)
 
     def set_value(self, location, value):
         r, c = location
@@ -111,6 +111,6 @@ class BinairoSolver(SimpleBranchingSolver):
             print(f"Found by trying singe missing: {len(to_update)}")
 
         if to_update:
-            return self._solve_updates_map(to_update)
+            return self._solve_updates_map(to_update, "single_missing")
 
         return super()._branching_solve()
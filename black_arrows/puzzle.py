@@ -1,5 +1,11 @@
 from itertools import product
 from logic_puzzles.puzzle import Puzzle, PuzzleState
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    encode_grids,
+    batch_is_complete,
+)
 
 DIRECTIONS = {
     "N": (-1, 0),
@@ -24,6 +30,8 @@ PRETTY_DIRECTIONS = {
 
 
 class BlackArrowsPuzzleState(PuzzleState):
+    __slots__ = ("marked", "solved", "pointed_from_solved", "pointing_to_undecided")
+
     marked: list[list[int | None]]
     solved: list[list[int]]
     pointed_from_solved: list[list[int]]
@@ -81,6 +89,9 @@ class BlackArrowsPuzzle(Puzzle):
             pointing_to_undecided=pointing_to_undecided,
         )
 
+    def encode_solution(self, state):
+        return state.marked
+
     def __str__(self):
         ARROW = {value: key for key, value in PRETTY_DIRECTIONS.items()}
 
@@ -112,6 +123,39 @@ class BlackArrowsPuzzle(Puzzle):
             for new_r, new_c in self.ray_iter(r, c, dr, dc):
                 yield dr, dc, new_r, new_c
 
+    def validate(self, state):
+        marked = state.marked
+        if not is_complete(marked, {0, 1}):
+            return False
+
+        # every arrow points to exactly one marked cell
+        return all(
+            sum(marked[new_r][new_c] for new_r, new_c in self.ray_iter(r, c, dr, dc))
+            == 1
+            for r, row in enumerate(self.grid)
+            for c, (dr, dc) in enumerate(row)
+        )
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.marked for state in states], (0, 1))
+        res = batch_is_complete(codes)
+
+        # (cells x arrows) matrix of the cells each arrow points to
+        size = self.grid_size
+        pointed = np.zeros((size * size, size * size), dtype=np.int16)
+        for r, c in self.iter_locations():
+            for new_r, new_c in self.pointed_by[r][c]:
+                pointed[r * size + c, new_r * size + new_c] = 1
+
+        marked = np.maximum(codes.reshape(len(states), -1), 0)
+        res &= (marked @ pointed == 1).all(axis=1)
+
+        return res.tolist()
+
     def iter_locations(self):
         yield from product(range(self.grid_size), repeat=2)
 
@@ -0,0 +1,61 @@
+import sys
+import time
+import argparse
+from sudoku.bulk import solve_stream
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Solves 9x9 Sudokus in the one-line format (81 characters, "
+        "'.' or '0' for blanks), writing a line per solution, an empty line "
+        "for the puzzles without one"
+    )
+    parser.add_argument("--input", type=argparse.FileType("r"), default=sys.stdin)
+    parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout)
+    parser.add_argument(
+        "--jobs", type=int, default=None, help="Processes, the CPU count by default"
+    )
+    parser.add_argument(
+        "--chunk_size", type=int, default=1024, help="Puzzles sent to a process at once"
+    )
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="Apply the singles to whole chunks through NumPy, searching only "
+        "the puzzles they leave unsolved",
+    )
+    return parser.parse_args()
+
+
+def iter_lines(file):
+    for line in file:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def main():
+    args = parse_args()
+
+    solved = total = 0
+    start_time = time.perf_counter()
+    solutions = solve_stream(
+        iter_lines(args.input), args.jobs, args.chunk_size, args.vectorized
+    )
+    for solution in solutions:
+        total += 1
+        if solution is not None:
+            solved += 1
+        args.output.write(f"{solution or ''}\n")
+
+    elapsed = time.perf_counter() - start_time
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Solved {solved} of {total} puzzles in {elapsed:.3f}s, "
+        f"{rate:.1f} puzzles/s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
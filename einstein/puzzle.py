@@ -1,12 +1,15 @@
 from logic_puzzles.puzzle import Puzzle, PuzzleState
+from logic_puzzles.counters import CounterLayout, Counters
 from .parser import EinsteinParser
 from .hint import EinsteinItem, EinsteinHint
 
 
 class EinsteinState(PuzzleState):
+    __slots__ = ("houses", "item_location", "conflict_values")
+
     houses: list[list[EinsteinItem]]
     item_location: dict[EinsteinItem, int]
-    conflict_values: list[dict[EinsteinItem, int]]
+    conflict_values: Counters  # house, item -> conflicts
 
     def __init__(self, houses, item_location, conflict_values):
         self.houses = houses
@@ -20,6 +23,7 @@ class EinsteinPuzzle(Puzzle):
     items_by_type: dict[str, list[EinsteinItem]]
     items: list[EinsteinItem]
     state: EinsteinState
+    conflict_layout: CounterLayout
 
     def __init__(self, hints, items_by_type, state=None):
         self.hints = hints
@@ -34,6 +38,10 @@ class EinsteinPuzzle(Puzzle):
             for item in [hint.item_1, hint.item_2]:
                 self.hints_by_item[item].append(hint)
 
+        self.conflict_layout = CounterLayout(
+            range(len(self.items_by_type["PERSON"])), self.items
+        )
+
         if state is None:
             self.initialize_state()
 
@@ -41,14 +49,45 @@ class EinsteinPuzzle(Puzzle):
         self.state = EinsteinState(
             houses=[[] for _ in self.items_by_type["PERSON"]],
             item_location={item: None for item in self.items},
-            conflict_values=[
-                {item: 0 for item in self.items} for _ in self.items_by_type["PERSON"]
-            ],
+            conflict_values=self.conflict_layout.new_counters("B"),
         )
 
         for i, item in enumerate(self.items_by_type["PERSON"]):
             self.set_value(item, i)
 
+    def encode_solution(self, state):
+        # one row per house, with the values of its items sorted by type
+        return [[item.item_value for item in sorted(house)] for house in state.houses]
+
+    def validate(self, state):
+        location = state.item_location
+        houses = range(len(self.items_by_type["PERSON"]))
+        if any(location.get(item) not in houses for item in self.items):
+            return False
+        if sum(map(len, state.houses)) != len(self.items) or any(
+            location.get(item) != house
+            for house, items in enumerate(state.houses)
+            for item in items
+        ):
+            return False
+
+        # each house has one item of each type, the people are in their own
+        if any(
+            len(set(location[item] for item in items)) != len(items)
+            for items in self.items_by_type.values()
+        ):
+            return False
+        if any(
+            location[item] != house
+            for house, item in enumerate(self.items_by_type["PERSON"])
+        ):
+            return False
+
+        return all(
+            (location[hint.item_1] == location[hint.item_2]) != hint.negated
+            for hint in self.hints
+        )
+
     def __str__(self):
         res = ["# Hints"]
         res.extend((f"- {hint}" for hint in self.hints))
@@ -87,23 +126,30 @@ class EinsteinPuzzle(Puzzle):
         return cls(hints, items_by_type)
 
     def _update_conflict_values(self, item, house, delta):
+        conflict_values = self.state.conflict_values.values
+        group_offsets = self.conflict_layout.group_offsets
+        item_offsets = self.conflict_layout.value_offsets
+
         for hint in self.hints_by_item[item]:
             other_item = hint.item_1 if hint.item_2 == item else hint.item_2
 
             if hint.negated:
                 # other item must not be in the same house
-                self.state.conflict_values[house][other_item] += delta
+                offset = group_offsets[house] + item_offsets[other_item]
+                conflict_values[offset] += delta
                 continue
 
             # other item must not be in a different house
             for other_house in range(len(self.state.houses)):
                 if other_house != house:
-                    self.state.conflict_values[other_house][other_item] += delta
+                    offset = group_offsets[other_house] + item_offsets[other_item]
+                    conflict_values[offset] += delta
 
         # no two items of the same type in the same home
         for other_item in self.items_by_type[item.item_type]:
             if other_item != item:
-                self.state.conflict_values[house][other_item] += delta
+                offset = group_offsets[house] + item_offsets[other_item]
+                conflict_values[offset] += delta
 
     def iter_locations(self):
         yield from self.items
@@ -112,7 +158,9 @@ class EinsteinPuzzle(Puzzle):
         yield from range(len(self.state.houses))
 
     def can_set(self, item, house):
-        return self.state.conflict_values[house][item] == 0
+        offset = self.conflict_layout.group_offsets[house]
+        offset += self.conflict_layout.value_offsets[item]
+        return self.state.conflict_values.values[offset] == 0
 
     def get_value(self, item):
         return self.state.item_location[item]
@@ -10,6 +10,8 @@ DIRECTION_STR = {
 
 
 class FourWindsPuzzleState(PuzzleState):
+    __slots__ = ("regions_grid", "grid")
+
     regions_grid: list[list[int]]
     grid: list[list[int]]
 
@@ -113,6 +115,30 @@ class FourWindsPuzzle(Puzzle):
             r += dr
             c += dc
 
+    def validate(self, state):
+        regions_grid = state.regions_grid
+        covered = {region: 0 for region in self.regions}
+        for r, c in product(range(self.rows), range(self.cols)):
+            region_id = regions_grid[r][c]
+            if self.initial_grid[r][c] is not None:
+                if region_id != (r, c):
+                    return False
+                continue
+
+            if region_id not in covered or not self.is_aligned(r, c, *region_id):
+                return False
+
+            # the cells between the number and this one belong to it too
+            if any(
+                regions_grid[new_r][new_c] != region_id
+                for new_r, new_c in self.ray_iter(r, c, *region_id)
+            ):
+                return False
+
+            covered[region_id] += 1
+
+        return all(covered[r, c] == self.initial_grid[r][c] for r, c in self.regions)
+
     def star_iter(self, r, c):
         iterators = [
             self.ray_iter(r, c, r, -1),
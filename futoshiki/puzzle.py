@@ -1,9 +1,24 @@
 from functools import cached_property, cache
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
+from logic_puzzles.location_groups import LocationGroups
+from logic_puzzles.counters import CounterLayout
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    matches_givens,
+    get_line_groups,
+    are_groups_distinct,
+    encode_grids,
+    batch_is_complete,
+    batch_matches_givens,
+    batch_groups_distinct,
+)
 
 
 class FutoshikiPuzzleState(PuzzleState):
+    __slots__ = ("grid", "found_by_row", "found_by_col", "hints")
+
     def __init__(self, grid, found_by_row, found_by_col, hints):
         self.grid = grid
         self.found_by_row = found_by_row
@@ -50,6 +65,9 @@ class FutoshikiPuzzle(Puzzle):
 
                 self.cell_constraints[r, c].append((new_r, new_c, constraint))
 
+        self.row_layout = CounterLayout(range(self.grid_utils.rows), self.iter_values())
+        self.col_layout = CounterLayout(range(self.grid_utils.cols), self.iter_values())
+
         if state is None:
             self.initialize_state()
 
@@ -81,16 +99,8 @@ class FutoshikiPuzzle(Puzzle):
     def initialize_state(self):
         self.state = FutoshikiPuzzleState(
             grid=[[None] * self.grid_utils.rows for _ in range(self.grid_utils.rows)],
-            found_by_row={
-                (r, value): 0
-                for r in range(self.grid_utils.rows)
-                for value in self.iter_values()
-            },
-            found_by_col={
-                (c, value): 0
-                for c in range(self.grid_utils.rows)
-                for value in self.iter_values()
-            },
+            found_by_row=self.row_layout.new_counters("B"),
+            found_by_col=self.col_layout.new_counters("B"),
             hints={
                 (r, c, value): None
                 for r in range(self.grid_utils.rows)
@@ -131,6 +141,60 @@ class FutoshikiPuzzle(Puzzle):
         else:
             raise ValueError(f"Unknown constraint {constraint}")
 
+    @cached_property
+    def groups(self):
+        """The cells of each row and column"""
+        return get_line_groups(self.grid_utils.rows, self.grid_utils.cols)
+
+    @cached_property
+    def location_groups(self):
+        """The groups holding every value, indexed for the solvers"""
+        return LocationGroups(
+            [[("grid", location) for location in group] for group in self.groups]
+        )
+
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, set(self.iter_values())):
+            return False
+        if not matches_givens(grid, self.initial_grid):
+            return False
+        if not are_groups_distinct(grid, self.groups):
+            return False
+
+        return all(
+            self.check_constraint(grid[r][c], grid[new_r][new_c], constraint)
+            for (r, c), constraints in self.cell_constraints.items()
+            for new_r, new_c, constraint in constraints
+        )
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        # the values are 1..n, their codes keep their order
+        values = list(self.iter_values())
+        codes = encode_grids([state.grid for state in states], values)
+        given_codes = encode_grids([self.initial_grid], values)[0]
+        res = (
+            batch_is_complete(codes)
+            & batch_matches_givens(codes, given_codes)
+            & batch_groups_distinct(codes, self.groups)
+        )
+
+        pairs = [
+            (r, c, new_r, new_c, constraint in ("<", "^"))
+            for (r, c), constraints in self.cell_constraints.items()
+            for new_r, new_c, constraint in constraints
+        ]
+        if pairs:
+            r, c, new_r, new_c, less = map(np.array, zip(*pairs))
+            left, right = codes[:, r, c], codes[:, new_r, new_c]
+            res &= np.where(less, left < right, left > right).all(axis=1)
+
+        return res.tolist()
+
     def iter_values(self):
         yield from range(1, self.grid_utils.rows + 1)
 
@@ -196,9 +260,12 @@ class FutoshikiPuzzle(Puzzle):
         if self.state.hints[r, c, value] == 0:
             return False
 
-        if self.state.found_by_col[c, value] != 0:
+        value_offset = self.row_layout.value_offsets[value]
+        col_offset = self.col_layout.group_offsets[c] + value_offset
+        if self.state.found_by_col.values[col_offset] != 0:
             return False
-        if self.state.found_by_row[r, value] != 0:
+        row_offset = self.row_layout.group_offsets[r] + value_offset
+        if self.state.found_by_row.values[row_offset] != 0:
             return False
 
         # take advantage of the hints to figure out whether this cell can be
@@ -214,8 +281,11 @@ class FutoshikiPuzzle(Puzzle):
         return True
 
     def _update_value(self, r, c, value, delta):
-        self.state.found_by_row[r, value] += delta
-        self.state.found_by_col[c, value] += delta
+        value_offset = self.row_layout.value_offsets[value]
+        row_offset = self.row_layout.group_offsets[r] + value_offset
+        self.state.found_by_row.values[row_offset] += delta
+        col_offset = self.col_layout.group_offsets[c] + value_offset
+        self.state.found_by_col.values[col_offset] += delta
 
     def set_value(self, location, value):
         location_type, location_data = location
@@ -2,24 +2,16 @@ from logic_puzzles.solver import SimpleBranchingSolver
 from logic_puzzles.sudoku_like import SudokuLike
 
 
-class FutoshikiSolver(SimpleBranchingSolver, SudokuLike):
-    def get_constrained_locations(self):
-        res = []
-        res.extend(  # rows
-            [("grid", (r, c)) for c in range(self.puzzle.grid_utils.cols)]
-            for r in range(self.puzzle.grid_utils.rows)
-        )
-        res.extend(  # cols
-            [("grid", (r, c)) for r in range(self.puzzle.grid_utils.rows)]
-            for c in range(self.puzzle.grid_utils.cols)
-        )
-        return res
-
+class FutoshikiSolver(SudokuLike, SimpleBranchingSolver):
     def _branching_solve(self):
         res = self._solve_hidden_singles()
         if res is not None:
             return res
 
+        res = self._solve_eliminations()
+        if res is not None:
+            return res
+
         return super()._branching_solve()
 
     def get_branching_score(self, location):
@@ -2,9 +2,19 @@ from itertools import product
 from collections import namedtuple
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    is_connected,
+    encode_grids,
+    batch_is_complete,
+    batch_matches_givens,
+)
 
 
 class GalaxiesPuzzleState(PuzzleState):
+    __slots__ = ("grid",)
+
     grid: list[list[int | None]]
 
     def __init__(self, grid):
@@ -102,6 +112,73 @@ class GalaxiesPuzzle(Puzzle):
             for r, c in galaxy.iter_core():
                 self.set_value((r, c), galaxy_id)
 
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, set(self.iter_values())):
+            return False
+        if any(
+            grid[r][c] != galaxy_id for (r, c), galaxy_id in self.galaxy_cores.items()
+        ):
+            return False
+
+        for r, c in self.grid_utils.iter_grid():
+            galaxy_id = grid[r][c]
+            new_r, new_c = self.rotational_symmetry(r, c, self.galaxies[galaxy_id])
+            if (
+                not self.grid_utils.in_range(new_r, new_c)
+                or grid[new_r][new_c] != galaxy_id
+            ):
+                return False
+
+        return self._are_galaxies_connected(grid)
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        values = list(self.iter_values())
+        codes = encode_grids([state.grid for state in states], values)
+        cores_grid = [
+            [self.galaxy_cores.get((r, c)) for c in range(self.grid_utils.cols)]
+            for r in range(self.grid_utils.rows)
+        ]
+        res = batch_is_complete(codes) & batch_matches_givens(
+            codes, encode_grids([cores_grid], values)[0]
+        )
+
+        rows, cols = np.indices((self.grid_utils.rows, self.grid_utils.cols))
+        for galaxy_id, galaxy in enumerate(self.galaxies):
+            new_rows, new_cols = self.rotational_symmetry(rows, cols, galaxy)
+            inside = (
+                (new_rows >= 0)
+                & (new_rows < self.grid_utils.rows)
+                & (new_cols >= 0)
+                & (new_cols < self.grid_utils.cols)
+            )
+            mirrored = (
+                codes[
+                    :,
+                    new_rows.clip(0, self.grid_utils.rows - 1),
+                    new_cols.clip(0, self.grid_utils.cols - 1),
+                ]
+                == galaxy_id
+            )
+            res &= ~((codes == galaxy_id) & ~(inside & mirrored)).any(axis=(1, 2))
+
+        # the connection of the galaxies is checked on the remaining states
+        return [
+            bool(valid) and self._are_galaxies_connected(state.grid)
+            for valid, state in zip(res, states)
+        ]
+
+    def _are_galaxies_connected(self, grid):
+        cells_by_galaxy = [[] for _ in self.galaxies]
+        for r, c in self.grid_utils.iter_grid():
+            cells_by_galaxy[grid[r][c]].append((r, c))
+
+        return all(is_connected(cells) for cells in cells_by_galaxy)
+
     def find_galaxy_bounds(self, galaxy_id):
         galaxy = self.galaxies[galaxy_id]
         stack = []
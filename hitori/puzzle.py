@@ -1,9 +1,26 @@
 from queue import PriorityQueue
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    is_connected,
+    get_line_groups,
+    encode_grids,
+    batch_is_complete,
+    batch_groups_distinct,
+)
 
 
 class HitoriPuzzleState(PuzzleState):
+    __slots__ = (
+        "grid",
+        "white_numbers_by_row",
+        "white_numbers_by_col",
+        "numbers_by_row",
+        "numbers_by_col",
+    )
+
     grid: list[list[int | None]]
     white_numbers_by_row: list[list[int]]
     white_numbers_by_col: list[list[int]]
@@ -86,6 +103,61 @@ class HitoriPuzzle(Puzzle):
             numbers_by_col=numbers_by_col,
         )
 
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, {0, 1}):
+            return False
+
+        for group in get_line_groups(self.grid_utils.rows, self.grid_utils.cols):
+            numbers = [self.initial_grid[r][c] for r, c in group if grid[r][c] == 1]
+            if len(set(numbers)) != len(numbers):
+                return False
+
+        if any(
+            grid[r][c] == grid[new_r][new_c] == 0
+            for r, c in self.grid_utils.iter_grid()
+            for new_r, new_c in ((r + 1, c), (r, c + 1))
+            if self.grid_utils.in_range(new_r, new_c)
+        ):
+            return False
+
+        return self._are_white_cells_connected(grid)
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], (0, 1))
+        black = codes == 0
+        res = (
+            batch_is_complete(codes)
+            & ~(black[:, 1:, :] & black[:, :-1, :]).any(axis=(1, 2))
+            & ~(black[:, :, 1:] & black[:, :, :-1]).any(axis=(1, 2))
+        )
+
+        # the numbers of the white cells, black cells get distinct negative
+        # numbers so that they never repeat
+        numbers = np.where(
+            black,
+            -1 - np.arange(codes[0].size).reshape(codes[0].shape),
+            np.array(self.initial_grid),
+        )
+        groups = get_line_groups(self.grid_utils.rows, self.grid_utils.cols)
+        res &= batch_groups_distinct(numbers, groups[: self.grid_utils.rows])
+        res &= batch_groups_distinct(numbers, groups[self.grid_utils.rows :])
+
+        # the connection of the white cells is checked on the remaining states
+        return [
+            bool(valid) and self._are_white_cells_connected(state.grid)
+            for valid, state in zip(res, states)
+        ]
+
+    def _are_white_cells_connected(self, grid):
+        return is_connected(
+            (r, c) for r, c in self.grid_utils.iter_grid() if grid[r][c] == 1
+        )
+
     def get_valid_values(self, location):
         return [x for x in (0, 1) if self.can_set(location, x)]
 
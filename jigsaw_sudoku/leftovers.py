@@ -0,0 +1,53 @@
+def get_region_lines(regions_grid):
+    """Map from each region to the number of its cells in each row, and in
+    each column"""
+    size = len(regions_grid)
+    res = {}
+    for r, row in enumerate(regions_grid):
+        for c, region in enumerate(row):
+            rows, cols = res.setdefault(region, ([0] * size, [0] * size))
+            rows[r] += 1
+            cols[c] += 1
+
+    return res
+
+
+def find_leftovers(regions_grid, max_size):
+    """The law of leftovers: a band of k rows (or columns) holds each value
+    k times, and so do k regions. When the regions lying mostly inside the
+    band are exactly k, the cells of the band outside of them (the innies)
+    hold the same values as the cells of those regions outside of the band
+    (the outies). Returns the pairs of innies and outies of every band, up
+    to max_size cells each."""
+    size = len(regions_grid)
+    region_lines = get_region_lines(regions_grid)
+    res, seen = [], set()
+    for transpose in (False, True):
+        for start in range(size):
+            for end in range(start + 1, size):
+                inside = set()
+                for region, lines in region_lines.items():
+                    count = sum(lines[transpose][start:end])
+                    if count > size - count:
+                        inside.add(region)
+
+                if len(inside) != end - start:
+                    continue
+
+                innies, outies = [], []
+                for r in range(size):
+                    for c in range(size):
+                        in_band = start <= (c if transpose else r) < end
+                        in_regions = regions_grid[r][c] in inside
+                        if in_band and not in_regions:
+                            innies.append((r, c))
+                        elif in_regions and not in_band:
+                            outies.append((r, c))
+
+                # the complementary band has the same leftovers, swapped
+                key = frozenset([frozenset(innies), frozenset(outies)])
+                if 0 < len(innies) <= max_size and key not in seen:
+                    seen.add(key)
+                    res.append((innies, outies))
+
+    return res
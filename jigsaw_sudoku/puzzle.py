@@ -1,5 +1,24 @@
+from functools import cached_property
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
+from logic_puzzles.location_groups import LocationGroups
+from logic_puzzles.symmetry import (
+    GridTransform,
+    iter_dihedral_transforms,
+    relabel_by_appearance,
+)
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    matches_givens,
+    get_line_groups,
+    are_groups_distinct,
+    encode_grids,
+    batch_is_complete,
+    batch_matches_givens,
+    batch_groups_distinct,
+)
+from .leftovers import find_leftovers
 
 # fmt: off
 SUDOKU_VALUES = [
@@ -8,12 +27,17 @@ SUDOKU_VALUES = [
 ]
 # fmt: on
 
+# the largest groups of innies and outies used for the law of leftovers
+MAX_LEFTOVERS = 6
+
 
 class JigsawSudokuPuzzleState(PuzzleState):
-    grid: list[list[int | None]]
-    found_by_row: dict[tuple[int, str], int]  # row, value -> count
-    found_by_col: dict[tuple[int, str], int]  # col, value -> count
-    found_by_region: dict[tuple[int, str], int]  # region, value -> count
+    __slots__ = ("grid", "found_by_row", "found_by_col", "found_by_region")
+
+    grid: list[list[str | None]]
+    found_by_row: list[int]  # row -> bitmask of the values found
+    found_by_col: list[int]  # col -> bitmask of the values found
+    found_by_region: list[int]  # region index -> bitmask of the values found
 
     def __init__(self, grid, found_by_row, found_by_col, found_by_region):
         self.grid = grid
@@ -23,6 +47,25 @@ class JigsawSudokuPuzzleState(PuzzleState):
 
 
 class JigsawSudokuPuzzle(Puzzle):
+    """Sudoku with irregular regions. The values found in each row, column
+    and region are kept as bitmasks, bit i for the i-th value. The overlaps
+    of the regions with the bands of rows and columns are precomputed, the
+    law of leftovers then restricts the values of each innie to those its
+    outies can hold, and vice versa, see jigsaw_sudoku/leftovers.py."""
+
+    regions_grid: list[list[str]]
+    initial_grid: list[list[str | None]]
+    grid_utils: GridUtils
+    state: JigsawSudokuPuzzleState
+    regions: dict[str, list[tuple[int, int]]]
+    values: list[str]
+    value_bits: dict[str, int]  # value -> its bit
+    all_values_mask: int
+    cell_groups: list[list[tuple[int, int, int]]]  # r, c -> row, col, region
+    leftovers: list[tuple[list, list]]  # (innies, outies) of each band
+    # r, c -> the other side of each of the leftovers the cell is part of
+    cell_leftovers: list[list[list[list[tuple[int, int]]]]]
+
     @classmethod
     def from_string(cls, string):
         lines = [x.strip() for x in string.split("\n")]
@@ -37,6 +80,15 @@ class JigsawSudokuPuzzle(Puzzle):
 
         return cls(regions_grid, initial_grid)
 
+    def to_string(self):
+        regions = "\n".join(" ".join(row) for row in self.regions_grid)
+        values = "\n".join(
+            " ".join(cell if cell is not None else "." for cell in row)
+            for row in self.initial_grid
+        )
+
+        return f"# regions\n{regions}\n\n# values\n{values}"
+
     def __init__(self, regions_grid, initial_grid, state=None):
         self.regions_grid = regions_grid
         self.initial_grid = initial_grid
@@ -48,6 +100,27 @@ class JigsawSudokuPuzzle(Puzzle):
             region = self.regions_grid[r][c]
             self.regions.setdefault(region, []).append((r, c))
 
+        self.values = SUDOKU_VALUES[: self.grid_utils.rows]
+        self.value_bits = {value: 1 << i for i, value in enumerate(self.values)}
+        self.all_values_mask = (1 << len(self.values)) - 1
+
+        region_indices = {region: i for i, region in enumerate(self.regions)}
+        self.cell_groups = [
+            [
+                (r, c, region_indices[self.regions_grid[r][c]])
+                for c in range(self.grid_utils.cols)
+            ]
+            for r in range(self.grid_utils.rows)
+        ]
+
+        self.leftovers = find_leftovers(regions_grid, MAX_LEFTOVERS)
+        self.cell_leftovers = [[[] for _ in row] for row in initial_grid]
+        for innies, outies in self.leftovers:
+            for r, c in innies:
+                self.cell_leftovers[r][c].append(outies)
+            for r, c in outies:
+                self.cell_leftovers[r][c].append(innies)
+
         if state is None:
             self.initialize_state()
 
@@ -63,27 +136,81 @@ class JigsawSudokuPuzzle(Puzzle):
             for r in range(self.grid_utils.rows)
         )
 
+    @cached_property
+    def groups(self):
+        """The cells of each row, column and region"""
+        return get_line_groups(self.grid_utils.rows, self.grid_utils.cols) + list(
+            self.regions.values()
+        )
+
+    @cached_property
+    def location_groups(self):
+        """The groups holding every value, indexed for the solvers"""
+        return LocationGroups(self.groups)
+
+    def validate(self, state):
+        return (
+            is_complete(state.grid, set(self.iter_values()))
+            and matches_givens(state.grid, self.initial_grid)
+            and are_groups_distinct(state.grid, self.groups)
+        )
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], self.values)
+        given_codes = encode_grids([self.initial_grid], self.values)[0]
+        res = (
+            batch_is_complete(codes)
+            & batch_matches_givens(codes, given_codes)
+            & batch_groups_distinct(codes, self.groups)
+        )
+        return res.tolist()
+
+    def canonicalize(self):
+        """Returns the canonical puzzle equivalent to this one, along with the
+        transform from this puzzle to it. Only rotations and reflections
+        preserve the regions, values and regions are renamed by order of
+        appearance."""
+        values = self.values
+        region_labels = [str(i + 1) for i in range(len(self.regions))]
+
+        best_key, best_transform, best_regions = None, None, None
+        for transform in iter_dihedral_transforms(self.grid_utils.rows):
+            region_transform = GridTransform(
+                transform.transpose, transform.rows, transform.cols
+            )
+            region_transform.value_map = relabel_by_appearance(
+                region_transform.apply(self.regions_grid), region_labels
+            )
+            transform.value_map = relabel_by_appearance(
+                transform.apply(self.initial_grid), values, values
+            )
+
+            regions_grid = region_transform.apply(self.regions_grid)
+            initial_grid = transform.apply(self.initial_grid)
+            key = (regions_grid, [[x or "" for x in row] for row in initial_grid])
+            if best_key is None or key < best_key:
+                best_key, best_transform, best_regions = key, transform, regions_grid
+
+        canonical = type(self)(best_regions, best_transform.apply(self.initial_grid))
+        return canonical, best_transform
+
+    def restore_state(self, transform, state):
+        """Maps a state of the canonical puzzle back to this puzzle"""
+        return type(self)(self.regions_grid, transform.invert(state.grid)).state
+
     def initialize_state(self):
         self.state = JigsawSudokuPuzzleState(
             [
                 [None for c in range(self.grid_utils.cols)]
                 for r in range(self.grid_utils.rows)
             ],
-            {
-                (r, value): 0
-                for r in range(self.grid_utils.rows)
-                for value in self.iter_values()
-            },
-            {
-                (c, value): 0
-                for c in range(self.grid_utils.cols)
-                for value in self.iter_values()
-            },
-            {
-                (region, value): 0
-                for region in self.regions
-                for value in self.iter_values()
-            },
+            [0] * self.grid_utils.rows,
+            [0] * self.grid_utils.cols,
+            [0] * len(self.regions),
         )
 
         for r, c in self.grid_utils.iter_grid():
@@ -91,27 +218,58 @@ class JigsawSudokuPuzzle(Puzzle):
                 self.set_value((r, c), self.initial_grid[r][c])
 
     def iter_values(self):
-        yield from SUDOKU_VALUES[: self.grid_utils.rows]
+        yield from self.values
 
     def iter_locations(self):
         yield from self.grid_utils.iter_grid()
 
-    def can_set(self, location, value):
+    def _get_group_mask(self, location):
+        """The bitmask of the values missing from the groups of a cell"""
         r, c = location
-        region = self.regions_grid[r][c]
-        return (
-            self.state.found_by_row[r, value] == 0
-            and self.state.found_by_col[c, value] == 0
-            and self.state.found_by_region[region, value] == 0
+        row, col, region = self.cell_groups[r][c]
+        state = self.state
+        return self.all_values_mask & ~(
+            state.found_by_row[row]
+            | state.found_by_col[col]
+            | state.found_by_region[region]
         )
 
-    def _update_value(self, location, value, delta):
+    def get_valid_mask(self, location):
+        """The bitmask of the values which can be set in a cell, the values
+        of an innie (or outie) must also fit one of the outies (innies)"""
+        mask = self._get_group_mask(location)
         r, c = location
-        region = self.regions_grid[r][c]
+        grid = self.state.grid
+        for others in self.cell_leftovers[r][c]:
+            if not mask:
+                break
+
+            allowed = 0
+            for other in others:
+                value = grid[other[0]][other[1]]
+                if value is not None:
+                    allowed |= self.value_bits[value]
+                else:
+                    allowed |= self._get_group_mask(other)
+            mask &= allowed
+
+        return mask
 
-        self.state.found_by_row[r, value] += delta
-        self.state.found_by_col[c, value] += delta
-        self.state.found_by_region[region, value] += delta
+    def count_valid_values(self, location):
+        return self.get_valid_mask(location).bit_count()
+
+    def get_valid_values(self, location):
+        mask = self.get_valid_mask(location)
+        res = []
+        while mask:
+            bit = mask & -mask
+            res.append(self.values[bit.bit_length() - 1])
+            mask ^= bit
+
+        return res
+
+    def can_set(self, location, value):
+        return self.get_valid_mask(location) & self.value_bits[value] != 0
 
     def get_value(self, location):
         r, c = location
@@ -121,11 +279,19 @@ class JigsawSudokuPuzzle(Puzzle):
         r, c = location
         assert self.state.grid[r][c] is None
         self.state.grid[r][c] = value
-        self._update_value(location, value, 1)
+        row, col, region = self.cell_groups[r][c]
+        bit = self.value_bits[value]
+        self.state.found_by_row[row] |= bit
+        self.state.found_by_col[col] |= bit
+        self.state.found_by_region[region] |= bit
 
     def unset_value(self, location):
         r, c = location
         value = self.state.grid[r][c]
         assert value is not None
         self.state.grid[r][c] = None
-        self._update_value(location, value, -1)
+        row, col, region = self.cell_groups[r][c]
+        bit = self.value_bits[value]
+        self.state.found_by_row[row] &= ~bit
+        self.state.found_by_col[col] &= ~bit
+        self.state.found_by_region[region] &= ~bit
@@ -2,44 +2,42 @@ from logic_puzzles.solver import SimpleBranchingSolver
 from logic_puzzles.sudoku_like import SudokuLike
 
 
-class JigsawSudokuSolver(SimpleBranchingSolver, SudokuLike):
+class JigsawSudokuSolver(SudokuLike, SimpleBranchingSolver):
+    local_constraints = True
+    supports_exact_cover = True
+    exact_cover: bool
+
+    def __init__(self, puzzle, *args, exact_cover=False, **kwargs):
+        super().__init__(puzzle, *args, **kwargs)
+        self.exact_cover = exact_cover
+
     def get_branching_score(self, location):
-        return -len(self.puzzle.get_valid_values(location))
-
-    def get_constrained_locations(self):
-        res = []
-        res.extend(  # rows
-            [(r, c) for c in range(self.puzzle.grid_utils.cols)]
-            for r in range(self.puzzle.grid_utils.rows)
-        )
-        res.extend(  # cols
-            [(r, c) for r in range(self.puzzle.grid_utils.rows)]
-            for c in range(self.puzzle.grid_utils.cols)
-        )
-        res.extend(self.puzzle.regions.values())  # regions
-
-        return res
+        return -self.puzzle.count_valid_values(location)
+
+    def _solve(self):
+        if self.exact_cover:
+            return self._solve_exact_cover()
+
+        return super()._solve()
 
     def _branching_solve(self):
         res = self._solve_hidden_singles()
         if res is not None:
             return res
 
+        res = self._solve_eliminations()
+        if res is not None:
+            return res
+
         return super()._branching_solve()
 
     def _compute_dirty(self, location):
-        dirty = set()
-
+        # rows, cols and regions
+        dirty = set(self.puzzle.location_groups.peers[location])
         r, c = location
-        region = self.puzzle.regions_grid[r][c]
-
-        # rows
-        dirty.update((new_r, c) for new_r in range(self.puzzle.grid_utils.rows))
-
-        # cols
-        dirty.update((r, new_c) for new_c in range(self.puzzle.grid_utils.cols))
 
-        # regions
-        dirty.update((new_r, new_c) for new_r, new_c in self.puzzle.regions[region])
+        # leftovers, the other side of the bands the cell is an innie or outie of
+        for others in self.puzzle.cell_leftovers[r][c]:
+            dirty.update(others)
 
         return set(x for x in dirty if not self.is_location_set(x))
@@ -1,12 +1,21 @@
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
 from logic_puzzles.constraints import SumConstraint
+from logic_puzzles.counters import CounterLayout, Counters
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    encode_grids,
+    batch_is_complete,
+)
 
 
 class KakurasuPuzzleState(PuzzleState):
+    __slots__ = ("grid", "found_by_rows", "found_by_cols")
+
     grid: list[list[int | None]]
-    found_by_rows: dict[tuple[int, int], int]  # row, value -> sum
-    found_by_cols: dict[tuple[int, int], int]  # col, value -> sum
+    found_by_rows: Counters  # row, value -> sum
+    found_by_cols: Counters  # col, value -> sum
 
     def __init__(self, grid, found_by_rows, found_by_cols):
         self.grid = grid
@@ -19,6 +28,8 @@ class KakurasuPuzzle(Puzzle):
     target_by_cols: list[int]
     row_constraints: list[SumConstraint]
     col_constraints: list[SumConstraint]
+    row_layout: CounterLayout
+    col_layout: CounterLayout
     state: KakurasuPuzzleState
     grid_utils: GridUtils
 
@@ -47,6 +58,8 @@ class KakurasuPuzzle(Puzzle):
         self.col_constraints = [
             SumConstraint(target, max_col_sum) for target in target_by_cols
         ]
+        self.row_layout = CounterLayout(range(self.grid_utils.rows), self.iter_values())
+        self.col_layout = CounterLayout(range(self.grid_utils.cols), self.iter_values())
 
         if state is None:
             self.initialize_state()
@@ -54,16 +67,8 @@ class KakurasuPuzzle(Puzzle):
     def initialize_state(self):
         self.state = KakurasuPuzzleState(
             grid=[[None for _ in self.target_by_cols] for _ in self.target_by_rows],
-            found_by_rows={
-                (r, value): 0
-                for r in range(self.grid_utils.rows)
-                for value in self.iter_values()
-            },
-            found_by_cols={
-                (c, value): 0
-                for c in range(self.grid_utils.cols)
-                for value in self.iter_values()
-            },
+            found_by_rows=self.row_layout.new_counters(),
+            found_by_cols=self.col_layout.new_counters(),
         )
 
     def __str__(self):
@@ -87,6 +92,36 @@ class KakurasuPuzzle(Puzzle):
 
         return "\n".join(res)
 
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, {0, 1}):
+            return False
+
+        return all(
+            sum(c + 1 for c, cell in enumerate(grid[r]) if cell == 1) == target
+            for r, target in enumerate(self.target_by_rows)
+        ) and all(
+            sum(r + 1 for r, row in enumerate(grid) if row[c] == 1) == target
+            for c, target in enumerate(self.target_by_cols)
+        )
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], (0, 1))
+        row_weights = np.arange(1, self.grid_utils.cols + 1)
+        col_weights = np.arange(1, self.grid_utils.rows + 1)
+        res = (
+            batch_is_complete(codes)
+            & ((codes * row_weights).sum(axis=2) == self.target_by_rows).all(axis=1)
+            & ((codes * col_weights[:, None]).sum(axis=1) == self.target_by_cols).all(
+                axis=1
+            )
+        )
+        return res.tolist()
+
     def iter_values(self):
         yield from (0, 1)
 
@@ -99,9 +134,9 @@ class KakurasuPuzzle(Puzzle):
         self.set_value(location, value)
 
         res = self.row_constraints[r].check(
-            self.state.found_by_rows[(r, 1)], self.state.found_by_rows[(r, 0)]
+            self.state.found_by_rows[r, 1], self.state.found_by_rows[r, 0]
         ) and self.col_constraints[c].check(
-            self.state.found_by_cols[(c, 1)], self.state.found_by_cols[(c, 0)]
+            self.state.found_by_cols[c, 1], self.state.found_by_cols[c, 0]
         )
 
         self.unset_value(location)
@@ -110,8 +145,8 @@ class KakurasuPuzzle(Puzzle):
 
     def _update_value(self, location, value, delta):
         r, c = location
-        self.state.found_by_rows[(r, value)] += (c + 1) * delta
-        self.state.found_by_cols[(c, value)] += (r + 1) * delta
+        self.state.found_by_rows.add((r, value), (c + 1) * delta)
+        self.state.found_by_cols.add((c, value), (r + 1) * delta)
 
     def get_value(self, location):
         r, c = location
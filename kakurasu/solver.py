@@ -24,6 +24,8 @@ def check_sum_possible(available, target):
 
 
 class KakurasuSolver(SimpleBranchingSolver):
+    local_constraints = True
+
     def get_branching_score(self, location):
         r, c = location
         missing_r = self.puzzle.target_by_rows[r] - self.state.found_by_rows[r, 1]
@@ -54,11 +56,11 @@ class KakurasuSolver(SimpleBranchingSolver):
 
             constraints = [
                 (
-                    row_constraint.get_missing(self.state.found_by_rows[(r, 1)]),
+                    row_constraint.get_missing(self.state.found_by_rows[r, 1]),
                     tuple(x is None for x in self.state.grid[r]),
                 ),
                 (
-                    col_constraint.get_missing(self.state.found_by_cols[(c, 1)]),
+                    col_constraint.get_missing(self.state.found_by_cols[c, 1]),
                     tuple(x[c] is None for x in self.state.grid),
                 ),
             ]
@@ -80,6 +82,6 @@ class KakurasuSolver(SimpleBranchingSolver):
             print(f"Found by impossible sums: {len(to_update)}")
 
         if to_update:
-            return self._solve_updates_map(to_update)
+            return self._solve_updates_map(to_update, "impossible_sums")
 
         return super()._branching_solve()
@@ -1,6 +1,7 @@
 from itertools import product, combinations
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
+from logic_puzzles.counters import CounterLayout, Counters
 
 
 def compute_all_possible_sums():
@@ -19,9 +20,11 @@ ALL_POSSIBLE_SUMS = compute_all_possible_sums()
 
 
 class KakuroPuzzleState(PuzzleState):
+    __slots__ = ("numbers_grid", "constraints_sum", "found_by_constraint", "hints_grid")
+
     numbers_grid: list[list[int]]
-    constraints_sum: list[int]
-    found_by_constraint: dict[tuple[int, int], int]
+    constraints_sum: Counters  # constraint -> sum
+    found_by_constraint: Counters  # constraint, value -> count
     hints_grid: dict[tuple[int, int, int], int]
 
     def __init__(self, numbers_grid, constraints_sum, found_by_constraint, hints_grid):
@@ -57,6 +60,8 @@ class KakuroPuzzle(Puzzle):
     state: KakuroPuzzleState
     cell_constraints: dict[tuple[int, int], list[tuple[int, int]]]
     grid_utils: GridUtils
+    sum_layout: CounterLayout
+    found_layout: CounterLayout
 
     @classmethod
     def from_string(cls, string):
@@ -106,6 +111,9 @@ class KakuroPuzzle(Puzzle):
             for r, c in cells:
                 self.cell_constraints.setdefault((r, c), []).append(i)
 
+        self.sum_layout = CounterLayout(self.constraints)
+        self.found_layout = CounterLayout(self.constraints, list(self.iter_values()))
+
         if state is None:
             self.initialize_state()
 
@@ -129,10 +137,8 @@ class KakuroPuzzle(Puzzle):
             numbers_grid=[
                 [None] * self.grid_utils.cols for _ in range(self.grid_utils.rows)
             ],
-            constraints_sum={k: 0 for k in self.constraints},
-            found_by_constraint={
-                (k, value): 0 for k in self.constraints for value in self.iter_values()
-            },
+            constraints_sum=self.sum_layout.new_counters(),
+            found_by_constraint=self.found_layout.new_counters("B"),
             hints_grid={
                 (r, c, value): None
                 for r, c in self.grid_utils.iter_grid()
@@ -140,6 +146,27 @@ class KakuroPuzzle(Puzzle):
             },
         )
 
+    def encode_solution(self, state):
+        return state.numbers_grid
+
+    def validate(self, state):
+        # the hints only guide the search, the numbers are the solution
+        grid = state.numbers_grid
+        values = set(self.iter_values())
+        if any(
+            (grid[r][c] is None) != self.grid[r][c].is_wall
+            or not (self.grid[r][c].is_wall or grid[r][c] in values)
+            for r, c in self.grid_utils.iter_grid()
+        ):
+            return False
+
+        for constraint, cells in self.constraints.values():
+            numbers = [grid[r][c] for r, c in cells]
+            if len(set(numbers)) != len(numbers) or sum(numbers) != constraint:
+                return False
+
+        return True
+
     def __str__(self):
         return "\n".join(
             " ".join(
@@ -186,8 +213,10 @@ class KakuroPuzzle(Puzzle):
 
         res = True
 
+        value_offset = self.found_layout.value_offsets[value]
         for i in self.cell_constraints[r, c]:
-            if self.state.found_by_constraint[i, value] > 0:
+            found_offset = self.found_layout.group_offsets[i] + value_offset
+            if self.state.found_by_constraint.values[found_offset] > 0:
                 res = False
                 break
 
@@ -205,7 +234,10 @@ class KakuroPuzzle(Puzzle):
                 if self.state.hints_grid[other_r, other_c, new_value] is None
                 and new_value != value
             )
-            new_sum = self.state.constraints_sum[i] + value
+            new_sum = (
+                self.state.constraints_sum.values[self.sum_layout.group_offsets[i]]
+                + value
+            )
 
             if not self.check_sum_possible(
                 len(free_cells), available_values, constraint - new_sum
@@ -216,9 +248,13 @@ class KakuroPuzzle(Puzzle):
         return res
 
     def _update_value(self, r, c, value, delta):
+        value_offset = self.found_layout.value_offsets[value]
         for i in self.cell_constraints[r, c]:
-            self.state.constraints_sum[i] += value * delta
-            self.state.found_by_constraint[i, value] += delta
+            self.state.constraints_sum.values[self.sum_layout.group_offsets[i]] += (
+                value * delta
+            )
+            found_offset = self.found_layout.group_offsets[i] + value_offset
+            self.state.found_by_constraint.values[found_offset] += delta
 
     def get_valid_values(self, location):
         location_type, location_data = location
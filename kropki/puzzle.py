@@ -3,9 +3,22 @@ from functools import cached_property, cache
 from math import isqrt
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import ORTHOGONAL_DIRECTIONS, GridUtils
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    matches_givens,
+    get_line_groups,
+    are_groups_distinct,
+    encode_grids,
+    batch_is_complete,
+    batch_matches_givens,
+    batch_groups_distinct,
+)
 
 
 class KropkiPuzzleState(PuzzleState):
+    __slots__ = ("grid", "conflict_cells")
+
     grid: list[list[int | None]]
     conflict_cells: list[list[list[int]]]
 
@@ -108,6 +121,79 @@ class KropkiPuzzle(Puzzle):
     def sudoku_square_size(self):
         return isqrt(self.grid_utils.rows)
 
+    @cached_property
+    def groups(self):
+        """The cells of each row and column, and of each square in sudoku mode"""
+        size = self.grid_utils.rows
+        res = get_line_groups(size, size)
+        if self.sudoku_mode:
+            square_size = self.sudoku_square_size
+            res += [
+                [
+                    (square_r + dr, square_c + dc)
+                    for dr, dc in product(range(square_size), repeat=2)
+                ]
+                for square_r, square_c in product(range(0, size, square_size), repeat=2)
+            ]
+
+        return res
+
+    @cached_property
+    def dot_pairs(self):
+        """The pairs of adjacent cells with a dot between them"""
+        return [
+            (r, c, new_r, new_c, constraint)
+            for r, c in self.grid_utils.iter_grid()
+            for new_r, new_c in ((r, c + 1), (r + 1, c))
+            if self.grid_utils.in_range(new_r, new_c)
+            and (constraint := self.get_constraint_between(r, c, new_r, new_c)) != "."
+        ]
+
+    def check_constraint(self, left, right, constraint):
+        if constraint == "+":
+            return abs(left - right) == 1
+        return left == 2 * right or right == 2 * left
+
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, set(self.iter_values())):
+            return False
+        if not matches_givens(grid, self.initial_grid):
+            return False
+        if not are_groups_distinct(grid, self.groups):
+            return False
+
+        return all(
+            self.check_constraint(grid[r][c], grid[new_r][new_c], constraint)
+            for r, c, new_r, new_c, constraint in self.dot_pairs
+        )
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        values = list(self.iter_values())
+        codes = encode_grids([state.grid for state in states], values)
+        given_codes = encode_grids([self.initial_grid], values)[0]
+        res = (
+            batch_is_complete(codes)
+            & batch_matches_givens(codes, given_codes)
+            & batch_groups_distinct(codes, self.groups)
+        )
+
+        if self.dot_pairs:
+            r, c, new_r, new_c, constraint = map(np.array, zip(*self.dot_pairs))
+            # the values are 1..n
+            left, right = codes[:, r, c] + 1, codes[:, new_r, new_c] + 1
+            res &= np.where(
+                constraint == "+",
+                np.abs(left - right) == 1,
+                (left == 2 * right) | (right == 2 * left),
+            ).all(axis=1)
+
+        return res.tolist()
+
     def get_constraint_between(self, r, c, new_r, new_c):
         if r == new_r:
             return self.between_columns[r][min(c, new_c)]
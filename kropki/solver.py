@@ -4,6 +4,8 @@ from logic_puzzles.grid_utils import ORTHOGONAL_DIRECTIONS
 
 
 class KropkiSolver(SimpleBranchingSolver):
+    local_constraints = True
+
     def get_branching_score(self, location):
         return -len(self.puzzle.get_valid_values(location))
 
@@ -1,13 +1,18 @@
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils, ORTHOGONAL_DIRECTIONS, ALL_DIRECTIONS
 from logic_puzzles.constraints import CountConstraint
+from logic_puzzles.counters import CounterLayout, Counters
+from logic_puzzles.validation import import_numpy, get_line_groups, encode_grids
+from functools import cached_property
 
 
 class LightUpPuzzleState(PuzzleState):
+    __slots__ = ("grid", "lit", "available_lights", "found_by_box")
+
     grid: list[list[int | None]]
     lit: list[list[int]]
     available_lights: list[list[int]]
-    found_by_box: dict[tuple[int, int], int]  # (box_id, value) -> frequency
+    found_by_box: Counters  # box_id, value -> frequency
 
     def __init__(self, grid, lit, available_lights, found_by_box):
         self.grid = grid
@@ -41,6 +46,8 @@ class LightUpPuzzle(Puzzle):
                 cell, self.spaces_around_cell(r, c)
             )
 
+        self.box_layout = CounterLayout(self.box_constraints.keys(), self.iter_values())
+
         if state is None:
             self.initialize_state()
 
@@ -83,11 +90,7 @@ class LightUpPuzzle(Puzzle):
                 ]
                 for r in range(self.grid_utils.rows)
             ],
-            found_by_box={
-                (box_id, value): 0
-                for box_id in self.box_constraints.keys()
-                for value in self.iter_values()
-            },
+            found_by_box=self.box_layout.new_counters(),
         )
 
     def _update_value(self, location, value, delta):
@@ -112,7 +115,7 @@ class LightUpPuzzle(Puzzle):
 
             new_r, new_c = r + dr, c + dc
             if (new_r, new_c) in self.box_constraints:
-                self.state.found_by_box[(new_r, new_c), value] += delta
+                self.state.found_by_box.add(((new_r, new_c), value), delta)
 
     def spaces_around_cell(self, r, c):
         return sum(
@@ -165,6 +168,103 @@ class LightUpPuzzle(Puzzle):
 
         return res
 
+    @cached_property
+    def empty_cells(self):
+        return [
+            (r, c)
+            for r, c in self.grid_utils.iter_grid()
+            if self.initial_grid[r][c] == "."
+        ]
+
+    @cached_property
+    def light_segments(self):
+        """The runs of empty cells in each row and column, a bulb lights up all
+        of the cells in its runs"""
+        res = []
+        for line in get_line_groups(self.grid_utils.rows, self.grid_utils.cols):
+            segment = []
+            for r, c in line:
+                if self.initial_grid[r][c] == ".":
+                    segment.append((r, c))
+                elif segment:
+                    res.append(segment)
+                    segment = []
+
+            if segment:
+                res.append(segment)
+
+        return res
+
+    def _get_box_neighbors(self, r, c):
+        return [
+            (new_r, new_c)
+            for new_r, new_c in self.grid_utils.orthogonal_iter(r, c, 1)
+            if self.initial_grid[new_r][new_c] == "."
+        ]
+
+    def validate(self, state):
+        grid = state.grid
+        if any(
+            grid[r][c] not in (0, 1) if cell == "." else grid[r][c] is not None
+            for r, row in enumerate(self.initial_grid)
+            for c, cell in enumerate(row)
+        ):
+            return False
+
+        # bulbs do not see each other and every cell is lit
+        lit = set()
+        for segment in self.light_segments:
+            bulbs = sum(grid[r][c] for r, c in segment)
+            if bulbs > 1:
+                return False
+            if bulbs == 1:
+                lit.update(segment)
+
+        if len(lit) != len(self.empty_cells):
+            return False
+
+        return all(
+            sum(grid[new_r][new_c] for new_r, new_c in self._get_box_neighbors(r, c))
+            == self.initial_grid[r][c]
+            for r, c in self.box_constraints
+        )
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], (0, 1))
+        empty = np.array(
+            [[cell == "." for cell in row] for row in self.initial_grid], dtype=bool
+        )
+        res = (codes[:, empty] >= 0).all(axis=1) & (codes[:, ~empty] < 0).all(axis=1)
+
+        # (cells x groups) matrices of the membership of the cells in the
+        # segments and in the neighbors of the boxes
+        cell_ids = {cell: i for i, cell in enumerate(self.empty_cells)}
+
+        def membership(groups):
+            res = np.zeros((len(self.empty_cells), len(groups)), dtype=np.int16)
+            for i, group in enumerate(groups):
+                res[[cell_ids[cell] for cell in group], i] = 1
+            return res
+
+        bulbs = np.maximum(codes[:, empty], 0)
+        segments = membership(self.light_segments)
+        segment_bulbs = bulbs @ segments
+        res &= (segment_bulbs <= 1).all(axis=1)
+        res &= ((segment_bulbs @ segments.T) > 0).all(axis=1)
+
+        if self.box_constraints:
+            boxes = membership(
+                [self._get_box_neighbors(r, c) for r, c in self.box_constraints]
+            )
+            targets = [self.initial_grid[r][c] for r, c in self.box_constraints]
+            res &= (bulbs @ boxes == targets).all(axis=1)
+
+        return res.tolist()
+
     def iter_locations(self):
         for r, c in self.grid_utils.iter_grid():
             if self.initial_grid[r][c] == ".":
@@ -1,5 +1,13 @@
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
+from logic_puzzles.counters import CounterLayout, Counters
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    is_connected,
+    encode_grids,
+    batch_is_complete,
+)
 
 SHAPES = {
     "I": ((0, 0), (0, 1), (0, 2), (0, 3)),
@@ -37,9 +45,14 @@ def get_all_shapes_orientations():
     return found
 
 
+SHAPE_TYPES = {cells: shape_type for shape_type, cells in get_all_shapes_orientations()}
+
+
 class LitsPuzzleState(PuzzleState):
+    __slots__ = ("grid", "found_by_region")
+
     grid: list[list[int | None]]
-    found_by_region: dict[tuple[int, int], int]
+    found_by_region: Counters  # region, value -> count
 
     def __init__(self, grid, found_by_region):
         self.grid = grid
@@ -54,6 +67,7 @@ class LitsPuzzle(Puzzle):
     shapes_locations: list[tuple[str, tuple[tuple[int, int]]]]
     shapes_by_region: dict[str, list[tuple[str, tuple[tuple[int, int]]]]]
     shapes_by_cell: dict[tuple[int, int], list[tuple[str, tuple[tuple[int, int]]]]]
+    region_layout: CounterLayout
     state: LitsPuzzleState
 
     @classmethod
@@ -99,6 +113,8 @@ class LitsPuzzle(Puzzle):
             for cell in cells:
                 self.shapes_by_cell[cell].append((shape_type, cells))
 
+        self.region_layout = CounterLayout(self.regions, self.iter_values())
+
         if state is None:
             self.initialize_state()
 
@@ -122,12 +138,71 @@ class LitsPuzzle(Puzzle):
                 [None for _ in range(self.grid_utils.cols)]
                 for _ in range(self.grid_utils.rows)
             ],
-            found_by_region={
-                (region, value): 0
-                for region in self.regions
-                for value in self.iter_values()
-            },
+            found_by_region=self.region_layout.new_counters(),
+        )
+
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, {0, 1}):
+            return False
+        if any(
+            grid[r][c] == grid[r][c + 1] == grid[r + 1][c] == grid[r + 1][c + 1] == 1
+            for r in range(self.grid_utils.rows - 1)
+            for c in range(self.grid_utils.cols - 1)
+        ):
+            return False
+
+        return self._check_shapes(grid)
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], (0, 1))
+        full = codes == 1
+        squares = (
+            full[:, :-1, :-1] & full[:, 1:, :-1] & full[:, :-1, 1:] & full[:, 1:, 1:]
+        )
+        res = batch_is_complete(codes) & ~squares.any(axis=(1, 2))
+
+        # the shapes and their connections are checked on the remaining states
+        return [
+            bool(valid) and self._check_shapes(state.grid)
+            for valid, state in zip(res, states)
+        ]
+
+    def _check_shapes(self, grid):
+        """Each region holds one shape, shapes of the same type do not touch
+        and all of the shapes are connected"""
+        shape_types = {}
+        for region, cells in self.regions.items():
+            shape = [(r, c) for r, c in cells if grid[r][c] == 1]
+            if len(shape) != 4:
+                return False
+
+            shape_type = SHAPE_TYPES.get(normalize_shape_position(shape))
+            if shape_type is None:
+                return False
+            shape_types[region] = shape_type
+
+        full_cells = set(
+            (r, c) for r, c in self.grid_utils.iter_grid() if grid[r][c] == 1
         )
+        for r, c in full_cells:
+            for new_r, new_c in ((r + 1, c), (r, c + 1)):
+                if (new_r, new_c) not in full_cells:
+                    continue
+
+                region = self.regions_grid[r][c]
+                new_region = self.regions_grid[new_r][new_c]
+                if (
+                    region != new_region
+                    and shape_types[region] == shape_types[new_region]
+                ):
+                    return False
+
+        return is_connected(full_cells)
 
     def iter_values(self):
         yield from (0, 1)
@@ -276,7 +351,7 @@ class LitsPuzzle(Puzzle):
     def _update_value(self, location, value, delta):
         r, c = location
         region = self.regions_grid[r][c]
-        self.state.found_by_region[region, value] += delta
+        self.state.found_by_region.add((region, value), delta)
 
     def set_value(self, location, value):
         r, c = location
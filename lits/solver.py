@@ -91,7 +91,7 @@ class LitsSolver(SimpleBranchingSolver):
             print("found by trying every shape", len(to_update))
 
         if to_update:
-            return self._solve_updates_map(to_update)
+            return self._solve_updates_map(to_update, "every_shape")
 
         if not self.check_all_connected():
             if self.debug:
@@ -0,0 +1,93 @@
+import re
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def normalize_puzzle_string(string):
+    """Strips comments, blank lines and redundant whitespace, so that puzzles
+    which parse to the same grid also share the same cache key"""
+    lines = (re.sub(r"\s+", " ", line.strip()) for line in string.split("\n"))
+    return "\n".join(line for line in lines if line and not line.startswith("#"))
+
+
+class SolutionCache:
+    """Persistent map from puzzle inputs to their solutions, backed by sqlite.
+    Once more than max_entries are stored the least recently used are evicted."""
+
+    path: str
+    max_entries: int
+    connection: sqlite3.Connection
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            " key TEXT PRIMARY KEY,"
+            " solutions BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)"
+        )
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()
+        return count
+
+    @staticmethod
+    def make_key(puzzle_type, string, **options):
+        """Options are the solver arguments which change the returned solutions"""
+        digest = hashlib.sha256(normalize_puzzle_string(string).encode()).hexdigest()
+        encoded_options = json.dumps(options, sort_keys=True)
+        return f"{puzzle_type}:{digest}:{encoded_options}"
+
+    def get(self, key):
+        row = self.connection.execute(
+            "SELECT solutions FROM solutions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        self.connection.execute(
+            "UPDATE solutions SET last_used = ? WHERE key = ?", (time.time(), key)
+        )
+        self.connection.commit()
+
+        return pickle.loads(row[0])
+
+    def put(self, key, solutions):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO solutions (key, solutions, last_used)"
+            " VALUES (?, ?, ?)",
+            (key, pickle.dumps(solutions), time.time()),
+        )
+        self._evict()
+        self.connection.commit()
+
+    def _evict(self):
+        self.connection.execute(
+            "DELETE FROM solutions WHERE key IN ("
+            " SELECT key FROM solutions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self):
+        self.connection.execute("DELETE FROM solutions")
+        self.connection.commit()
@@ -0,0 +1,113 @@
+import sys
+import json
+import mmap
+import struct
+
+CONTAINER_MAGIC = b"LPC1"
+# index offset and puzzle count, followed by the magic
+FOOTER = struct.Struct("<QQ4s")
+
+
+class PuzzleContainerWriter:
+    """Writes puzzles of one type into a container: the magic, a JSON header,
+    the puzzle strings one after the other, then an index of their byte
+    offsets as uint64s and a footer pointing to the index. The index is
+    written on close, so puzzles can be added one at a time."""
+
+    file: object
+    offsets: list[int]
+
+    def __init__(self, path, puzzle_type):
+        self.file = open(path, "wb")
+        self.offsets = []
+
+        header = json.dumps({"puzzle": puzzle_type}).encode()
+        self.file.write(CONTAINER_MAGIC + struct.pack("<I", len(header)) + header)
+
+    def add(self, string):
+        self.offsets.append(self.file.tell())
+        self.file.write(string.encode())
+
+    def close(self):
+        end = self.file.tell()
+        # align the index so that it can be read in place as an array
+        padding = -end % 8
+        self.file.write(b"\0" * padding)
+
+        index_offset = end + padding
+        self.file.write(struct.pack(f"<{len(self.offsets) + 1}Q", *self.offsets, end))
+        self.file.write(FOOTER.pack(index_offset, len(self.offsets), CONTAINER_MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PuzzleContainer:
+    """Memory maps a container, puzzles are only decoded and parsed when
+    accessed, so workers can each read their own shard of a large corpus"""
+
+    puzzle_type: str
+    puzzle_cls: type | None
+    offsets: memoryview | tuple[int]
+
+    def __init__(self, path, puzzle_cls=None):
+        self.puzzle_cls = puzzle_cls
+        with open(path, "rb") as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.mmap[: len(CONTAINER_MAGIC)] != CONTAINER_MAGIC:
+            raise ValueError("Not a puzzle container")
+
+        index_offset, count, magic = FOOTER.unpack(self.mmap[-FOOTER.size :])
+        if magic != CONTAINER_MAGIC:
+            raise ValueError("Truncated puzzle container")
+
+        start = len(CONTAINER_MAGIC)
+        (header_size,) = struct.unpack("<I", self.mmap[start : start + 4])
+        header = json.loads(self.mmap[start + 4 : start + 4 + header_size])
+        self.puzzle_type = header["puzzle"]
+
+        index_end = index_offset + 8 * (count + 1)
+        if sys.byteorder == "little":
+            self.offsets = memoryview(self.mmap)[index_offset:index_end].cast("Q")
+        else:
+            self.offsets = struct.unpack(
+                f"<{count + 1}Q", self.mmap[index_offset:index_end]
+            )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get_string(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.mmap[self.offsets[i] : self.offsets[i + 1]].decode()
+
+    def get_puzzle(self, i):
+        return self.puzzle_cls.from_string(self.get_string(i))
+
+    def get_shard(self, shard, shard_count):
+        """The range of indices of a shard, shards are contiguous and their
+        sizes differ by at most one"""
+        return range(
+            len(self) * shard // shard_count, len(self) * (shard + 1) // shard_count
+        )
+
+    def iter_puzzles(self, indices=None):
+        for i in indices if indices is not None else range(len(self)):
+            yield i, self.get_puzzle(i)
+
+    def close(self):
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,75 @@
+from array import array
+
+
+class CounterLayout:
+    """Assigns the counters of a puzzle their offsets in a flat array, it is
+    built once per puzzle and shared by all of its states. Keys are
+    (group, value) pairs, e.g. (row, value), and counters are laid out group
+    by group so the counter of a key is at the offset of its group plus the
+    offset of its value. A layout without values is keyed by groups only."""
+
+    __slots__ = ("group_offsets", "value_offsets", "size")
+
+    group_offsets: dict
+    value_offsets: dict | None
+    size: int
+
+    def __init__(self, groups, values=None):
+        stride = 1
+        self.value_offsets = None
+        if values is not None:
+            self.value_offsets = {value: i for i, value in enumerate(values)}
+            stride = len(self.value_offsets)
+
+        self.group_offsets = {group: i * stride for i, group in enumerate(groups)}
+        self.size = len(self.group_offsets) * stride
+
+    def offset(self, key):
+        if self.value_offsets is None:
+            return self.group_offsets[key]
+
+        group, value = key
+        return self.group_offsets[group] + self.value_offsets[value]
+
+    def new_counters(self, typecode="i", initial=0):
+        return Counters(self, array(typecode, [initial]) * self.size)
+
+
+class Counters:
+    """Array backed replacement for a dict of counters with a fixed set of
+    keys. Hot paths should precompute offsets through the layout and access
+    values directly, rather than going through the key lookups."""
+
+    __slots__ = ("layout", "values")
+
+    layout: CounterLayout
+    values: array
+
+    def __init__(self, layout, values):
+        self.layout = layout
+        self.values = values
+
+    def __getitem__(self, key):
+        layout = self.layout
+        if layout.value_offsets is None:
+            return self.values[layout.group_offsets[key]]
+
+        group, value = key
+        return self.values[layout.group_offsets[group] + layout.value_offsets[value]]
+
+    def __setitem__(self, key, count):
+        self.values[self.layout.offset(key)] = count
+
+    def add(self, key, delta):
+        """Same as counters[key] += delta, with a single lookup"""
+        self.values[self.layout.offset(key)] += delta
+
+    def __len__(self):
+        return len(self.values)
+
+    def __copy__(self):
+        return Counters(self.layout, array(self.values.typecode, self.values))
+
+    def __deepcopy__(self, memo):
+        # the layout is immutable and shared
+        return self.__copy__()
@@ -0,0 +1,92 @@
+import json
+import struct
+from itertools import chain
+
+PACKED_MAGIC = b"LPS1"
+SYMBOL_RECORD = 1
+SHAPE_RECORD = 2
+GRID_RECORD = 3
+MAX_SYMBOLS = 256
+
+
+def dump_solution_line(grid, file):
+    """Writes a decision grid as a single line of compact JSON"""
+    file.write(json.dumps(grid, separators=(",", ":"), ensure_ascii=False))
+    file.write("\n")
+
+
+def iter_solution_lines(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+class PackedSolutionWriter:
+    """Binary form of the decision grids, for bulk runs. After the magic the
+    stream is a sequence of records, each starting with a tag byte:
+    - SYMBOL_RECORD, uint16 length, JSON of the value getting the next code
+    - SHAPE_RECORD, uint16 row count, uint16 length of each row
+    - GRID_RECORD, one code byte per cell, row by row
+    Code 0 is None, symbols and shapes are only written when first needed."""
+
+    file: object
+    codes: dict
+    shape: tuple[int] | None
+
+    def __init__(self, file):
+        self.file = file
+        self.codes = {None: 0}
+        self.shape = None
+        self.file.write(PACKED_MAGIC)
+
+    def _add_symbol(self, value):
+        if len(self.codes) >= MAX_SYMBOLS:
+            raise ValueError(f"More than {MAX_SYMBOLS} distinct values to pack")
+
+        self.codes[value] = len(self.codes)
+        data = json.dumps(value, separators=(",", ":")).encode()
+        self.file.write(struct.pack("<BH", SYMBOL_RECORD, len(data)) + data)
+
+    def write(self, grid):
+        shape = tuple(len(row) for row in grid)
+        if shape != self.shape:
+            self.shape = shape
+            self.file.write(
+                struct.pack(f"<BH{len(shape)}H", SHAPE_RECORD, len(shape), *shape)
+            )
+
+        values = list(chain.from_iterable(grid))
+        try:
+            cells = bytes(map(self.codes.__getitem__, values))
+        except KeyError:
+            for value in values:
+                if value not in self.codes:
+                    self._add_symbol(value)
+            cells = bytes(map(self.codes.__getitem__, values))
+
+        self.file.write(bytes((GRID_RECORD,)) + cells)
+
+
+def iter_packed_solutions(file):
+    """Reads back the decision grids written by a PackedSolutionWriter"""
+    if file.read(len(PACKED_MAGIC)) != PACKED_MAGIC:
+        raise ValueError("Not a packed solutions file")
+
+    symbols = [None]
+    shape = ()
+    while tag := file.read(1):
+        if tag[0] == SYMBOL_RECORD:
+            (length,) = struct.unpack("<H", file.read(2))
+            symbols.append(json.loads(file.read(length)))
+        elif tag[0] == SHAPE_RECORD:
+            (rows,) = struct.unpack("<H", file.read(2))
+            shape = struct.unpack(f"<{rows}H", file.read(2 * rows))
+        elif tag[0] == GRID_RECORD:
+            cells = file.read(sum(shape))
+            grid, start = [], 0
+            for length in shape:
+                grid.append([symbols[x] for x in cells[start : start + length]])
+                start += length
+            yield grid
+        else:
+            raise ValueError(f"Unknown record tag {tag[0]}")
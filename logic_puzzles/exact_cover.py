@@ -0,0 +1,147 @@
+class DancingLinks:
+    """Knuth's Algorithm X with dancing links. The 0/1 matrix is stored as
+    circular doubly linked lists in flat arrays: node 0 is the root, nodes
+    1..n are the column headers and the others are the ones of the rows.
+    Columns are the constraints to satisfy exactly once, rows the choices."""
+
+    column_ids: list
+    row_ids: list
+    left: list[int]
+    right: list[int]
+    up: list[int]
+    down: list[int]
+    column: list[int]  # node -> column header
+    row: list[int]  # node -> index in row_ids
+    size: list[int]  # column header -> ones left in the column
+
+    def __init__(self, columns, rows):
+        """columns is a list of column ids, rows a map from row ids to the
+        list of column ids of their ones"""
+        self.column_ids = list(columns)
+        self.row_ids = []
+        n = len(self.column_ids)
+        index = {column: i + 1 for i, column in enumerate(self.column_ids)}
+
+        self.left = [n] + list(range(n))
+        self.right = list(range(1, n + 1)) + [0]
+        self.up = list(range(n + 1))
+        self.down = list(range(n + 1))
+        self.column = list(range(n + 1))
+        self.row = [-1] * (n + 1)
+        self.size = [0] * (n + 1)
+
+        for row_id, row_columns in rows.items():
+            first = None
+            for column_id in row_columns:
+                header = index[column_id]
+                node = len(self.column)
+                self.column.append(header)
+                self.row.append(len(self.row_ids))
+                self.size[header] += 1
+
+                self.up.append(self.up[header])
+                self.down.append(header)
+                self.down[self.up[header]] = node
+                self.up[header] = node
+
+                if first is None:
+                    first = node
+                    self.left.append(node)
+                    self.right.append(node)
+                else:
+                    self.left.append(self.left[first])
+                    self.right.append(first)
+                    self.right[self.left[first]] = node
+                    self.left[first] = node
+
+            self.row_ids.append(row_id)
+
+    def _cover(self, header):
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, header):
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def search(self, stats=None, check=None):
+        """Yields each exact cover as the list of its row ids. Branches on the
+        column with the fewest ones, recording the guesses in a SearchStats if
+        given, check is called at every node, e.g. to time out."""
+        yield from self._search([], stats, check)
+
+    def _search(self, chosen, stats, check):
+        if check is not None:
+            check()
+
+        right, down, size = self.right, self.down, self.size
+        if right[0] == 0:
+            yield [self.row_ids[x] for x in chosen]
+            return
+
+        header, best = None, None
+        j = right[0]
+        while j != 0:
+            if best is None or size[j] < best:
+                header, best = j, size[j]
+                if best <= 1:
+                    break
+            j = right[j]
+
+        if best == 0:
+            if stats is not None:
+                stats.dead_ends += 1
+            return
+
+        # a column with a single one is forced, only guesses count as branches
+        branching = stats is not None and best > 1
+        if branching:
+            stats.enter_branch(best)
+
+        column, left = self.column, self.left
+        self._cover(header)
+        node = down[header]
+        while node != header:
+            chosen.append(self.row[node])
+            j = right[node]
+            while j != node:
+                self._cover(column[j])
+                j = right[j]
+
+            yield from self._search(chosen, stats, check)
+
+            j = left[node]
+            while j != node:
+                self._uncover(column[j])
+                j = left[j]
+            chosen.pop()
+            node = down[node]
+
+        self._uncover(header)
+        if branching:
+            stats.leave_branch()
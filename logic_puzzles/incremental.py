@@ -0,0 +1,176 @@
+import time
+from .solver import SolverTargetReachedException
+
+
+class IncrementalSession:
+    """Keeps the puzzle at the fixpoint of the propagation of its clues, so
+    that after a clue is applied or retracted only the affected part of the
+    propagation is redone. Every value deduced by propagation records the
+    clues it depends on, i.e. the clues which reached it through the cells
+    marked dirty by _compute_dirty, so retracting a clue only undoes the values
+    depending on it. This relies on _compute_dirty returning all the cells
+    whose valid values can change when a cell is set.
+
+    The solutions of the last verdict are reused when they are enough to give
+    the new one: applying a clue can only remove solutions and retracting one
+    can only add solutions, a search only runs when the verdict may change."""
+
+    clues: set  # locations set as clues
+    conflicts: dict  # location -> value, clues which could not be set
+    deduced: dict  # location -> clues it depends on, in order of deduction
+    influences: dict  # unset location -> clues of the cells which dirtied it
+    failed: bool  # whether the propagation met a contradiction
+    solutions: list
+    complete: bool  # whether the solutions are all the solutions
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.puzzle = solver.puzzle
+        self.clues = set(
+            x for x in self.puzzle.iter_locations() if solver.is_location_set(x)
+        )
+        self.conflicts = {}
+        self.deduced = {}
+        self._rebuild_influences()
+        self.failed = not self._propagate(set(self.puzzle.iter_locations()))
+        self._search()
+
+    def _get_dependencies(self, location):
+        if location in self.clues:
+            return (location,)
+        return self.deduced[location]
+
+    def _add_influences(self, location):
+        dependencies = self._get_dependencies(location)
+        for dirty in self.solver._compute_dirty(location):
+            self.influences.setdefault(dirty, set()).update(dependencies)
+
+    def _rebuild_influences(self):
+        self.influences = {}
+        for location in self.clues:
+            self._add_influences(location)
+        for location in self.deduced:
+            self._add_influences(location)
+
+    def _propagate(self, dirty):
+        """Same as SimpleBranchingSolver._update_all_dirty, but the deduced
+        values are kept along with their dependencies"""
+        while dirty:
+            location = dirty.pop()
+            if self.solver.is_location_set(location):
+                continue
+
+            valid_values = self.puzzle.get_valid_values(location)
+            if len(valid_values) == 0:
+                return False
+            if len(valid_values) > 1:
+                continue
+
+            self.puzzle.set_value(location, valid_values[0])
+            self.deduced[location] = frozenset(self.influences.pop(location, ()))
+            self._add_influences(location)
+            dirty.update(self.solver._compute_dirty(location))
+
+        return True
+
+    def _set_solutions(self, solutions, complete):
+        self.solutions = self.solver.solutions = solutions
+        self.complete = complete
+        return solutions
+
+    def _search(self):
+        if self.failed or self.conflicts:
+            return self._set_solutions([], True)
+
+        solver = self.solver
+        self._set_solutions([], True)
+        # the search is not unwound when the target is reached
+        root_state = self.puzzle.state.copy()
+        solver.start_time = time.time()
+        try:
+            solver._branching_solve()
+        except SolverTargetReachedException:
+            self.complete = False
+        finally:
+            self.puzzle.set_state(root_state)
+
+        return self.solutions
+
+    def _is_verdict_reached(self):
+        target = self.solver.target_solutions
+        return target is not None and len(self.solutions) >= target
+
+    def _set_clue(self, location, value):
+        """Sets a clue and propagates it, returns whether it could be set"""
+        if location in self.deduced or not self.puzzle.can_set(location, value):
+            if self.puzzle.get_value(location) != value:
+                self.conflicts[location] = value
+                return False
+
+            # already deduced, from now on it is kept as a clue
+            del self.deduced[location]
+            self.clues.add(location)
+            self._rebuild_influences()
+            return True
+
+        self.puzzle.set_value(location, value)
+        self.clues.add(location)
+        self._add_influences(location)
+        if not self._propagate(set(self.solver._compute_dirty(location))):
+            self.failed = True
+
+        return True
+
+    def apply_clue(self, location, value):
+        """Sets the value of a location as a clue, returns the solutions"""
+        if location in self.clues or location in self.conflicts:
+            self.retract_clue(location)
+
+        if not self._set_clue(location, value) or self.failed:
+            return self._set_solutions([], True)
+
+        solutions = [
+            x
+            for x in self.solutions
+            if self.puzzle.get_state_value(x, location) == value
+        ]
+        self._set_solutions(solutions, self.complete)
+        if self.complete or self._is_verdict_reached():
+            return self.solutions
+
+        return self._search()
+
+    def retract_clue(self, location):
+        """Removes a clue, returns the solutions"""
+        if location in self.conflicts:
+            del self.conflicts[location]
+            return self._search()
+
+        if location not in self.clues:
+            raise ValueError(f"{location} is not a clue")
+
+        self.clues.remove(location)
+        invalid = [x for x, clues in self.deduced.items() if location in clues]
+        for x in reversed(invalid):
+            self.puzzle.unset_value(x)
+            del self.deduced[x]
+        self.puzzle.unset_value(location)
+        self._rebuild_influences()
+
+        was_consistent = not self.failed and not self.conflicts
+        if self.failed:
+            # the propagation may have stopped midway, redo all of it
+            self.failed = not self._propagate(set(self.puzzle.iter_locations()))
+        else:
+            # candidates can only grow, only the values undone can be forced
+            self._propagate(set(invalid + [location]))
+
+        # the conflicting clues may fit now
+        conflicts, self.conflicts = self.conflicts, {}
+        for x, value in conflicts.items():
+            self._set_clue(x, value)
+
+        if was_consistent and self._is_verdict_reached():
+            return self.solutions
+
+        return self._search()
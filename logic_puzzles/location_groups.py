@@ -0,0 +1,36 @@
+from types import MappingProxyType
+from .sudoku_rules import get_families
+
+
+class LocationGroups:
+    """Index of the groups of locations holding each value once, e.g. the
+    rows, columns and squares of a Sudoku. It is built once per puzzle, see
+    the location_groups of the puzzles, and shared by the solvers and their
+    deduction rules instead of rebuilding the groups at every node. Groups
+    are tuples and lookups are read-only mappings, as they must not change."""
+
+    __slots__ = ("groups", "by_location", "peers", "families")
+
+    groups: tuple[tuple, ...]
+    by_location: MappingProxyType  # location -> indices of its groups
+    peers: MappingProxyType  # location -> the other locations of its groups
+    families: tuple[tuple[int, ...], ...]  # see sudoku_rules.get_families
+
+    def __init__(self, groups):
+        self.groups = tuple(tuple(group) for group in groups)
+
+        by_location, peers = {}, {}
+        for i, group in enumerate(self.groups):
+            for location in group:
+                by_location.setdefault(location, []).append(i)
+                peers.setdefault(location, {}).update(
+                    (x, None) for x in group if x != location
+                )
+
+        self.by_location = MappingProxyType(
+            {location: tuple(x) for location, x in by_location.items()}
+        )
+        self.peers = MappingProxyType(
+            {location: tuple(x) for location, x in peers.items()}
+        )
+        self.families = tuple(tuple(x) for x in get_families(self.groups))
@@ -0,0 +1,218 @@
+import os
+import sys
+import signal
+import pstats
+import cProfile
+from collections import Counter
+
+PUZZLE_METHODS = ("can_set", "set_value", "unset_value", "get_valid_values")
+SOLVER_METHODS = ("_compute_dirty", "get_branching_score")
+# the deductions the solvers run before branching, see SimpleBranchingSolver
+PROPAGATOR_METHODS = (
+    # SudokuLike
+    "find_hidden_singles",
+    "get_locations_by_value",
+    "find_eliminations",
+    "_find_singles",
+    # binairo
+    "try_all_single_missing",
+    "_try_combination",
+    # kakurasu
+    "find_impossible_sums",
+    # lits
+    "try_every_shape",
+    "_try_placing",
+    "check_all_connected",
+    # minesweeper
+    "_find_placements_around_indicators",
+    "_check_mine_placements",
+    # slant
+    "try_all_combinations",
+    "_test_combination",
+)
+# modules that belong to a layer as a whole
+MODULE_LAYERS = {
+    ("logic_puzzles", "sudoku_rules.py"): "propagators",
+    ("logic_puzzles", "exact_cover.py"): "search",
+    ("jigsaw_sudoku", "leftovers.py"): "propagators",
+    ("sudoku_variants", "constraints.py"): "puzzle",
+}
+LAYERS = ("puzzle", "solver", "propagators", "search", "other")
+
+
+def get_layer(function):
+    """Which part of the code a pstats function entry belongs to, the puzzle
+    representation, the solver heuristics, the solver specific propagators
+    or the generic search. The rest is "other", e.g. the helpers of the
+    puzzles and solvers, whose time is charged to their callers."""
+    filename, _, name = function
+    path = os.path.normpath(filename).split(os.sep)
+    module = tuple(path[-2:])
+    if module in MODULE_LAYERS:
+        return MODULE_LAYERS[module]
+    if module == ("logic_puzzles", "solver.py"):
+        return "solver" if name in SOLVER_METHODS else "search"
+    if path[-1] == "puzzle.py" and name in PUZZLE_METHODS:
+        return "puzzle"
+    if path[-1] in ("solver.py", "sudoku_like.py"):
+        if name in SOLVER_METHODS:
+            return "solver"
+        if name in PROPAGATOR_METHODS:
+            return "propagators"
+    return "other"
+
+
+def get_frame_name(code):
+    path = os.path.normpath(code.co_filename).split(os.sep)
+    return f"{'/'.join(path[-2:])}:{code.co_name}"
+
+
+class Profiler:
+    """Runs cProfile along with a stack sampler, on exit writes the pstats to
+    {path}.pstats and the sampled stacks to {path}.collapsed, which is the
+    input format of flamegraph.pl and most flame graph viewers. Sampling
+    relies on SIGPROF and is skipped where it is not available."""
+
+    path: str
+    sample_interval: float
+    profile: cProfile.Profile
+    samples: Counter
+    stats: pstats.Stats
+
+    def __init__(self, path, sample_interval=0.001):
+        self.path = path
+        self.sample_interval = sample_interval
+        self.profile = cProfile.Profile()
+        self.samples = Counter()
+        self.stats = None
+        self._previous_handler = None
+        self._sampling = False
+
+    @property
+    def can_sample(self):
+        return hasattr(signal, "setitimer")
+
+    def _sample(self, signum, frame):
+        if self._sampling:
+            # a sample can take longer than the interval, e.g. under
+            # tracemalloc, the nested signals are dropped
+            return
+
+        self._sampling = True
+        try:
+            stack = []
+            while frame is not None:
+                stack.append(get_frame_name(frame.f_code))
+                frame = frame.f_back
+
+            self.samples[";".join(reversed(stack))] += 1
+        finally:
+            self._sampling = False
+
+    def __enter__(self):
+        if self.can_sample:
+            self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+            signal.setitimer(
+                signal.ITIMER_PROF, self.sample_interval, self.sample_interval
+            )
+
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+
+        if self.can_sample:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler)
+
+        self.stats = pstats.Stats(self.profile)
+        self.stats.dump_stats(f"{self.path}.pstats")
+
+        if self.can_sample:
+            with open(f"{self.path}.collapsed", "w") as file:
+                for stack, count in self.samples.most_common():
+                    print(stack, count, file=file)
+
+    def get_charged_layer(self, function, charged=None):
+        """The layer the time of a function is charged to, its own one or
+        for the "other" functions the one of the caller they spent the most
+        time for, up the call graph"""
+        charged = {} if charged is None else charged
+        if function in charged:
+            # "other" while in progress, for recursive calls
+            return charged[function]
+
+        charged[function] = layer = get_layer(function)
+        callers = self.stats.stats.get(function, (None,) * 5)[4]
+        if layer == "other" and callers:
+            caller = max(callers, key=lambda x: callers[x][2])
+            charged[function] = self.get_charged_layer(caller, charged)
+
+        return charged[function]
+
+    def get_layer_times(self):
+        """Self time spent in each layer, builtins and helpers are charged to
+        the layers of their callers"""
+        res = {layer: 0.0 for layer in LAYERS}
+        charged = {}
+        for function, (_, _, tt, _, callers) in self.stats.stats.items():
+            layer = get_layer(function)
+            if layer != "other" or not callers:
+                res[layer] += tt
+                continue
+
+            for caller, (_, _, caller_tt, _) in callers.items():
+                res[self.get_charged_layer(caller, charged)] += caller_tt
+
+        return res
+
+    def get_method_stats(self):
+        """Calls, self time and cumulative time of the puzzle API methods, of
+        the solver heuristics and of the propagators, by layer and name"""
+        res = {}
+        for function, (_, nc, tt, ct, _) in self.stats.stats.items():
+            layer, name = get_layer(function), function[2]
+            if layer not in ("puzzle", "solver", "propagators"):
+                continue
+            if name.startswith("<"):
+                # comprehensions and lambdas, their time is in their callers
+                continue
+
+            calls, total_tt, total_ct = res.get((layer, name), (0, 0.0, 0.0))
+            res[layer, name] = (calls + nc, total_tt + tt, total_ct + ct)
+
+        return res
+
+    def print_summary(self, file=sys.stderr, limit=10):
+        layer_times = self.get_layer_times()
+        total_time = sum(layer_times.values()) or 1.0
+
+        print("Self time by layer:", file=file)
+        for layer, layer_time in layer_times.items():
+            print(
+                f"  {layer:<12} {layer_time:9.3f}s {layer_time / total_time:6.1%}",
+                file=file,
+            )
+
+        print("Methods by layer:", file=file)
+        print(
+            f"  {'layer':<12} {'method':<36} {'calls':>10} {'tottime':>9} {'cumtime':>9}",
+            file=file,
+        )
+        method_stats = self.get_method_stats()
+        for layer in ("puzzle", "solver", "propagators"):
+            rows = sorted(
+                (
+                    (name, x)
+                    for (x_layer, name), x in method_stats.items()
+                    if x_layer == layer
+                ),
+                key=lambda x: x[1][1],
+                reverse=True,
+            )
+            for name, (calls, tt, ct) in rows[:limit]:
+                print(
+                    f"  {layer:<12} {name:<36} {calls:>10} {tt:8.3f}s {ct:8.3f}s",
+                    file=file,
+                )
@@ -0,0 +1,97 @@
+import time
+from collections import namedtuple
+
+ProgressReport = namedtuple(
+    "ProgressReport",
+    ["elapsed", "nodes", "estimated_nodes", "done", "remaining_seconds"],
+)
+
+
+class SearchProgress:
+    """Estimates the size of the search tree while it is being explored.
+    Every leaf reached is a probe in the sense of Knuth: the product of the
+    branching factors on its path estimates the tree size. Depth first search
+    does not pick leaves at random, so each probe is weighted by the chance a
+    random probe had of reaching it (the weighted backtrack estimator). The
+    same weights, summed over the leaves, give the fraction of the tree done.
+    """
+
+    callback: callable
+    interval: float
+    start_time: float
+    next_report: float
+    nodes: int
+    expansions: int
+    done: float
+    weighted_estimates: float
+    # by depth: weight of the children, product of the branching factors,
+    # Knuth estimate of the nodes on the path, expansions before the child
+    path: list[list]
+
+    def __init__(self, callback, interval=1.0):
+        self.callback = callback
+        self.interval = interval
+        self.start_time = time.monotonic()
+        self.next_report = self.start_time + interval
+        self.nodes = 1
+        self.expansions = 0
+        self.done = 0.0
+        self.weighted_estimates = 0.0
+        self.path = [[1.0, 1, 1, 0]]
+
+    def enter(self, branching_factor):
+        """A node is branching into its children"""
+        weight, product, path_nodes, _ = self.path[-1]
+        product *= branching_factor
+        self.expansions += 1
+        self.path.append([weight / branching_factor, product, path_nodes + product, 0])
+
+    def start_child(self):
+        self.nodes += 1
+        self.path[-1][3] = self.expansions
+
+        now = time.monotonic()
+        if now >= self.next_report:
+            self.next_report = now + self.interval
+            self.callback(self.get_report())
+
+    def end_child(self):
+        weight, _, path_nodes, expansions = self.path[-1]
+        if expansions == self.expansions:
+            # the child did not branch, it is a leaf
+            self.done += weight
+            self.weighted_estimates += weight * path_nodes
+
+    def leave(self):
+        self.path.pop()
+
+    def get_estimated_nodes(self):
+        if self.done == 0:
+            return None
+        return max(self.nodes, self.weighted_estimates / self.done)
+
+    def get_report(self):
+        elapsed = time.monotonic() - self.start_time
+        estimated_nodes = self.get_estimated_nodes()
+        remaining = None
+        if estimated_nodes is not None:
+            remaining = elapsed * (estimated_nodes - self.nodes) / self.nodes
+
+        return ProgressReport(
+            elapsed, self.nodes, estimated_nodes, self.done, remaining
+        )
+
+    def finish(self):
+        if self.expansions == 0:
+            # solved without branching
+            self.done, self.weighted_estimates = 1.0, 1.0
+        self.callback(self.get_report())
+
+
+def format_report(report):
+    res = f"{report.elapsed:.1f}s, {report.nodes} nodes"
+    if report.estimated_nodes is not None:
+        res += f" of ~{report.estimated_nodes:.3g} ({report.done:.1%})"
+    if report.remaining_seconds is not None:
+        res += f", ~{report.remaining_seconds:.0f}s left"
+    return res
@@ -4,6 +4,8 @@ from abc import ABC, abstractclassmethod, abstractmethod
 
 
 class PuzzleState:
+    __slots__ = ()
+
     def copy(self):
         return copy.deepcopy(self)
 
@@ -38,6 +40,31 @@ class Puzzle(ABC):
     def reset_state(self):
         return self.set_state(None)
 
+    def encode_solution(self, state):
+        """The decisions of a state as a list of rows of ints, strings or None,
+        see logic_puzzles/encoding.py"""
+        return state.grid
+
+    def get_state_value(self, state, location):
+        """The value of a location within another state, e.g. a solution"""
+        old_state = self.set_state(state)
+        try:
+            return self.get_value(location)
+        finally:
+            self.state = old_state
+
+    @abstractmethod
+    def validate(self, state):
+        """Whether a state is a solution, checking the rules of the puzzle
+        directly rather than replaying the solver, see
+        logic_puzzles/validation.py"""
+        raise NotImplementedError
+
+    def validate_batch(self, states):
+        """Validates many solutions at once, puzzles may override it with
+        checks vectorized through NumPy"""
+        return [self.validate(state) for state in states]
+
     def get_valid_values(self, location):
         return [value for value in self.iter_values() if self.can_set(location, value)]
 
@@ -0,0 +1,75 @@
+import math
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from .solver import SimpleBranchingSolver, SolverTimeoutException
+
+# cost of each deduction layer, per doubling of the cells it found, the
+# naked singles are the cheapest but the only ones reported by the solvers
+# deducing within can_set, e.g. Kakuro
+LAYER_WEIGHTS = {
+    "naked_singles": 0.5,
+    "hidden_singles": 1.0,
+    "single_missing": 1.0,
+    "indicator_placements": 1.0,
+    "impossible_sums": 2.0,
+    "combinations": 2.0,
+    "every_shape": 2.0,
+}
+DEFAULT_LAYER_WEIGHT = 2.0
+BRANCHES_WEIGHT = 10.0
+DEAD_ENDS_WEIGHT = 2.0
+DEPTH_WEIGHT = 5.0
+
+# score is None when the solve timed out, the stats are the partial ones
+Rating = namedtuple(
+    "Rating", ["score", "solutions", "stats", "timed_out"], defaults=(False,)
+)
+
+
+def get_score(stats):
+    """Difficulty of a solve from its SearchStats. Branching dominates, then
+    how deep the guesses had to go and how many of them failed, then which
+    deductions were needed."""
+    score = BRANCHES_WEIGHT * math.log2(1 + stats.branches)
+    score += DEAD_ENDS_WEIGHT * math.log2(1 + stats.dead_ends)
+    score += DEPTH_WEIGHT * stats.max_depth
+    for layer, count in stats.deductions.items():
+        score += LAYER_WEIGHTS.get(layer, DEFAULT_LAYER_WEIGHT) * math.log2(1 + count)
+
+    return round(score, 2)
+
+
+def rate_puzzle(puzzle, solver_cls, **solver_kwargs):
+    """Solves the puzzle looking for a second solution, so that the whole
+    search tree of a unique puzzle is explored. Branching is never randomized,
+    which makes the score the same on every run. Only the solvers built on
+    SimpleBranchingSolver record the stats the score is made of."""
+    if not issubclass(solver_cls, SimpleBranchingSolver):
+        raise ValueError(f"{solver_cls.__name__} does not support rating")
+
+    solver = solver_cls(
+        puzzle, target_solutions=2, randomize_branching=False, **solver_kwargs
+    )
+    try:
+        solutions = solver.solve()
+    except SolverTimeoutException:
+        return Rating(None, len(solver.solutions), solver.stats.as_dict(), True)
+
+    return Rating(get_score(solver.stats), len(solutions), solver.stats.as_dict())
+
+
+def _rate_string(task):
+    puzzle_cls, solver_cls, string, solver_kwargs = task
+    return rate_puzzle(puzzle_cls.from_string(string), solver_cls, **solver_kwargs)
+
+
+def rate_corpus(puzzle_cls, solver_cls, strings, jobs=None, **solver_kwargs):
+    """Rates each puzzle string on a pool of jobs processes, yielding the
+    ratings in order"""
+    tasks = ((puzzle_cls, solver_cls, string, solver_kwargs) for string in strings)
+    if jobs == 1:
+        yield from map(_rate_string, tasks)
+        return
+
+    with ProcessPoolExecutor(jobs) as executor:
+        yield from executor.map(_rate_string, tasks, chunksize=8)
@@ -1,4 +1,9 @@
 from .puzzle import Puzzle, PuzzleState
+from .progress import SearchProgress
+from .stats import SearchStats
+from .spill import SolutionBuffer
+from .trace import SearchTraceWriter
+from .value_order import VALUE_ORDERS
 import time
 import random
 from abc import ABC, abstractmethod
@@ -21,9 +26,18 @@ class Solver(ABC):
     puzzle: Puzzle
     target_solutions: int
     timeout_seconds: float
-    solutions: list[PuzzleState]
+    solutions: list[PuzzleState] | SolutionBuffer
     start_time: float
     randomize_branching: bool
+    seed: int | None
+    random: random.Random
+    progress_callback: callable
+    progress_interval: float
+    progress: SearchProgress | None
+    stats: SearchStats
+    spill_threshold: int | None
+    spill_path: str | None
+    trace: SearchTraceWriter | None
 
     def __init__(
         self,
@@ -32,14 +46,29 @@ class Solver(ABC):
         target_solutions=None,
         timeout_seconds=None,
         randomize_branching=False,
+        progress_callback=None,
+        progress_interval=1.0,
+        spill_threshold=None,
+        spill_path=None,
+        trace=None,
+        seed=None,
     ):
         self.puzzle = puzzle
         self.debug = debug
         self.target_solutions = target_solutions
         self.timeout_seconds = timeout_seconds
         self.randomize_branching = randomize_branching
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self.spill_threshold = spill_threshold
+        self.spill_path = spill_path
+        self.trace = trace
         self.solutions = None
         self.start_time = None
+        self.progress = None
+        self.stats = SearchStats()
 
     @property
     def state(self):
@@ -50,6 +79,8 @@ class Solver(ABC):
         raise NotImplementedError
 
     def store_solution(self):
+        if self.trace is not None:
+            self.trace.solution()
         self.solutions.append(self.puzzle.state.copy())
         if self.debug:
             print(self.puzzle)
@@ -69,18 +100,43 @@ class Solver(ABC):
         if self.debug:
             self._debug_init()
 
+        if self.progress_callback is not None:
+            self.progress = SearchProgress(
+                self.progress_callback, self.progress_interval
+            )
+
         try:
-            self.solutions = []
+            self.solutions = self._make_solutions()
+            self.stats = SearchStats()
+            if self.randomize_branching:
+                # without a seed each run draws its own, recorded to replay it
+                seed = self.seed if self.seed is not None else random.randrange(2**32)
+                self.random.seed(seed)
+                self.stats.seed = seed
             self.start_time = time.time()
             self._solve()
         except SolverTargetReachedException:
             pass
+        finally:
+            if self.trace is not None:
+                self.trace.flush()
+
+        if self.progress is not None:
+            self.progress.finish()
 
         if self.debug:
             self._debug_complete()
 
         return self.solutions
 
+    def _make_solutions(self):
+        """Past spill_threshold solutions are flushed to disk, see
+        logic_puzzles/spill.py"""
+        if self.spill_threshold is None:
+            return []
+
+        return SolutionBuffer(self.spill_threshold, self.spill_path)
+
     def check_timeout(self):
         if self.timeout_seconds is not None:
             if time.time() - self.start_time > self.timeout_seconds:
@@ -89,11 +145,13 @@ class Solver(ABC):
     def branching_order(self, iterable):
         if self.randomize_branching:
             iterable = list(iterable)
-            random.shuffle(iterable)
+            self.random.shuffle(iterable)
 
         return iterable
 
     def clear_solutions(self):
+        if isinstance(self.solutions, SolutionBuffer):
+            self.solutions.close()
         self.solutions = None
         self.start_time = None
 
@@ -103,6 +161,28 @@ class Solver(ABC):
 
 
 class SimpleBranchingSolver(Solver, ABC):
+    # whether every constraint is between locations connected by
+    # _compute_dirty, which lets count_solutions split the puzzle
+    local_constraints: bool = False
+    _counting_scope: list | None = None  # locations being counted
+    _component_counts: dict | None = None  # residual state -> count
+    # the value tried first by the empty_first order, e.g. no mine, no tent
+    empty_value = 0
+    # used when no value_order is passed, see order_values
+    default_value_order: str | None = None
+    value_order: callable
+
+    def __init__(self, puzzle, *args, value_order=None, **kwargs):
+        super().__init__(puzzle, *args, **kwargs)
+        if value_order is None:
+            value_order = self.default_value_order
+        if isinstance(value_order, str):
+            if value_order not in VALUE_ORDERS:
+                raise ValueError(f"Unknown value order {value_order}")
+            value_order = VALUE_ORDERS[value_order]
+
+        self.value_order = value_order
+
     @abstractmethod
     def get_branching_score(self, location):
         raise NotImplementedError
@@ -145,15 +225,25 @@ class SimpleBranchingSolver(Solver, ABC):
         updated = self._update_all_dirty(dirty)
 
         if updated is None:
+            self.stats.dead_ends += 1
+            if self.trace is not None:
+                self.trace.dead_end()
             return 0
 
+        self.stats.add_deductions("naked_singles", len(updated))
+        if self.trace is not None:
+            self.trace.propagate(len(updated))
         res = self._branching_solve()
         for location in updated:
             self.puzzle.unset_value(location)
 
         return res
 
-    def _solve_updates_map(self, to_update):
+    def _solve_updates_map(self, to_update, layer="other"):
+        """Sets the values found by a deduction layer and keeps solving"""
+        self.stats.add_deductions(layer, len(to_update))
+        if self.trace is not None:
+            self.trace.deduce(layer, len(to_update))
         updated = []
         dirty = set()
 
@@ -173,11 +263,22 @@ class SimpleBranchingSolver(Solver, ABC):
 
         return res
 
+    def order_values(self, location, values):
+        """The order the values of a branch are tried in, value_order is a
+        name in VALUE_ORDERS or a function of the solver, the location and
+        the values, see logic_puzzles/value_order.py"""
+        if self.value_order is None:
+            return values
+
+        return self.value_order(self, location, values)
+
     def _debug_branching(self, location):
         print(f"Branching at {location}")
 
     def _branching_solve(self):
         self.check_timeout()
+        if self._counting_scope is not None:
+            return self._count_components()
 
         best_score, location = None, None
         for new_location in self.puzzle.iter_locations():
@@ -195,15 +296,152 @@ class SimpleBranchingSolver(Solver, ABC):
         if self.debug:
             self._debug_branching(location)
 
+        values = self.branching_order(self.puzzle.get_valid_values(location))
+        values = self.order_values(location, values)
+        self.stats.enter_branch(len(values))
+        progress, trace = self.progress, self.trace
+        if progress is not None:
+            progress.enter(len(values))
+        if trace is not None:
+            trace.branch(location, len(values))
+
         res = 0
-        for value in self.branching_order(self.puzzle.get_valid_values(location)):
+        for value in values:
+            if progress is not None:
+                progress.start_child()
+            if trace is not None:
+                trace.decide(value)
+
             self.puzzle.set_value(location, value)
             dirty = self._compute_dirty(location)
             res += self._solve_dirty(dirty)
             self.puzzle.unset_value(location)
 
+            if progress is not None:
+                progress.end_child()
+
+        if progress is not None:
+            progress.leave()
+        if trace is not None:
+            trace.backtrack()
+
+        self.stats.leave_branch()
         return res
 
     def _solve(self):
         dirty = set(self.puzzle.iter_locations())
         return self._solve_dirty(dirty)
+
+    def _split_components(self, locations):
+        """Splits the unset locations into the groups connected by
+        _compute_dirty, which can be assigned independently"""
+        if not self.local_constraints:
+            return [list(locations)] if locations else []
+
+        remaining = set(locations)
+        components = []
+        while remaining:
+            stack = [remaining.pop()]
+            component = []
+            while stack:
+                location = stack.pop()
+                component.append(location)
+                for neighbour in self._compute_dirty(location):
+                    if neighbour in remaining:
+                        remaining.remove(neighbour)
+                        stack.append(neighbour)
+            components.append(component)
+
+        return components
+
+    def _get_residual_key(self, component):
+        """What the number of assignments of a component depends on: the
+        component itself and the values of the set locations next to it"""
+        component_set = set(component)
+        boundary = frozenset(
+            (location, self.puzzle.get_value(location))
+            for location in self.puzzle.iter_locations()
+            if self.is_location_set(location)
+            and not component_set.isdisjoint(self._compute_dirty(location))
+        )
+        return frozenset(component), boundary
+
+    def _count_components(self):
+        """Counts the assignments of the unset locations of the component
+        being counted, multiplying the counts of its independent parts"""
+        scope = self._counting_scope
+        remaining = [x for x in scope if not self.is_location_set(x)]
+        res = 1
+        for component in self._split_components(remaining):
+            res *= self._count_component(component)
+            if res == 0:
+                break
+
+        self._counting_scope = scope
+        return res
+
+    def _count_component(self, component):
+        key = None
+        if self.local_constraints:
+            key = self._get_residual_key(component)
+            res = self._component_counts.get(key)
+            if res is not None:
+                return res
+
+        location = max(component, key=self.get_branching_score)
+        values = self.puzzle.get_valid_values(location)
+        self.stats.enter_branch(len(values))
+        trace = self.trace
+        if trace is not None:
+            trace.branch(location, len(values))
+
+        res = 0
+        for value in values:
+            if trace is not None:
+                trace.decide(value)
+            self._counting_scope = component
+            self.puzzle.set_value(location, value)
+            res += self._solve_dirty(self._compute_dirty(location))
+            self.puzzle.unset_value(location)
+
+        if trace is not None:
+            trace.backtrack()
+        self.stats.leave_branch()
+        if res and key is not None:
+            # a contradiction met in another component may have cut the
+            # search, zeros are only valid in the current context
+            self._component_counts[key] = res
+        return res
+
+    def count_solutions(self):
+        """Counts the solutions without storing them. With local_constraints,
+        whenever the search branches the unset locations are split into the
+        components connected by _compute_dirty, which are counted separately
+        and multiplied, the count of each component is cached by its residual
+        state."""
+        self.stats = SearchStats()
+        self.start_time = time.time()
+
+        try:
+            return self._count()
+        finally:
+            if self.trace is not None:
+                self.trace.flush()
+
+    def _count(self):
+        """Counts the solutions of the puzzle, within count_solutions"""
+        self._counting_scope = list(self.puzzle.iter_locations())
+        self._component_counts = {}
+
+        try:
+            return self._solve_dirty(set(self._counting_scope))
+        finally:
+            self._counting_scope = None
+            self._component_counts = None
+
+    def start_incremental(self):
+        """Solves the puzzle and returns an IncrementalSession to apply and
+        retract clues, see logic_puzzles/incremental.py"""
+        from .incremental import IncrementalSession
+
+        return IncrementalSession(self)
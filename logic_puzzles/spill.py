@@ -0,0 +1,97 @@
+import zlib
+import pickle
+import struct
+import tempfile
+
+SPILL_MAGIC = b"LPB1"
+# length of the compressed record and of the pickled state
+RECORD_HEADER = struct.Struct("<II")
+
+
+class SolutionBuffer:
+    """List-like store of the solutions found by a solver, keeping at most
+    max_in_memory of them in memory. Past that they are flushed to a file,
+    a temporary one if no path is given, as records of pickled states, each
+    compressed with the previous pickled state as the zlib dictionary, so
+    that the cells two consecutive solutions share are encoded as
+    back-references. Iterating reads the records back one at a time."""
+
+    max_in_memory: int
+    file: object
+    buffer: list
+    spilled: int
+    last_data: bytes
+
+    def __init__(self, max_in_memory, path=None):
+        if max_in_memory < 1:
+            raise ValueError("max_in_memory must be positive")
+
+        self.max_in_memory = max_in_memory
+        self.file = tempfile.TemporaryFile() if path is None else open(path, "w+b")
+        self.file.write(SPILL_MAGIC)
+        self.buffer = []
+        self.spilled = 0
+        self.last_data = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def __len__(self):
+        return self.spilled + len(self.buffer)
+
+    def append(self, state):
+        self.buffer.append(state)
+        if len(self.buffer) >= self.max_in_memory:
+            self.flush()
+
+    def flush(self):
+        records = []
+        for state in self.buffer:
+            data = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+            compressor = zlib.compressobj(zdict=self.last_data)
+            record = compressor.compress(data) + compressor.flush()
+            records.append(RECORD_HEADER.pack(len(record), len(data)) + record)
+            self.last_data = data
+
+        self.file.seek(0, 2)
+        self.file.write(b"".join(records))
+        self.spilled += len(self.buffer)
+        self.buffer = []
+
+    def _iter_spilled(self):
+        offset, data = len(SPILL_MAGIC), b""
+        for _ in range(self.spilled):
+            # appends move the file position, each read seeks back first
+            self.file.seek(offset)
+            length, data_length = RECORD_HEADER.unpack(
+                self.file.read(RECORD_HEADER.size)
+            )
+            decompressor = zlib.decompressobj(zdict=data)
+            data = decompressor.decompress(self.file.read(length))
+            if len(data) != data_length:
+                raise ValueError("Corrupted solution record")
+
+            offset += RECORD_HEADER.size + length
+            yield pickle.loads(data)
+
+    def __iter__(self):
+        yield from self._iter_spilled()
+        yield from list(self.buffer)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("solution index out of range")
+        if index >= self.spilled:
+            return self.buffer[index - self.spilled]
+
+        for i, state in enumerate(self._iter_spilled()):
+            if i == index:
+                return state
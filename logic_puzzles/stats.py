@@ -0,0 +1,52 @@
+class SearchStats:
+    """What a solve took: the branching decisions, how deep they went, the
+    dead ends met, the cells found by each deduction layer and the
+    candidates eliminated by each rule, see logic_puzzles/sudoku_rules.py.
+    The seed is the one branching was randomized with, None if it was not."""
+
+    branches: int
+    decisions: int
+    dead_ends: int
+    depth: int
+    max_depth: int
+    deductions: dict[str, int]  # layer -> cells deduced
+    eliminations: dict[str, int]  # rule -> candidates eliminated
+    seed: int | None
+
+    def __init__(self, seed=None):
+        self.branches = 0
+        self.decisions = 0
+        self.dead_ends = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.deductions = {}
+        self.eliminations = {}
+        self.seed = seed
+
+    def add_deductions(self, layer, count):
+        if count:
+            self.deductions[layer] = self.deductions.get(layer, 0) + count
+
+    def add_eliminations(self, rule, count):
+        if count:
+            self.eliminations[rule] = self.eliminations.get(rule, 0) + count
+
+    def enter_branch(self, choices):
+        self.branches += 1
+        self.decisions += choices
+        self.depth += 1
+        self.max_depth = max(self.max_depth, self.depth)
+
+    def leave_branch(self):
+        self.depth -= 1
+
+    def as_dict(self):
+        return {
+            "branches": self.branches,
+            "decisions": self.decisions,
+            "dead_ends": self.dead_ends,
+            "max_depth": self.max_depth,
+            "deductions": dict(sorted(self.deductions.items())),
+            "eliminations": dict(sorted(self.eliminations.items())),
+            "seed": self.seed,
+        }
@@ -1,4 +1,6 @@
-from abc import ABC, abstractmethod
+from abc import ABC
+from .exact_cover import DancingLinks
+from .sudoku_rules import DEDUCTION_RULES
 
 
 def find_hidden_singles(hint_groups):
@@ -24,11 +26,30 @@ def find_hidden_singles(hint_groups):
 
 
 class SudokuLike(ABC):
-    @abstractmethod
+    """Mixin for solvers of puzzles made of groups holding each value once,
+    it must come before SimpleBranchingSolver in the bases. The puzzle owns
+    the groups as its location_groups, see logic_puzzles/location_groups.py"""
+
+    deduction_rules: list[str]  # enabled DEDUCTION_RULES, in their order
+    # whether the solver takes exact_cover=True to solve with dancing links,
+    # see _solve_exact_cover
+    supports_exact_cover = False
+
+    def __init__(self, *args, deduction_rules=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        if deduction_rules == "all":
+            deduction_rules = DEDUCTION_RULES.keys()
+
+        unknown = set(deduction_rules) - DEDUCTION_RULES.keys()
+        if unknown:
+            raise ValueError(f"Unknown deduction rules {', '.join(sorted(unknown))}")
+
+        self.deduction_rules = [x for x in DEDUCTION_RULES if x in deduction_rules]
+
     def get_constrained_locations(self):
         """Get all the location groups which are constrained to contain
         all of the available values (i.e. rows, columns, squares)"""
-        raise NotImplementedError
+        return self.puzzle.location_groups.groups
 
     def get_locations_by_value(self, cells):
         """Returns a map from each unset value to the list of locations it fits in"""
@@ -62,6 +83,136 @@ class SudokuLike(ABC):
             print("Found cells by hidden singles:", len(to_update))
 
         if to_update:
-            return self._solve_updates_map(to_update)
+            return self._solve_updates_map(to_update, "hidden_singles")
 
         return None
+
+    def _find_singles(self, groups, candidates):
+        """Naked and hidden singles among the candidates, None if they
+        contradict"""
+        to_update = {}
+        for location, values in candidates.items():
+            if len(values) == 0:
+                return None
+            if len(values) == 1:
+                to_update[location] = next(iter(values))
+
+        hint_groups = []
+        for group in groups:
+            hints_locations = {value: [] for value in self.puzzle.iter_values()}
+            for location in group:
+                value = self.puzzle.get_value(location)
+                if value is not None:
+                    hints_locations.pop(value, None)
+                    continue
+
+                for value in candidates[location]:
+                    hints_locations[value].append(location)
+            hint_groups.append(hints_locations)
+
+        hidden_singles = find_hidden_singles(hint_groups)
+        if hidden_singles is None:
+            return None
+
+        for location, value in hidden_singles.items():
+            if to_update.setdefault(location, value) != value:
+                return None
+
+        return to_update
+
+    def find_eliminations(self):
+        """Applies the deduction rules to the candidates of the unset
+        locations until they reveal a single, returns the locations to set
+        and the candidates eliminated by each rule, None if they contradict.
+        The candidates are recomputed at every call, nothing is undone."""
+        location_groups = self.puzzle.location_groups
+        groups, families = location_groups.groups, location_groups.families
+        candidates = {
+            location: set(self.puzzle.get_valid_values(location))
+            for group in groups
+            for location in group
+            if self.puzzle.get_value(location) is None
+        }
+
+        eliminated = {}
+        while True:
+            for rule in self.deduction_rules:
+                found = DEDUCTION_RULES[rule](groups, families, candidates)
+                if found:
+                    break
+            else:
+                return {}, eliminated
+
+            eliminated[rule] = eliminated.get(rule, 0) + len(found)
+            for location, value in found:
+                candidates[location].discard(value)
+
+            to_update = self._find_singles(groups, candidates)
+            if to_update is None:
+                return None, eliminated
+            if to_update:
+                return to_update, eliminated
+
+    def _solve_eliminations(self):
+        if not self.deduction_rules:
+            return None
+
+        to_update, eliminated = self.find_eliminations()
+        if to_update == {}:
+            return None
+
+        for rule, count in eliminated.items():
+            self.stats.add_eliminations(rule, count)
+
+        if to_update is None:
+            return 0
+
+        if self.debug:
+            print("Found cells by eliminations:", len(to_update))
+
+        return self._solve_updates_map(to_update, "eliminations")
+
+    def _build_exact_cover(self):
+        """The unset cells as an exact cover matrix: a column per unset cell
+        and per value missing from each group, a row per valid value of each
+        unset cell"""
+        groups = self.get_constrained_locations()
+        groups_by_location = self.puzzle.location_groups.by_location
+
+        columns, rows = [], {}
+        for location in self.puzzle.iter_locations():
+            if self.puzzle.get_value(location) is not None:
+                continue
+
+            columns.append(("cell", location))
+            for value in self.puzzle.get_valid_values(location):
+                rows[location, value] = [("cell", location)] + [
+                    ("group", i, value) for i in groups_by_location.get(location, [])
+                ]
+
+        for i, group in enumerate(groups):
+            placed = set(self.puzzle.get_value(location) for location in group)
+            columns.extend(
+                ("group", i, value)
+                for value in self.puzzle.iter_values()
+                if value not in placed
+            )
+
+        return DancingLinks(columns, rows)
+
+    def _solve_exact_cover(self):
+        """Solves the unset cells with dancing links instead of branching,
+        see logic_puzzles/exact_cover.py"""
+        res = 0
+        matrix = self._build_exact_cover()
+        for chosen in matrix.search(self.stats, self.check_timeout):
+            for location, value in chosen:
+                self.puzzle.set_value(location, value)
+            try:
+                self.store_solution()
+            finally:
+                for location, _ in chosen:
+                    self.puzzle.unset_value(location)
+            res += 1
+
+        return res
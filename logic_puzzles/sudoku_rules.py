@@ -0,0 +1,139 @@
+from functools import partial
+from itertools import combinations
+
+# Candidate elimination rules over groups of locations which must hold each
+# value exactly once. Each rule takes the groups, the families of disjoint
+# groups and the candidates of the unset locations, and returns the set of
+# (location, value) candidates it eliminates.
+
+
+def get_families(groups):
+    """Splits the groups into families of pairwise disjoint groups, e.g. the
+    rows, the columns and the boxes. Groups are assigned greedily in order."""
+    families = []  # [(group indices, covered locations)]
+    for i, group in enumerate(groups):
+        for indices, covered in families:
+            if covered.isdisjoint(group):
+                indices.append(i)
+                covered.update(group)
+                break
+        else:
+            families.append(([i], set(group)))
+
+    return [indices for indices, _ in families]
+
+
+def get_positions(group, candidates):
+    """Map from each value to the unset locations of the group it fits in"""
+    res = {}
+    for location in group:
+        for value in candidates.get(location, ()):
+            res.setdefault(value, []).append(location)
+
+    return res
+
+
+def find_naked_subsets(groups, families, candidates, size):
+    """size locations of a group sharing size candidates hold those values"""
+    res = set()
+    for group in groups:
+        cells = [x for x in group if 2 <= len(candidates.get(x, ())) <= size]
+        for subset in combinations(cells, size):
+            values = set().union(*(candidates[x] for x in subset))
+            if len(values) != size:
+                continue
+
+            for location in group:
+                if location in candidates and location not in subset:
+                    res.update((location, x) for x in candidates[location] & values)
+
+    return res
+
+
+def find_hidden_subsets(groups, families, candidates, size):
+    """size values fitting in the same size locations of a group are there"""
+    res = set()
+    for group in groups:
+        positions = get_positions(group, candidates)
+        values = [x for x, cells in positions.items() if 2 <= len(cells) <= size]
+        for subset in combinations(values, size):
+            cells = set().union(*(positions[x] for x in subset))
+            if len(cells) != size:
+                continue
+
+            for location in cells:
+                res.update((location, x) for x in candidates[location] - set(subset))
+
+    return res
+
+
+def find_locked_candidates(groups, families, candidates):
+    """A value which only fits in the intersection of two groups is not in
+    the rest of the second one: pointing pairs and box-line reductions"""
+    groups_by_location = {}
+    for i, group in enumerate(groups):
+        for location in group:
+            groups_by_location.setdefault(location, set()).add(i)
+
+    res = set()
+    for i, group in enumerate(groups):
+        for value, cells in get_positions(group, candidates).items():
+            shared = set.intersection(*(groups_by_location[x] for x in cells))
+            for j in shared - {i}:
+                res.update(
+                    (location, value)
+                    for location in groups[j]
+                    if location not in cells and value in candidates.get(location, ())
+                )
+
+    return res
+
+
+def find_fish(groups, families, candidates, size):
+    """When a value only fits in size groups of a family (the bases) within
+    size groups of another family (the covers), it is not in the rest of the
+    covers: X-wings for size 2, swordfish for size 3"""
+    group_of = []  # family -> location -> group index
+    for family in families:
+        group_of.append({x: i for i in family for x in groups[i]})
+
+    res = set()
+    for base_family in range(len(families)):
+        positions = {}  # value -> [its locations in each base]
+        for i in families[base_family]:
+            for value, cells in get_positions(groups[i], candidates).items():
+                if 2 <= len(cells) <= size:
+                    positions.setdefault(value, []).append(cells)
+
+        for value, bases in positions.items():
+            for subset in combinations(bases, size):
+                cells = set().union(*subset)
+                for cover_family in range(len(families)):
+                    if cover_family == base_family:
+                        continue
+
+                    covers = set(group_of[cover_family].get(x) for x in cells)
+                    if None in covers or len(covers) != size:
+                        continue
+
+                    res.update(
+                        (location, value)
+                        for j in covers
+                        for location in groups[j]
+                        if location not in cells
+                        and value in candidates.get(location, ())
+                    )
+
+    return res
+
+
+# from the cheapest to the most expensive, which is the order they are tried in
+DEDUCTION_RULES = {
+    "locked_candidates": find_locked_candidates,
+    "naked_pairs": partial(find_naked_subsets, size=2),
+    "hidden_pairs": partial(find_hidden_subsets, size=2),
+    "naked_triples": partial(find_naked_subsets, size=3),
+    "hidden_triples": partial(find_hidden_subsets, size=3),
+    "x_wing": partial(find_fish, size=2),
+    "swordfish": partial(find_fish, size=3),
+}
@@ -0,0 +1,84 @@
+class GridTransform:
+    """Maps a square grid onto another: the cell at (r, c) of the result is the
+    cell at (rows[r], cols[c]) of the (optionally transposed) source, with its
+    value renamed through value_map. Empty cells are kept as None."""
+
+    transpose: bool
+    rows: list[int]
+    cols: list[int]
+    value_map: dict | None
+
+    def __init__(self, transpose, rows, cols, value_map=None):
+        self.transpose = transpose
+        self.rows = rows
+        self.cols = cols
+        self.value_map = value_map
+
+    def apply(self, grid):
+        if self.transpose:
+            grid = [list(col) for col in zip(*grid)]
+
+        def map_value(value):
+            if value is None or self.value_map is None:
+                return value
+            return self.value_map[value]
+
+        return [[map_value(grid[r][c]) for c in self.cols] for r in self.rows]
+
+    def invert(self, grid):
+        inverse_map = None
+        if self.value_map is not None:
+            inverse_map = {v: k for k, v in self.value_map.items()}
+
+        res = [[None] * len(self.cols) for _ in self.rows]
+        for r, source_r in enumerate(self.rows):
+            for c, source_c in enumerate(self.cols):
+                value = grid[r][c]
+                if value is not None and inverse_map is not None:
+                    value = inverse_map[value]
+                res[source_r][source_c] = value
+
+        if self.transpose:
+            res = [list(col) for col in zip(*res)]
+
+        return res
+
+
+def iter_dihedral_transforms(size):
+    """The 8 rotations and reflections of a square grid"""
+    for transpose in (False, True):
+        for rows in (range(size), range(size - 1, -1, -1)):
+            for cols in (range(size), range(size - 1, -1, -1)):
+                yield GridTransform(transpose, list(rows), list(cols))
+
+
+def relabel_by_appearance(grid, labels, all_values=()):
+    """Maps each value of the grid to the labels, in order of first appearance,
+    values in all_values which do not appear get the remaining labels"""
+    value_map = {}
+    for row in grid:
+        for value in row:
+            if value is not None and value not in value_map:
+                value_map[value] = labels[len(value_map)]
+
+    for value in all_values:
+        if value not in value_map:
+            value_map[value] = labels[len(value_map)]
+
+    return value_map
+
+
+def solve_equivalent_once(puzzles, solver_cls, **solver_kwargs):
+    """Solves each puzzle, equivalent puzzles (having the same canonical form)
+    are only solved once and their solutions are mapped back to each of them"""
+    solved = {}
+    res = []
+    for puzzle in puzzles:
+        canonical, transform = puzzle.canonicalize()
+        key = canonical.to_string()
+        if key not in solved:
+            solved[key] = solver_cls(canonical, **solver_kwargs).solve()
+
+        res.append([puzzle.restore_state(transform, x) for x in solved[key]])
+
+    return res
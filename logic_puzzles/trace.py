@@ -0,0 +1,268 @@
+import json
+import mmap
+import heapq
+import struct
+from collections import namedtuple
+
+TRACE_MAGIC = b"LPT1"
+SYMBOL_RECORD = 1
+BRANCH_RECORD = 2
+DECISION_RECORD = 3
+PROPAGATION_RECORD = 4
+DEDUCTION_RECORD = 5
+DEAD_END_RECORD = 6
+SOLUTION_RECORD = 7
+BACKTRACK_RECORD = 8
+
+SYMBOL = struct.Struct("<BH")
+BRANCH = struct.Struct("<BIH")
+DECISION = struct.Struct("<BI")
+PROPAGATION = struct.Struct("<BI")
+DEDUCTION = struct.Struct("<BII")
+FLUSH_SIZE = 1 << 16
+
+
+class SearchTraceWriter:
+    """Binary record of a search, written by SimpleBranchingSolver when it is
+    given a trace. After the magic the stream is a sequence of records, each
+    starting with a tag byte:
+    - SYMBOL_RECORD, uint16 length, JSON of the location, value or layer
+      getting the next code
+    - BRANCH_RECORD, uint32 location code, uint16 number of values to try
+    - DECISION_RECORD, uint32 code of the value being tried
+    - PROPAGATION_RECORD, uint32 cells set by the naked singles
+    - DEDUCTION_RECORD, uint32 layer code, uint32 cells set by the layer
+    - DEAD_END_RECORD, SOLUTION_RECORD, BACKTRACK_RECORD, the tag alone
+    Records are buffered and written in blocks, call flush at the end."""
+
+    file: object
+    codes: dict
+    buffer: bytearray
+
+    def __init__(self, file):
+        self.file = file
+        self.codes = {}
+        self.buffer = bytearray(TRACE_MAGIC)
+
+    def _get_code(self, symbol):
+        code = self.codes.get(symbol)
+        if code is None:
+            code = self.codes[symbol] = len(self.codes)
+            data = json.dumps(symbol, separators=(",", ":"), default=str).encode()
+            self.buffer += SYMBOL.pack(SYMBOL_RECORD, len(data)) + data
+
+        return code
+
+    def branch(self, location, choices):
+        self.buffer += BRANCH.pack(BRANCH_RECORD, self._get_code(location), choices)
+        if len(self.buffer) >= FLUSH_SIZE:
+            self.flush()
+
+    def decide(self, value):
+        self.buffer += DECISION.pack(DECISION_RECORD, self._get_code(value))
+
+    def propagate(self, cells):
+        self.buffer += PROPAGATION.pack(PROPAGATION_RECORD, cells)
+
+    def deduce(self, layer, cells):
+        self.buffer += DEDUCTION.pack(DEDUCTION_RECORD, self._get_code(layer), cells)
+
+    def dead_end(self):
+        self.buffer.append(DEAD_END_RECORD)
+
+    def solution(self):
+        self.buffer.append(SOLUTION_RECORD)
+
+    def backtrack(self):
+        self.buffer.append(BACKTRACK_RECORD)
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer = bytearray()
+
+
+def _to_hashable(value):
+    if isinstance(value, list):
+        return tuple(_to_hashable(x) for x in value)
+    return value
+
+
+def iter_trace(path):
+    """Yields the records of a trace as tuples of their tag and their
+    arguments, with the symbols decoded (JSON lists become tuples)"""
+    with open(path, "rb") as file:
+        if file.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError("Not a search trace")
+        if file.seek(0, 2) == len(TRACE_MAGIC):
+            return
+
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    symbols = []
+    offset, end = len(TRACE_MAGIC), len(data)
+    try:
+        while offset < end:
+            tag = data[offset]
+            if tag == SYMBOL_RECORD:
+                _, length = SYMBOL.unpack_from(data, offset)
+                offset += SYMBOL.size
+                symbols.append(_to_hashable(json.loads(data[offset : offset + length])))
+                offset += length
+            elif tag == BRANCH_RECORD:
+                _, code, choices = BRANCH.unpack_from(data, offset)
+                offset += BRANCH.size
+                yield tag, symbols[code], choices
+            elif tag == DECISION_RECORD:
+                _, code = DECISION.unpack_from(data, offset)
+                offset += DECISION.size
+                yield tag, symbols[code]
+            elif tag == PROPAGATION_RECORD:
+                _, cells = PROPAGATION.unpack_from(data, offset)
+                offset += PROPAGATION.size
+                yield tag, cells
+            elif tag == DEDUCTION_RECORD:
+                _, code, cells = DEDUCTION.unpack_from(data, offset)
+                offset += DEDUCTION.size
+                yield tag, symbols[code], cells
+            elif tag in (DEAD_END_RECORD, SOLUTION_RECORD, BACKTRACK_RECORD):
+                offset += 1
+                yield (tag,)
+            else:
+                raise ValueError(f"Unknown record tag {tag}")
+    finally:
+        data.close()
+
+
+# path holds the (location, value) decisions leading to the subtree
+HotSubtree = namedtuple("HotSubtree", ["location", "branches", "solutions", "path"])
+LocationReport = namedtuple(
+    "LocationReport", ["branches", "failed", "subtree_branches"]
+)
+TraceReport = namedtuple(
+    "TraceReport", ["totals", "heuristic", "hot_subtrees", "locations"]
+)
+
+
+class _OpenBranch:
+    __slots__ = (
+        "location",
+        "choices",
+        "value",
+        "branches",
+        "solutions",
+        "tried",
+        "first_child_solutions",
+    )
+
+    def __init__(self, location, choices, branches, solutions):
+        self.location = location
+        self.choices = choices
+        self.value = None
+        self.branches = branches  # totals when the branch was opened
+        self.solutions = solutions
+        self.tried = 0
+        self.first_child_solutions = 0
+
+
+def analyze_trace(path, hot_count=10, min_depth=1):
+    """Rebuilds the search tree of a trace one branch at a time, without the
+    puzzle. The size of a subtree is the number of branches within it, the
+    hot subtrees are the largest ones rooted at min_depth or deeper. A branch
+    is failed when its subtree holds no solution, the heuristic quality is
+    how much of the search was spent in failed branches and how often the
+    first value tried led to a solution."""
+    totals = dict.fromkeys(
+        ("branches", "decisions", "dead_ends", "solutions", "max_depth"), 0
+    )
+    deductions = {}
+    stack = []
+    hot = []  # min heap of (branches, opening order, HotSubtree)
+    locations = {}  # location -> [branches, failed, subtree branches]
+    failed_branches = fruitful_branches = first_choice_hits = 0
+
+    def close_child(branch):
+        if branch.tried == 1:
+            branch.first_child_solutions = totals["solutions"] - branch.solutions
+
+    def close_branch(branch):
+        nonlocal failed_branches, fruitful_branches, first_choice_hits
+        close_child(branch)
+        branches = totals["branches"] - branch.branches + 1
+        solutions = totals["solutions"] - branch.solutions
+        failed = solutions == 0
+        if failed:
+            failed_branches += 1
+        elif branch.choices > 1:
+            # only counted where the order of the values made a difference
+            fruitful_branches += 1
+            first_choice_hits += branch.first_child_solutions > 0
+
+        report = locations.setdefault(branch.location, [0, 0, 0])
+        report[0] += 1
+        report[1] += failed
+        report[2] += branches
+
+        if len(stack) >= min_depth and hot_count > 0:
+            if len(hot) < hot_count or branches > hot[0][0]:
+                decisions = [(x.location, x.value) for x in stack]
+                # the opening order breaks the ties, the paths are not compared
+                item = (
+                    branches,
+                    branch.branches,
+                    HotSubtree(branch.location, branches, solutions, decisions),
+                )
+                if len(hot) < hot_count:
+                    heapq.heappush(hot, item)
+                else:
+                    heapq.heapreplace(hot, item)
+
+    for record in iter_trace(path):
+        tag = record[0]
+        if tag == BRANCH_RECORD:
+            totals["branches"] += 1
+            stack.append(
+                _OpenBranch(
+                    record[1], record[2], totals["branches"], totals["solutions"]
+                )
+            )
+            totals["max_depth"] = max(totals["max_depth"], len(stack))
+        elif tag == DECISION_RECORD:
+            branch = stack[-1]
+            close_child(branch)
+            totals["decisions"] += 1
+            branch.value = record[1]
+            branch.tried += 1
+        elif tag == BACKTRACK_RECORD:
+            branch = stack.pop()
+            close_branch(branch)
+        elif tag == PROPAGATION_RECORD:
+            cells = deductions.get("naked_singles", 0) + record[1]
+            deductions["naked_singles"] = cells
+        elif tag == DEDUCTION_RECORD:
+            deductions[record[1]] = deductions.get(record[1], 0) + record[2]
+        elif tag == DEAD_END_RECORD:
+            totals["dead_ends"] += 1
+        elif tag == SOLUTION_RECORD:
+            totals["solutions"] += 1
+
+    # the search stopped early, e.g. on reaching the target solutions
+    totals["truncated"] = len(stack) > 0
+    while stack:
+        close_branch(stack.pop())
+
+    totals["deductions"] = dict(sorted(deductions.items()))
+    closed = totals["branches"]
+    heuristic = {
+        "branching_factor": totals["decisions"] / closed if closed else 0.0,
+        "failed_branches": failed_branches / closed if closed else 0.0,
+        "first_choice_hits": (
+            first_choice_hits / fruitful_branches if fruitful_branches else None
+        ),
+    }
+    hot_subtrees = [x for _, _, x in sorted(hot, key=lambda x: -x[0])]
+    location_reports = {
+        location: LocationReport(*report) for location, report in locations.items()
+    }
+
+    return TraceReport(totals, heuristic, hot_subtrees, location_reports)
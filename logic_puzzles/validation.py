@@ -0,0 +1,129 @@
+from functools import cache
+from logic_puzzles.grid_utils import ORTHOGONAL_DIRECTIONS
+
+
+@cache
+def import_numpy():
+    """NumPy is only needed by the batch checks (see Puzzle.validate_batch), it
+    is imported on first use to keep it out of the start-up of every run.
+    None when it is not installed, the batch checks are optional."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+
+    return numpy
+
+
+def is_complete(grid, values):
+    return all(cell in values for row in grid for cell in row)
+
+
+def matches_givens(grid, initial_grid):
+    return all(
+        given is None or cell == given
+        for row, initial_row in zip(grid, initial_grid)
+        for cell, given in zip(row, initial_row)
+    )
+
+
+def get_line_groups(rows, cols):
+    """The cells of each row and of each column"""
+    return [[(r, c) for c in range(cols)] for r in range(rows)] + [
+        [(r, c) for r in range(rows)] for c in range(cols)
+    ]
+
+
+def are_groups_distinct(grid, groups):
+    return all(len(set(grid[r][c] for r, c in group)) == len(group) for group in groups)
+
+
+def get_components(cells):
+    """The orthogonally connected components of a set of cells"""
+    cells = set(cells)
+    res = []
+    while cells:
+        stack = [cells.pop()]
+        component = set(stack)
+        while stack:
+            r, c = stack.pop()
+            for dr, dc in ORTHOGONAL_DIRECTIONS:
+                if (r + dr, c + dc) in cells:
+                    cells.remove((r + dr, c + dc))
+                    component.add((r + dr, c + dc))
+                    stack.append((r + dr, c + dc))
+
+        res.append(component)
+
+    return res
+
+
+def is_connected(cells):
+    return len(get_components(cells)) <= 1
+
+
+def has_cycle(edges):
+    """Whether the undirected graph made of the edges, pairs of nodes, has a
+    cycle"""
+    parents = {}
+
+    def find(node):
+        while parents.get(node, node) != node:
+            node = parents[node]
+        return node
+
+    for a, b in edges:
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b:
+            return True
+        parents[root_a] = root_b
+
+    return False
+
+
+def encode_grids(grids, values):
+    """The grids as a K x rows x cols array of the index of each cell within
+    values, -1 for the cells holding anything else (e.g. None)"""
+    np = import_numpy()
+    codes = {value: i for i, value in enumerate(values)}
+    rows, cols = len(grids[0]), len(grids[0][0])
+    res = np.array(
+        [[[codes.get(cell, -1) for cell in row] for row in grid] for grid in grids],
+        dtype=np.int16,
+    )
+    return res.reshape(len(grids), rows, cols)
+
+
+def batch_is_complete(codes):
+    return (codes >= 0).all(axis=(1, 2))
+
+
+def batch_matches_givens(codes, given_codes):
+    """given_codes is a rows x cols array, -1 where nothing is given"""
+    given = given_codes >= 0
+    return (codes[:, given] == given_codes[given]).all(axis=1)
+
+
+def batch_groups_distinct(codes, groups):
+    """Whether the cells of each group hold distinct values, the groups must
+    have the same size"""
+    np = import_numpy()
+    group_rows = np.array([[r for r, _ in group] for group in groups])
+    group_cols = np.array([[c for _, c in group] for group in groups])
+    values = np.sort(codes[:, group_rows, group_cols], axis=-1)
+    return ~(values[..., 1:] == values[..., :-1]).any(axis=(1, 2))
+
+
+def batch_neighbour_counts(mask):
+    """How many of the 8 neighbours of each cell are set in the K x rows x
+    cols mask"""
+    np = import_numpy()
+    rows, cols = mask.shape[1:]
+    padded = np.pad(mask.astype(np.int16), ((0, 0), (1, 1), (1, 1)))
+    res = np.zeros(mask.shape, dtype=np.int16)
+    for dr in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            if dr or dc:
+                res += padded[:, 1 + dr : 1 + dr + rows, 1 + dc : 1 + dc + cols]
+
+    return res
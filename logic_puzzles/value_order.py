@@ -0,0 +1,67 @@
+def valid_values_order(solver, location, values):
+    """The order of get_valid_values, to override a solver's default"""
+    return values
+
+
+def count_pruned(solver, location, values):
+    """For each value, how many values it removes from the domains of the
+    unset locations its assignment makes dirty, None if it empties one"""
+    puzzle = solver.puzzle
+    before = {}
+    res = []
+    for value in values:
+        puzzle.set_value(location, value)
+        neighbours = [
+            x for x in solver._compute_dirty(location) if not solver.is_location_set(x)
+        ]
+        after = {x: len(puzzle.get_valid_values(x)) for x in neighbours}
+        puzzle.unset_value(location)
+
+        if 0 in after.values():
+            res.append(None)
+            continue
+
+        for x in neighbours:
+            if x not in before:
+                before[x] = len(puzzle.get_valid_values(x))
+        res.append(sum(before[x] - after[x] for x in neighbours))
+
+    return res
+
+
+def least_constraining(solver, location, values):
+    """Tries first the values leaving the most options to the neighbours,
+    the values emptying a domain last"""
+    pruned = count_pruned(solver, location, values)
+    order = sorted(
+        range(len(values)), key=lambda i: (pruned[i] is None, pruned[i] or 0)
+    )
+    return [values[i] for i in order]
+
+
+def most_constraining(solver, location, values):
+    """Tries first the values pruning the most, which propagate the furthest,
+    the values emptying a domain last"""
+    pruned = count_pruned(solver, location, values)
+    order = sorted(
+        range(len(values)), key=lambda i: (pruned[i] is None, -(pruned[i] or 0))
+    )
+    return [values[i] for i in order]
+
+
+def empty_first(solver, location, values):
+    """Tries first the solver's empty_value, for sparse grids"""
+    return sorted(values, key=lambda x: x != solver.empty_value)
+
+
+def empty_last(solver, location, values):
+    return sorted(values, key=lambda x: x == solver.empty_value)
+
+
+VALUE_ORDERS = {
+    "valid_values": valid_values_order,
+    "least_constraining": least_constraining,
+    "most_constraining": most_constraining,
+    "empty_first": empty_first,
+    "empty_last": empty_last,
+}
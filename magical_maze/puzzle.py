@@ -1,4 +1,5 @@
 from logic_puzzles.puzzle import Puzzle, PuzzleState
+from logic_puzzles.validation import is_complete, matches_givens
 
 DIRECTIONS = {
     "|": [(1, 0), (-1, 0)],
@@ -12,6 +13,8 @@ MAX_VALUE = 3
 
 
 class MagicalMazePuzzleState(PuzzleState):
+    __slots__ = ("values", "conflict_values", "rows_found", "cols_found")
+
     values: list[list[int]]
     conflict_values: list[list[list[int]]]
     rows_found: list[list[int]]
@@ -100,6 +103,26 @@ class MagicalMazePuzzle(Puzzle):
             if self.initial_values[r][c] is not None:
                 self.set_value(r, c, self.initial_values[r][c])
 
+    def encode_solution(self, state):
+        return state.values
+
+    def validate(self, state):
+        """Every row and column holds each number once, along the maze the
+        numbers repeat 1, 2, 3, ..."""
+        values = state.values
+        if not is_complete(values, set(self.iter_values())):
+            return False
+        if not matches_givens(values, self.initial_values):
+            return False
+
+        numbers = list(range(1, MAX_VALUE + 1))
+        for line in values + [list(col) for col in zip(*values)]:
+            if sorted(x for x in line if x != 0) != numbers:
+                return False
+
+        path = [values[r][c] for r, c in self.locations if values[r][c] != 0]
+        return all(value == i % MAX_VALUE + 1 for i, value in enumerate(path))
+
     def __str__(self):
         return (
             "\n".join(self.grid)
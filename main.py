@@ -1,6 +1,18 @@
 import sys
 import argparse
-import json
+from itertools import islice
+from contextlib import nullcontext
+from logic_puzzles.cache import SolutionCache, DEFAULT_MAX_ENTRIES
+from logic_puzzles.profiling import Profiler
+from logic_puzzles.encoding import dump_solution_line, PackedSolutionWriter
+from logic_puzzles.container import PuzzleContainer
+from logic_puzzles.progress import format_report
+from logic_puzzles.solver import SimpleBranchingSolver
+from logic_puzzles.sudoku_like import SudokuLike
+from logic_puzzles.sudoku_rules import DEDUCTION_RULES
+from logic_puzzles.spill import SolutionBuffer
+from logic_puzzles.trace import SearchTraceWriter
+from logic_puzzles.value_order import VALUE_ORDERS
 import kakuro.puzzle, kakuro.solver
 import aquarium.puzzle, aquarium.solver
 import einstein.puzzle, einstein.solver
@@ -25,6 +37,7 @@ import lits.puzzle, lits.solver
 import renzoku.puzzle, renzoku.solver
 import slant.puzzle, slant.solver
 import binairo.puzzle, binairo.solver
+import sudoku_variants.puzzle, sudoku_variants.solver
 
 PUZZLES = {
     "kakuro": (kakuro.puzzle.KakuroPuzzle, kakuro.solver.KakuroSolver),
@@ -78,15 +91,38 @@ PUZZLES = {
     "renzoku": (renzoku.puzzle.RenzokuPuzzle, renzoku.solver.RenzokuSolver),
     "slant": (slant.puzzle.SlantPuzzle, slant.solver.SlantSolver),
     "binairo": (binairo.puzzle.BinairoPuzzle, binairo.solver.BinairoSolver),
+    "sudoku_variants": (
+        sudoku_variants.puzzle.SudokuVariantPuzzle,
+        sudoku_variants.solver.SudokuVariantSolver,
+    ),
 }
 
 
+def parse_rules(string):
+    return "all" if string == "all" else string.split(",")
+
+
 def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument("puzzle", choices=PUZZLES.keys(), help="Puzzle type")
     parser.add_argument("--input", type=argparse.FileType("r"), default=sys.stdin)
     parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout)
-    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    output_format = parser.add_mutually_exclusive_group()
+    output_format.add_argument(
+        "--json",
+        action="store_true",
+        help="Output the decision grid of each solution as a line of JSON",
+    )
+    output_format.add_argument(
+        "--packed",
+        action="store_true",
+        help="Output the decision grids in the binary packed form",
+    )
+    output_format.add_argument(
+        "--count",
+        action="store_true",
+        help="Only output the number of solutions, counted without storing them",
+    )
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
     parser.add_argument(
         "--timeout", type=float, default=None, help="Timeout in seconds"
@@ -102,32 +138,300 @@ def parse_args():
         action="store_true",
         help="Randomize branching order",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--value_order",
+        choices=VALUE_ORDERS.keys(),
+        default=None,
+        help="Order in which the values of each branch are tried",
+    )
+    parser.add_argument(
+        "--exact_cover",
+        action="store_true",
+        help="Solve Sudoku-like puzzles as exact cover problems with dancing links",
+    )
+    parser.add_argument(
+        "--deduction_rules",
+        type=parse_rules,
+        default=(),
+        metavar="RULES",
+        help="Comma separated candidate elimination rules for Sudoku-like "
+        f"puzzles, or all: {', '.join(DEDUCTION_RULES)}",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed of the randomized branching, a new one is drawn and reported "
+        "on stderr by default",
+    )
+    parser.add_argument(
+        "--cache", default=None, help="Path of the sqlite solution cache"
+    )
+    parser.add_argument(
+        "--cache_size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Maximum number of puzzles kept in the cache",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="PATH",
+        help="Profile the solver, writing PATH.pstats and PATH.collapsed",
+    )
+    parser.add_argument(
+        "--progress",
+        type=float,
+        nargs="?",
+        const=1.0,
+        default=None,
+        metavar="SECONDS",
+        help="Report the progress and estimated search size on stderr, every "
+        "SECONDS (default 1)",
+    )
+    parser.add_argument(
+        "--container",
+        default=None,
+        metavar="PATH",
+        help="Solve the puzzles of a container, see pack_puzzles.py",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="K/N",
+        help="Only solve the K-th of N contiguous shards of the container",
+    )
+    parser.add_argument(
+        "--spill_threshold",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Keep at most N solutions in memory, spilling the others to disk",
+    )
+    parser.add_argument(
+        "--spill_file",
+        default=None,
+        metavar="PATH",
+        help="File the solutions are spilled to, a temporary one by default",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="PATH",
+        help="Record the decisions of the search to PATH, see replay_trace.py",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Check the solutions against the rules before outputting them",
+    )
+    args = parser.parse_args()
 
+    if args.container is None and args.shard is not None:
+        parser.error("--shard requires --container")
+    if args.container is not None and args.packed:
+        parser.error("--packed is not supported with --container")
+    if args.seed is not None and not args.randomize_branching:
+        parser.error("--seed requires --randomize_branching")
+    if args.count and args.cache is not None:
+        parser.error("--count is not supported with --cache")
+    if args.spill_threshold is not None and args.cache is not None:
+        parser.error("--spill_threshold is not supported with --cache")
+    if args.trace is not None and args.cache is not None:
+        parser.error("--trace is not supported with --cache")
+    if args.spill_file is not None and args.spill_threshold is None:
+        parser.error("--spill_file requires --spill_threshold")
+
+    return args
+
+
+def parse_shard(string):
+    try:
+        shard, shard_count = map(int, string.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard {string}, expected K/N")
+    if not 0 <= shard < shard_count:
+        raise argparse.ArgumentTypeError(f"invalid shard {string}, expected K < N")
+    return shard, shard_count
+
+
+def print_progress(report):
+    print(format_report(report), file=sys.stderr)
+
+
+def solve(puzzle, solver_cls, args, trace=None):
+    kwargs = {}
+    if args.progress is not None:
+        kwargs.update(progress_callback=print_progress, progress_interval=args.progress)
+    if args.value_order is not None:
+        if not issubclass(solver_cls, SimpleBranchingSolver):
+            raise ValueError(f"{solver_cls.__name__} does not support value orders")
+        kwargs["value_order"] = args.value_order
+    if args.exact_cover:
+        if not (
+            issubclass(solver_cls, SudokuLike) and solver_cls.supports_exact_cover
+        ):
+            raise ValueError(f"{solver_cls.__name__} does not support exact cover")
+        kwargs["exact_cover"] = True
+    if args.deduction_rules:
+        if not issubclass(solver_cls, SudokuLike):
+            raise ValueError(f"{solver_cls.__name__} does not support deduction rules")
+        kwargs["deduction_rules"] = args.deduction_rules
 
-def main():
-    args = parse_args()
-    puzzle_type = args.puzzle
-    puzzle_cls, solver_cls = PUZZLES[puzzle_type]
-    puzzle = puzzle_cls.from_file(args.input)
     solver = solver_cls(
         puzzle,
         debug=args.debug,
         timeout_seconds=args.timeout,
         target_solutions=args.target_solutions,
         randomize_branching=args.randomize_branching,
+        spill_threshold=args.spill_threshold,
+        spill_path=args.spill_file,
+        trace=trace,
+        seed=args.seed,
+        **kwargs,
     )
 
     solutions = solver.solve()
+    if args.randomize_branching and args.seed is None:
+        print(f"Seed: {solver.stats.seed}", file=sys.stderr)
+
+    return solutions
+
+
+def count_solutions(puzzle, solver_cls, args, trace=None):
+    if not issubclass(solver_cls, SimpleBranchingSolver):
+        raise ValueError(f"{solver_cls.__name__} does not support counting")
+
+    solver = solver_cls(
+        puzzle, debug=args.debug, timeout_seconds=args.timeout, trace=trace
+    )
+    return solver.count_solutions()
+
+
+def solve_cached(puzzle_type, string, args):
+    puzzle_cls, solver_cls = PUZZLES[puzzle_type]
+    puzzle, to_solve, transform = None, None, None
+    if hasattr(puzzle_cls, "canonicalize"):
+        # equivalent puzzles share the solutions of their canonical form
+        puzzle = puzzle_cls.from_string(string)
+        to_solve, transform = puzzle.canonicalize()
+        string = to_solve.to_string()
+
+    with SolutionCache(args.cache, args.cache_size) as cache:
+        key = cache.make_key(
+            puzzle_type,
+            string,
+            target_solutions=args.target_solutions,
+            randomize_branching=args.randomize_branching,
+            seed=args.seed,
+            value_order=args.value_order,
+            exact_cover=args.exact_cover,
+            deduction_rules=args.deduction_rules,
+        )
+        solutions = cache.get(key)
+        if solutions is None:
+            if to_solve is None:
+                puzzle = to_solve = puzzle_cls.from_string(string)
+            solutions = solve(to_solve, solver_cls, args)
+            cache.put(key, solutions)
+
+    if transform is not None:
+        solutions = [puzzle.restore_state(transform, x) for x in solutions]
+
+    return puzzle, solutions
+
+
+def validate_solutions(puzzle, solutions, chunk_size=1024):
+    """Validates the solutions a chunk at a time, they may be spilled to disk"""
+    iterator = iter(solutions)
+    while chunk := list(islice(iterator, chunk_size)):
+        if not all(puzzle.validate_batch(chunk)):
+            return False
+
+    return True
+
+
+def print_solutions(puzzle, solutions, file):
+    print(f"Found {len(solutions)} solutions", file=file)
+    for state in solutions:
+        print("-----------------", file=file)
+        puzzle.set_state(state)
+        print(puzzle, file=file)
+
+
+def iter_inputs(args):
+    """Yields the index and the string of each puzzle to solve, the index is
+    None when reading a single puzzle"""
+    if args.container is None:
+        yield None, "\n".join(args.input)
+        return
+
+    with PuzzleContainer(args.container) as container:
+        if container.puzzle_type != args.puzzle:
+            raise ValueError(f"The container holds {container.puzzle_type} puzzles")
+
+        indices = range(len(container))
+        if args.shard is not None:
+            indices = container.get_shard(*args.shard)
+
+        for i in indices:
+            yield i, container.get_string(i)
+
+
+def main():
+    args = parse_args()
+    puzzle_type = args.puzzle
+    puzzle_cls, solver_cls = PUZZLES[puzzle_type]
+    writer = PackedSolutionWriter(args.output.buffer) if args.packed else None
+
+    trace_file = open(args.trace, "wb") if args.trace is not None else None
+    trace = SearchTraceWriter(trace_file) if trace_file is not None else None
+
+    profiler = Profiler(args.profile) if args.profile is not None else None
+    with profiler or nullcontext(), trace_file or nullcontext():
+        for index, string in iter_inputs(args):
+            if args.count:
+                count = count_solutions(
+                    puzzle_cls.from_string(string), solver_cls, args, trace
+                )
+                if index is not None:
+                    print(f"# Puzzle {index}", file=args.output)
+                print(f"Found {count} solutions", file=args.output)
+                continue
+
+            if args.cache is not None:
+                puzzle, solutions = solve_cached(puzzle_type, string, args)
+            else:
+                puzzle = puzzle_cls.from_string(string)
+                solutions = solve(puzzle, solver_cls, args, trace)
+
+            if puzzle is None:
+                # cache hit, the puzzle is only needed to output the solutions
+                puzzle = puzzle_cls.from_string(string)
+
+            if args.validate and not validate_solutions(puzzle, solutions):
+                raise ValueError("The solver returned an invalid solution")
+
+            if args.json and index is not None:
+                grids = [puzzle.encode_solution(state) for state in solutions]
+                dump_solution_line({"puzzle": index, "solutions": grids}, args.output)
+            elif args.json:
+                for state in solutions:
+                    dump_solution_line(puzzle.encode_solution(state), args.output)
+            elif args.packed:
+                for state in solutions:
+                    writer.write(puzzle.encode_solution(state))
+            else:
+                if index is not None:
+                    print(f"# Puzzle {index}", file=args.output)
+                print_solutions(puzzle, solutions, args.output)
+
+            if isinstance(solutions, SolutionBuffer):
+                solutions.close()
 
-    if not args.json:
-        print(f"Found {len(solutions)} solutions", file=args.output)
-        for state in solutions:
-            print("-----------------", file=args.output)
-            puzzle.set_state(state)
-            print(puzzle, file=args.output)
-    else:
-        json.dump([x.__dict__ for x in solutions], args.output)
+    if profiler is not None:
+        profiler.print_summary()
 
 
 if __name__ == "__main__":
@@ -1,10 +1,14 @@
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
+from logic_puzzles.counters import CounterLayout, Counters
+from logic_puzzles.validation import import_numpy, encode_grids, batch_neighbour_counts
 
 
 class MinesweeperPuzzleState(PuzzleState):
+    __slots__ = ("grid", "found_by_indicator")
+
     grid: list[list[int | None]]
-    found_by_indicator: dict[tuple[int, int, int], int]  # (r, c, value) -> count
+    found_by_indicator: Counters  # (r, c), value -> count
 
     def __init__(self, grid, found_by_indicator):
         self.grid = grid
@@ -16,6 +20,7 @@ class MinesweeperPuzzle(Puzzle):
     state: MinesweeperPuzzleState
     grid_utils: GridUtils
     mine_indicators: list[tuple[int, int]]
+    indicator_layout: CounterLayout
     field_cells: list[tuple[int, int]]
     adjacent_indicators: dict[
         tuple[int, int], list[tuple[int, int]]
@@ -65,6 +70,7 @@ class MinesweeperPuzzle(Puzzle):
             ]
             for new_r, new_c in self.mine_indicators
         }
+        self.indicator_layout = CounterLayout(self.mine_indicators, self.iter_values())
 
         if state is None:
             self.initialize_state()
@@ -85,13 +91,35 @@ class MinesweeperPuzzle(Puzzle):
     def initialize_state(self):
         self.state = MinesweeperPuzzleState(
             grid=[[None for _ in row] for row in self.initial_grid],
-            found_by_indicator={
-                (r, c, value): 0
-                for r, c in self.mine_indicators
-                for value in self.iter_values()
-            },
+            found_by_indicator=self.indicator_layout.new_counters(),
+        )
+
+    def validate(self, state):
+        grid = state.grid
+        if any(grid[r][c] not in (0, 1) for r, c in self.field_cells):
+            return False
+
+        return all(
+            sum(grid[new_r][new_c] for new_r, new_c in self.adjacent_cells[r, c])
+            == self.initial_grid[r][c]
+            for r, c in self.mine_indicators
         )
 
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], (0, 1))
+        field = np.array([[x is None for x in row] for row in self.initial_grid])
+        res = (codes[:, field] >= 0).all(axis=1)
+
+        indicators = ~field
+        targets = np.array(self.initial_grid, dtype=object)[indicators].astype(int)
+        mines = batch_neighbour_counts(codes == 1)
+        res &= (mines[:, indicators] == targets).all(axis=1)
+        return res.tolist()
+
     def iter_values(self):
         yield from (0, 1)
 
@@ -114,8 +142,8 @@ class MinesweeperPuzzle(Puzzle):
 
         res = all(
             _check_bounds(
-                self.state.found_by_indicator[new_r, new_c, 1],
-                self.state.found_by_indicator[new_r, new_c, 0],
+                self.state.found_by_indicator[(new_r, new_c), 1],
+                self.state.found_by_indicator[(new_r, new_c), 0],
                 self.initial_grid[new_r][new_c],
                 len(self.adjacent_cells[new_r, new_c]),
             )
@@ -129,7 +157,7 @@ class MinesweeperPuzzle(Puzzle):
     def _update_value(self, location, value, delta):
         r, c = location
         for new_r, new_c in self.adjacent_indicators[r, c]:
-            self.state.found_by_indicator[new_r, new_c, value] += delta
+            self.state.found_by_indicator.add(((new_r, new_c), value), delta)
 
     def set_value(self, location, value):
         r, c = location
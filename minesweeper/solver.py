@@ -5,6 +5,8 @@ from logic_puzzles.grid_utils import ALL_DIRECTIONS
 
 
 class MinesweeperSolver(SimpleBranchingSolver):
+    local_constraints = True
+
     def get_branching_score(self, location):
         def compute_score(found, empty, target, total):
             missing = target - found
@@ -12,10 +14,13 @@ class MinesweeperSolver(SimpleBranchingSolver):
             return -math.comb(available, missing)
 
         r, c = location
+        if len(self.puzzle.adjacent_indicators[r, c]) == 0:
+            return -99
+
         return max(
             compute_score(
-                self.state.found_by_indicator[new_r, new_c, 1],
-                self.state.found_by_indicator[new_r, new_c, 0],
+                self.state.found_by_indicator[(new_r, new_c), 1],
+                self.state.found_by_indicator[(new_r, new_c), 0],
                 self.puzzle.initial_grid[new_r][new_c],
                 len(self.puzzle.adjacent_cells[new_r, new_c]),
             )
@@ -46,7 +51,7 @@ class MinesweeperSolver(SimpleBranchingSolver):
 
                 if (
                     added_by_indicator[new_r, new_c]
-                    + self.state.found_by_indicator[new_r, new_c, 1]
+                    + self.state.found_by_indicator[(new_r, new_c), 1]
                     > self.puzzle.initial_grid[new_r][new_c]
                 ):
                     return False
@@ -63,7 +68,8 @@ class MinesweeperSolver(SimpleBranchingSolver):
 
         for r, c in self.puzzle.mine_indicators:
             missing = (
-                self.puzzle.initial_grid[r][c] - self.state.found_by_indicator[r, c, 1]
+                self.puzzle.initial_grid[r][c]
+                - self.state.found_by_indicator[(r, c), 1]
             )
             if missing == 0:
                 continue
@@ -102,6 +108,6 @@ class MinesweeperSolver(SimpleBranchingSolver):
         to_update = self._find_placements_around_indicators()
 
         if to_update:
-            return self._solve_updates_map(to_update)
+            return self._solve_updates_map(to_update, "indicator_placements")
 
         return super()._branching_solve()
@@ -0,0 +1,61 @@
+import argparse
+from main import PUZZLES
+from logic_puzzles.container import PuzzleContainerWriter
+
+
+def iter_puzzle_strings(paths, separator=None):
+    """Each file holds one puzzle, or several split by separator lines"""
+    for path in paths:
+        with open(path) as file:
+            if separator is None:
+                yield file.read()
+                continue
+
+            lines = []
+            for line in file:
+                if line.strip() == separator:
+                    if lines:
+                        yield "".join(lines)
+                    lines = []
+                else:
+                    lines.append(line)
+
+            if lines:
+                yield "".join(lines)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Packs puzzles of one type into a container for batch solving"
+    )
+    parser.add_argument("puzzle", choices=PUZZLES.keys(), help="Puzzle type")
+    parser.add_argument("output", help="Path of the container")
+    parser.add_argument("inputs", nargs="+", help="Puzzle files")
+    parser.add_argument(
+        "--separator",
+        default=None,
+        help="Line separating the puzzles within a file, e.g. --separator=---",
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="Parse each puzzle before packing it"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    puzzle_cls, _ = PUZZLES[args.puzzle]
+
+    count = 0
+    with PuzzleContainerWriter(args.output, args.puzzle) as writer:
+        for string in iter_puzzle_strings(args.inputs, args.separator):
+            if args.check:
+                puzzle_cls.from_string(string)
+            writer.add(string)
+            count += 1
+
+    print(f"Packed {count} puzzles")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import sys
+import argparse
+from main import PUZZLES
+from pack_puzzles import iter_puzzle_strings
+from logic_puzzles.container import PuzzleContainer
+from logic_puzzles.encoding import dump_solution_line
+from logic_puzzles.rating import rate_corpus
+from logic_puzzles.solver import SimpleBranchingSolver
+
+# the puzzles whose solvers record the search statistics, see rate_puzzle
+RATEABLE_PUZZLES = [
+    puzzle_type
+    for puzzle_type, (_, solver_cls) in PUZZLES.items()
+    if issubclass(solver_cls, SimpleBranchingSolver)
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Rates the difficulty of puzzles from their search statistics"
+    )
+    parser.add_argument("puzzle", choices=RATEABLE_PUZZLES, help="Puzzle type")
+    parser.add_argument("inputs", nargs="*", help="Puzzle files")
+    parser.add_argument(
+        "--container", default=None, metavar="PATH", help="Rate a container"
+    )
+    parser.add_argument(
+        "--separator",
+        default=None,
+        help="Line separating the puzzles within a file, e.g. --separator=---",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=None, help="Processes, the CPU count by default"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="Timeout in seconds per puzzle"
+    )
+    parser.add_argument("--sort", action="store_true", help="Sort by difficulty")
+    parser.add_argument(
+        "--json", action="store_true", help="Output a line of JSON per puzzle"
+    )
+    args = parser.parse_args()
+
+    if bool(args.inputs) == (args.container is not None):
+        parser.error("pass either puzzle files or --container")
+
+    return args
+
+
+def iter_inputs(args):
+    """Yields the name and the string of each puzzle"""
+    if args.container is None:
+        if args.separator is None:
+            yield from zip(args.inputs, iter_puzzle_strings(args.inputs))
+            return
+
+        for i, string in enumerate(iter_puzzle_strings(args.inputs, args.separator)):
+            yield str(i), string
+        return
+
+    with PuzzleContainer(args.container) as container:
+        for i in range(len(container)):
+            yield str(i), container.get_string(i)
+
+
+def main():
+    args = parse_args()
+    puzzle_cls, solver_cls = PUZZLES[args.puzzle]
+
+    names, strings = [], []
+    for name, string in iter_inputs(args):
+        names.append(name)
+        strings.append(string)
+
+    ratings = rate_corpus(
+        puzzle_cls, solver_cls, strings, jobs=args.jobs, timeout_seconds=args.timeout
+    )
+    rows = zip(names, ratings)
+    if args.sort:
+        # the puzzles that timed out are the hardest
+        rows = sorted(rows, key=lambda x: (x[1].timed_out, x[1].score or 0.0))
+
+    if not args.json:
+        print(f"{'score':>8} {'sol':>3} {'branch':>6} {'depth':>5}  puzzle  deductions")
+
+    for name, rating in rows:
+        if args.json:
+            dump_solution_line({"puzzle": name, **rating._asdict()}, sys.stdout)
+            continue
+
+        stats = rating.stats
+        deductions = ", ".join(f"{k}={v}" for k, v in stats["deductions"].items())
+        score = "timeout" if rating.timed_out else f"{rating.score:.2f}"
+        print(
+            f"{score:>8} {rating.solutions:>3} {stats['branches']:>6} "
+            f"{stats['max_depth']:>5}  {name}  {deductions}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,19 @@
+from functools import cached_property
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
+from logic_puzzles.location_groups import LocationGroups
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    matches_givens,
+    get_line_groups,
+    are_groups_distinct,
+    encode_grids,
+    batch_is_complete,
+    batch_matches_givens,
+    batch_groups_distinct,
+)
+from logic_puzzles.counters import CounterLayout, Counters
 
 # fmt: off
 SUDOKU_VALUES = [
@@ -10,9 +24,11 @@ SUDOKU_VALUES = [
 
 
 class RenzokuPuzzleState(PuzzleState):
+    __slots__ = ("grid", "found_by_row", "found_by_col", "hints_grid")
+
     grid: list[list[int | None]]
-    found_by_row: dict[tuple[int, int], int]
-    found_by_col: dict[tuple[int, int], int]
+    found_by_row: Counters  # row, value -> count
+    found_by_col: Counters  # col, value -> count
     hints_grid: dict[tuple[int, int, int], int | None]
 
     def __init__(self, grid, found_by_row, found_by_col, hints_grid):
@@ -28,6 +44,8 @@ class RenzokuPuzzle(Puzzle):
     between_cols: list[list[str]]
     state: RenzokuPuzzleState
     grid_utils: GridUtils
+    row_layout: CounterLayout
+    col_layout: CounterLayout
 
     @classmethod
     def from_string(cls, string, *args, **kwargs):
@@ -54,10 +72,17 @@ class RenzokuPuzzle(Puzzle):
         self.between_cols = between_cols
         self.state = state
         self.grid_utils = GridUtils(len(initial_grid), len(initial_grid[0]))
+        self.row_layout = CounterLayout(range(self.grid_utils.rows), self.iter_values())
+        self.col_layout = CounterLayout(range(self.grid_utils.cols), self.iter_values())
 
         if state is None:
             self.initialize_state()
 
+    def encode_solution(self, state):
+        # the grid holds the indices of the values, the symbol at index i
+        # stands for the number i + 1, as the digits of Futoshiki
+        return [[None if x is None else x + 1 for x in row] for row in state.grid]
+
     def __str__(self):
         def stringify_cell(r, c):
             if self.state.grid[r][c] is None:
@@ -94,16 +119,8 @@ class RenzokuPuzzle(Puzzle):
     def initialize_state(self):
         self.state = RenzokuPuzzleState(
             grid=[[None] * self.grid_utils.cols for _ in range(self.grid_utils.rows)],
-            found_by_row={
-                (r, value): 0
-                for r in range(self.grid_utils.rows)
-                for value in self.iter_values()
-            },
-            found_by_col={
-                (c, value): 0
-                for c in range(self.grid_utils.cols)
-                for value in self.iter_values()
-            },
+            found_by_row=self.row_layout.new_counters("B"),
+            found_by_col=self.col_layout.new_counters("B"),
             hints_grid={
                 (r, c, value): None
                 for r, c in self.grid_utils.iter_grid()
@@ -122,6 +139,18 @@ class RenzokuPuzzle(Puzzle):
 
         return [value for value in self.iter_values() if self.can_set(location, value)]
 
+    @cached_property
+    def groups(self):
+        """The cells of each row and column"""
+        return get_line_groups(self.grid_utils.rows, self.grid_utils.cols)
+
+    @cached_property
+    def location_groups(self):
+        """The groups holding every value, indexed for the solvers"""
+        return LocationGroups(
+            [[("grid", location) for location in group] for group in self.groups]
+        )
+
     def iter_values(self):
         yield from range(self.grid_utils.rows)
 
@@ -148,6 +177,52 @@ class RenzokuPuzzle(Puzzle):
             return abs(left - right) == 1
         return abs(left - right) > 1
 
+    @cached_property
+    def adjacent_pairs(self):
+        """The pairs of adjacent cells with the constraint between them"""
+        return [
+            (r, c, new_r, new_c, self.get_constraint_between(r, c, new_r, new_c))
+            for r, c in self.grid_utils.iter_grid()
+            for new_r, new_c in ((r, c + 1), (r + 1, c))
+            if self.grid_utils.in_range(new_r, new_c)
+        ]
+
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, set(self.iter_values())):
+            return False
+        if not matches_givens(grid, self.initial_grid):
+            return False
+        if not are_groups_distinct(grid, self.groups):
+            return False
+
+        return all(
+            self.check_constraint(grid[r][c], grid[new_r][new_c], constraint)
+            for r, c, new_r, new_c, constraint in self.adjacent_pairs
+        )
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        # the values are 0..n-1, their codes are the values themselves
+        values = list(self.iter_values())
+        codes = encode_grids([state.grid for state in states], values)
+        given_codes = encode_grids([self.initial_grid], values)[0]
+        res = (
+            batch_is_complete(codes)
+            & batch_matches_givens(codes, given_codes)
+            & batch_groups_distinct(codes, self.groups)
+        )
+
+        if self.adjacent_pairs:
+            r, c, new_r, new_c, constraint = map(np.array, zip(*self.adjacent_pairs))
+            distance = np.abs(codes[:, r, c] - codes[:, new_r, new_c])
+            res &= np.where(constraint == "O", distance == 1, distance > 1).all(axis=1)
+
+        return res.tolist()
+
     def can_set(self, location, value):
         location_type, location_data = location
         if location_type == "hint":
@@ -160,9 +235,12 @@ class RenzokuPuzzle(Puzzle):
             return self.can_set(("grid", (r, c)), hint_value)
 
         r, c = location_data
-        if self.state.found_by_row[r, value] > 0:
+        value_offset = self.row_layout.value_offsets[value]
+        row_offset = self.row_layout.group_offsets[r] + value_offset
+        if self.state.found_by_row.values[row_offset] > 0:
             return False
-        if self.state.found_by_col[c, value] > 0:
+        col_offset = self.col_layout.group_offsets[c] + value_offset
+        if self.state.found_by_col.values[col_offset] > 0:
             return False
         if self.state.hints_grid[r, c, value] == 0:
             return False
@@ -192,8 +270,11 @@ class RenzokuPuzzle(Puzzle):
         return True
 
     def _update_grid(self, r, c, value, delta):
-        self.state.found_by_row[r, value] += delta
-        self.state.found_by_col[c, value] += delta
+        value_offset = self.row_layout.value_offsets[value]
+        row_offset = self.row_layout.group_offsets[r] + value_offset
+        self.state.found_by_row.values[row_offset] += delta
+        col_offset = self.col_layout.group_offsets[c] + value_offset
+        self.state.found_by_col.values[col_offset] += delta
 
     def set_value(self, location, value):
         location_type, location_data = location
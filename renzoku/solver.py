@@ -2,19 +2,7 @@ from logic_puzzles.solver import SimpleBranchingSolver
 from logic_puzzles.sudoku_like import SudokuLike
 
 
-class RenzokuSolver(SimpleBranchingSolver, SudokuLike):
-    def get_constrained_locations(self):
-        res = []
-        res.extend(  # rows
-            [("grid", (r, c)) for c in range(self.puzzle.grid_utils.cols)]
-            for r in range(self.puzzle.grid_utils.rows)
-        )
-        res.extend(  # cols
-            [("grid", (r, c)) for r in range(self.puzzle.grid_utils.rows)]
-            for c in range(self.puzzle.grid_utils.cols)
-        )
-        return res
-
+class RenzokuSolver(SudokuLike, SimpleBranchingSolver):
     def get_branching_score(self, location):
         location_type, location_data = location
         if location_type == "hint":
@@ -33,6 +21,10 @@ class RenzokuSolver(SimpleBranchingSolver, SudokuLike):
         if res is not None:
             return res
 
+        res = self._solve_eliminations()
+        if res is not None:
+            return res
+
         return super()._branching_solve()
 
     def _compute_dirty(self, location):
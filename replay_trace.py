@@ -0,0 +1,78 @@
+import argparse
+from logic_puzzles.trace import analyze_trace
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Rebuilds the search tree of a trace recorded with main.py "
+        "--trace and reports where the search spent its time"
+    )
+    parser.add_argument("trace", help="Trace file")
+    parser.add_argument(
+        "--hot", type=int, default=10, help="Number of hot subtrees to report"
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=1,
+        help="Minimum depth of the hot subtrees, 0 includes the root",
+    )
+    parser.add_argument(
+        "--locations",
+        type=int,
+        default=10,
+        help="Number of thrashing locations to report",
+    )
+    return parser.parse_args()
+
+
+def format_decisions(decisions):
+    return " ".join(f"{location}={value}" for location, value in decisions)
+
+
+def main():
+    args = parse_args()
+    report = analyze_trace(args.trace, hot_count=args.hot, min_depth=args.depth)
+
+    totals = report.totals
+    print(
+        f"branches {totals['branches']}, decisions {totals['decisions']}, "
+        f"dead ends {totals['dead_ends']}, solutions {totals['solutions']}, "
+        f"max depth {totals['max_depth']}"
+        + (" (truncated)" if totals["truncated"] else "")
+    )
+    deductions = ", ".join(f"{k}={v}" for k, v in totals["deductions"].items())
+    print(f"deductions: {deductions or '-'}")
+
+    heuristic = report.heuristic
+    first_choice = heuristic["first_choice_hits"]
+    print(
+        f"branching factor {heuristic['branching_factor']:.2f}, "
+        f"failed branches {heuristic['failed_branches']:.1%}, first choice hits "
+        + (f"{first_choice:.1%}" if first_choice is not None else "-")
+    )
+
+    print()
+    print("Hot subtrees")
+    print(f"{'branches':>8} {'sol':>4} {'depth':>5}  location  decisions")
+    for subtree in report.hot_subtrees:
+        print(
+            f"{subtree.branches:>8} {subtree.solutions:>4} {len(subtree.path):>5}  "
+            f"{subtree.location}  {format_decisions(subtree.path)}"
+        )
+
+    print()
+    print("Thrashing locations")
+    print(f"{'branched':>8} {'failed':>8} {'subtree':>8}  location")
+    locations = sorted(
+        report.locations.items(), key=lambda x: (-x[1].branches, -x[1].failed)
+    )
+    for location, x in locations[: args.locations]:
+        print(
+            f"{x.branches:>8} {x.failed / x.branches:>8.1%} "
+            f"{x.subtree_branches / x.branches:>8.1f}  {location}"
+        )
+
+
+if __name__ == "__main__":
+    main()
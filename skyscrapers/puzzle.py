@@ -1,10 +1,34 @@
-from functools import cache
+from functools import cache, cached_property
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    matches_givens,
+    get_line_groups,
+    are_groups_distinct,
+    encode_grids,
+    batch_is_complete,
+    batch_matches_givens,
+    batch_groups_distinct,
+)
 from .vision_computer import compute_vision_lower_bound, compute_vision_upper_bound
 
 
+def count_visible(buildings):
+    """How many buildings are seen from the start of the line, the ones behind
+    a taller building are hidden"""
+    res, tallest = 0, -1
+    for height in buildings:
+        if height > tallest:
+            res, tallest = res + 1, height
+
+    return res
+
+
 class SkyscrapersPuzzleState(PuzzleState):
+    __slots__ = ("grid", "found_by_row", "found_by_col", "hints")
+
     grid: list[list[int | None]]
     found_by_row: list[list[int]]  # row -> value -> frequency
     found_by_col: list[list[int]]  # col -> value -> frequency
@@ -96,6 +120,71 @@ class SkyscrapersPuzzle(Puzzle):
 
         return "\n".join(res)
 
+    @cached_property
+    def givens_grid(self):
+        return [
+            [None if x == "." else int(x) - 1 for x in row] for row in self.initial_grid
+        ]
+
+    @cached_property
+    def groups(self):
+        """The cells of each row and column"""
+        return get_line_groups(self.grid_utils.rows, self.grid_utils.cols)
+
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, set(self.iter_values())):
+            return False
+        if not matches_givens(grid, self.givens_grid):
+            return False
+        if not are_groups_distinct(grid, self.groups):
+            return False
+
+        cols = [list(col) for col in zip(*grid)]
+        for lines, (start_counts, end_counts) in (
+            (grid, self.row_counts),
+            (cols, self.col_counts),
+        ):
+            for line, start, end in zip(lines, start_counts, end_counts):
+                if start is not None and count_visible(line) != start:
+                    return False
+                if end is not None and count_visible(line[::-1]) != end:
+                    return False
+
+        return True
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        # the values are 0..n-1, their codes are the values themselves
+        values = list(self.iter_values())
+        codes = encode_grids([state.grid for state in states], values)
+        given_codes = encode_grids([self.givens_grid], values)[0]
+        res = (
+            batch_is_complete(codes)
+            & batch_matches_givens(codes, given_codes)
+            & batch_groups_distinct(codes, self.groups)
+        )
+
+        for lines, (start_counts, end_counts) in (
+            (codes, self.row_counts),
+            (codes.transpose(0, 2, 1), self.col_counts),
+        ):
+            for seen, targets in (
+                (lines, start_counts),
+                (lines[:, :, ::-1], end_counts),
+            ):
+                # a building is seen when it is taller than all of the previous
+                tallest = np.maximum.accumulate(seen, axis=2)
+                visible = (seen[:, :, 1:] > tallest[:, :, :-1]).sum(axis=2) + 1
+                for i, target in enumerate(targets):
+                    if target is not None:
+                        res &= visible[:, i] == target
+
+        return res.tolist()
+
     def _update_conflicts(self, r, c, value, delta):
         self.state.found_by_row[r][value] += delta
         self.state.found_by_col[c][value] += delta
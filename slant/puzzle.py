@@ -2,11 +2,21 @@ from itertools import product
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils, STRAIGHT_LINES
 from logic_puzzles.constraints import CountConstraint
+from logic_puzzles.counters import CounterLayout, Counters
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    has_cycle,
+    encode_grids,
+    batch_is_complete,
+)
 
 
 class SlantPuzzleState(PuzzleState):
+    __slots__ = ("grid", "found_by_intersection")
+
     grid: list[list[str | None]]
-    found_by_intersection: dict[tuple[int, int, int], int]
+    found_by_intersection: Counters  # (r, c), value -> count
 
     def __init__(self, grid, found_by_intersection):
         self.grid = grid
@@ -20,6 +30,7 @@ class SlantPuzzle(Puzzle):
     numbered_intersections: list[tuple[int, int]]
     intersections_by_cell: dict[tuple[int, int], list[tuple[int, int, str]]]
     intersections_constraints: dict[tuple[int, int], CountConstraint]
+    intersection_layout: CounterLayout
 
     @classmethod
     def from_string(cls, string):
@@ -62,6 +73,8 @@ class SlantPuzzle(Puzzle):
                 self.intersections[r][c], neighbors
             )
 
+        self.intersection_layout = CounterLayout(self.numbered_intersections, (0, 1))
+
         if state is None:
             self.initialize_state()
 
@@ -82,11 +95,62 @@ class SlantPuzzle(Puzzle):
     def initialize_state(self):
         self.state = SlantPuzzleState(
             grid=[[None] * self.grid_utils.cols for _ in range(self.grid_utils.rows)],
-            found_by_intersection={
-                (r, c, value): 0
-                for r, c in self.numbered_intersections
-                for value in (0, 1)
-            },
+            found_by_intersection=self.intersection_layout.new_counters(),
+        )
+
+    def get_slant_ends(self, r, c, value):
+        """The two intersections joined by the slant of a cell"""
+        if value == "\\":
+            return (r, c), (r + 1, c + 1)
+        return (r, c + 1), (r + 1, c)
+
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, set(self.iter_values())):
+            return False
+        if any(
+            sum(
+                grid[cell_r][cell_c] == slant
+                for cell_r, cell_c, _, _, slant in self.adjacent_intersections(r, c)
+            )
+            != self.intersections[r][c]
+            for r, c in self.numbered_intersections
+        ):
+            return False
+
+        return not self._has_cycle(grid)
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], ("/", "\\"))
+        res = batch_is_complete(codes)
+
+        # an intersection is touched by the back slashes of the cells above on
+        # the left and below on the right, by the slashes of the other two
+        back = np.pad(codes == 1, ((0, 0), (1, 1), (1, 1)))
+        forward = np.pad(codes == 0, ((0, 0), (1, 1), (1, 1)))
+        counts = (
+            back[:, :-1, :-1].astype(np.int16)
+            + back[:, 1:, 1:]
+            + forward[:, :-1, 1:]
+            + forward[:, 1:, :-1]
+        )
+        for r, c in self.numbered_intersections:
+            res &= counts[:, r, c] == self.intersections[r][c]
+
+        # cycles are checked on the remaining states
+        return [
+            bool(valid) and not self._has_cycle(state.grid)
+            for valid, state in zip(res, states)
+        ]
+
+    def _has_cycle(self, grid):
+        return has_cycle(
+            self.get_slant_ends(r, c, grid[r][c])
+            for r, c in self.grid_utils.iter_grid()
         )
 
     def iter_locations(self):
@@ -103,8 +167,8 @@ class SlantPuzzle(Puzzle):
 
         for new_r, new_c, _ in self.intersections_by_cell[r, c]:
             if not self.intersections_constraints[new_r, new_c].check(
-                self.state.found_by_intersection[new_r, new_c, 1],
-                self.state.found_by_intersection[new_r, new_c, 0],
+                self.state.found_by_intersection[(new_r, new_c), 1],
+                self.state.found_by_intersection[(new_r, new_c), 0],
             ):
                 res = False
                 break
@@ -123,7 +187,7 @@ class SlantPuzzle(Puzzle):
     def _update_value(self, r, c, value, delta):
         for new_r, new_c, slant in self.intersections_by_cell[r, c]:
             new_value = 1 if slant == value else 0
-            self.state.found_by_intersection[new_r, new_c, new_value] += delta
+            self.state.found_by_intersection.add(((new_r, new_c), new_value), delta)
 
     def set_value(self, location, value):
         r, c = location
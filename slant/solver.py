@@ -16,8 +16,8 @@ class SlantSolver(SimpleBranchingSolver):
 
         return max(
             self.puzzle.intersections_constraints[new_r, new_c].get_branching_score(
-                self.puzzle.state.found_by_intersection[new_r, new_c, 1],
-                self.puzzle.state.found_by_intersection[new_r, new_c, 0],
+                self.puzzle.state.found_by_intersection[(new_r, new_c), 1],
+                self.puzzle.state.found_by_intersection[(new_r, new_c), 0],
             )
             for new_r, new_c, _ in self.puzzle.intersections_by_cell[r, c]
         )
@@ -53,7 +53,7 @@ class SlantSolver(SimpleBranchingSolver):
                 if self.puzzle.intersections[r][c] is None:
                     continue
 
-                found = self.state.found_by_intersection[r, c, 1]
+                found = self.state.found_by_intersection[(r, c), 1]
                 missing = self.puzzle.intersections_constraints[r, c].get_missing(found)
                 if missing == 0:
                     continue
@@ -111,7 +111,7 @@ class SlantSolver(SimpleBranchingSolver):
             print(f"found by testing all combinations: {len(to_update)}")
 
         if to_update:
-            return self._solve_updates_map(to_update)
+            return self._solve_updates_map(to_update, "combinations")
 
         if not self.puzzle.check_no_cycles():
             if self.debug:
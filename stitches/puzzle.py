@@ -2,19 +2,34 @@ from collections import namedtuple
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils, ARROWS
 from logic_puzzles.constraints import CountConstraint
+from logic_puzzles.counters import CounterLayout, Counters
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    encode_grids,
+    batch_is_complete,
+)
 
 DIRECTION_ARROW = {value: key for key, value in ARROWS.items()}
 
 
 class StitchesPuzzleState(PuzzleState):
+    __slots__ = (
+        "grid",
+        "links",
+        "found_by_row",
+        "found_by_col",
+        "found_by_region",
+        "found_by_region_pairs",
+        "used_holes",
+    )
+
     grid: list[list[int | None]]
     links: list[int | None]  # link_id -> present
-    found_by_row: dict[tuple[int, int], int]  # r, value -> frequency
-    found_by_col: dict[tuple[int, int], int]  # c, value -> frequency
-    found_by_region: dict[tuple[int, int], int]  # region, value -> frequency
-    found_by_region_pairs: dict[
-        tuple[tuple[int, int], int], int
-    ]  # a, b, value -> frequency
+    found_by_row: Counters  # r, value -> frequency
+    found_by_col: Counters  # c, value -> frequency
+    found_by_region: Counters  # region, value -> frequency
+    found_by_region_pairs: Counters  # (a, b), value -> frequency
     used_holes: dict[tuple[int, int], int]  # r, c -> link_id
 
     def __init__(
@@ -54,6 +69,10 @@ class StitchesPuzzle(Puzzle):
         str, dict[str, list[int]]
     ]  # region -> neighboring region -> link ids
     stitches_by_regions_pair: int
+    row_layout: CounterLayout
+    col_layout: CounterLayout
+    region_layout: CounterLayout
+    region_pairs_layout: CounterLayout
 
     @classmethod
     def from_string(cls, string):
@@ -134,9 +153,19 @@ class StitchesPuzzle(Puzzle):
             for region, cells in self.regions.items()
         }
 
+        self.row_layout = CounterLayout(range(self.grid_utils.rows), range(2))
+        self.col_layout = CounterLayout(range(self.grid_utils.cols), range(2))
+        self.region_layout = CounterLayout(self.regions.keys(), range(2))
+        region_pairs = set(link.regions for link in self.links)
+        self.region_pairs_layout = CounterLayout(region_pairs, range(2))
+
         if state is None:
             self.initialize_state()
 
+    def encode_solution(self, state):
+        # the links are the decisions, the holes follow from them
+        return [[state.links[link_id] for link_id, _ in enumerate(self.links)]]
+
     def __str__(self):
         def stringify_cell(r, c):
             if self.state.grid[r][c] is None:
@@ -159,27 +188,13 @@ class StitchesPuzzle(Puzzle):
         )
 
     def initialize_state(self):
-        region_pairs = set(link.regions for link in self.links)
-
         self.state = StitchesPuzzleState(
             grid=[[None] * self.grid_utils.cols for _ in range(self.grid_utils.rows)],
             links={link_id: None for link_id, _ in enumerate(self.links)},
-            found_by_row={
-                (r, value): 0 for r in range(self.grid_utils.rows) for value in range(2)
-            },
-            found_by_col={
-                (c, value): 0 for c in range(self.grid_utils.cols) for value in range(2)
-            },
-            found_by_region={
-                (region, value): 0
-                for region in self.regions.keys()
-                for value in range(2)
-            },
-            found_by_region_pairs={
-                ((region_a, region_b), value): 0
-                for region_a, region_b in region_pairs
-                for value in range(2)
-            },
+            found_by_row=self.row_layout.new_counters(),
+            found_by_col=self.col_layout.new_counters(),
+            found_by_region=self.region_layout.new_counters(),
+            found_by_region_pairs=self.region_pairs_layout.new_counters(),
             used_holes={
                 (r, c): None
                 for r in range(self.grid_utils.rows)
@@ -187,6 +202,70 @@ class StitchesPuzzle(Puzzle):
             },
         )
 
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, {0, 1}):
+            return False
+        if any(state.links[link_id] not in (0, 1) for link_id in state.links):
+            return False
+        if any(sum(row) != target for row, target in zip(grid, self.target_by_row)):
+            return False
+        if any(
+            sum(col) != target for col, target in zip(zip(*grid), self.target_by_col)
+        ):
+            return False
+
+        # the holes are exactly the cells of the links, each used once
+        used = [[0] * self.grid_utils.cols for _ in range(self.grid_utils.rows)]
+        found_by_region_pairs = {}
+        for link_id, link in enumerate(self.links):
+            if not state.links[link_id]:
+                continue
+
+            for r, c in link.cells:
+                used[r][c] += 1
+            found_by_region_pairs[link.regions] = (
+                found_by_region_pairs.get(link.regions, 0) + 1
+            )
+
+        if used != grid:
+            return False
+
+        return all(
+            found_by_region_pairs.get(link.regions, 0) == self.stitches_by_regions_pair
+            for link in self.links
+        )
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], (0, 1))
+        links = encode_grids([self.encode_solution(state) for state in states], (0, 1))
+        links = links[:, 0]
+        res = (
+            batch_is_complete(codes)
+            & (links >= 0).all(axis=1)
+            & (codes.sum(axis=2) == self.target_by_row).all(axis=1)
+            & (codes.sum(axis=1) == self.target_by_col).all(axis=1)
+        )
+
+        # (links x cells) and (links x region pairs) incidence matrices
+        region_pairs = sorted(set(link.regions for link in self.links))
+        link_cells = np.zeros((len(self.links), codes[0].size), dtype=np.int16)
+        link_pairs = np.zeros((len(self.links), len(region_pairs)), dtype=np.int16)
+        for link_id, link in enumerate(self.links):
+            for r, c in link.cells:
+                link_cells[link_id, r * self.grid_utils.cols + c] = 1
+            link_pairs[link_id, region_pairs.index(link.regions)] = 1
+
+        links = np.maximum(links, 0)
+        res &= (links @ link_cells == codes.reshape(len(states), -1)).all(axis=1)
+        res &= (links @ link_pairs == self.stitches_by_regions_pair).all(axis=1)
+
+        return res.tolist()
+
     def iter_values(self):
         yield from (0, 1)
 
@@ -322,7 +401,7 @@ class StitchesPuzzle(Puzzle):
 
     def _update_link(self, link_id, value, delta):
         link = self.links[link_id]
-        self.state.found_by_region_pairs[link.regions, value] += delta
+        self.state.found_by_region_pairs.add((link.regions, value), delta)
 
     def set_link(self, link_id, value):
         assert self.state.links[link_id] is None
@@ -347,9 +426,9 @@ class StitchesPuzzle(Puzzle):
 
     def _update_cell(self, r, c, value, delta):
         region = self.initial_grid[r][c]
-        self.state.found_by_row[r, value] += delta
-        self.state.found_by_col[c, value] += delta
-        self.state.found_by_region[region, value] += delta
+        self.state.found_by_row.add((r, value), delta)
+        self.state.found_by_col.add((c, value), delta)
+        self.state.found_by_region.add((region, value), delta)
 
     def set_cell(self, r, c, value):
         assert self.state.grid[r][c] is None
@@ -0,0 +1,279 @@
+import os
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from logic_puzzles.validation import import_numpy
+
+np = import_numpy()  # the vectorized mode is optional, see solve_batch
+
+ALL_VALUES = (1 << 9) - 1
+CELL_ROW = tuple(i // 9 for i in range(81))
+CELL_COL = tuple(i % 9 for i in range(81))
+CELL_BOX = tuple(i // 27 * 3 + i % 9 // 3 for i in range(81))
+BIT_COUNT = tuple(bin(x).count("1") for x in range(1 << 9))
+BIT_DIGIT = {1 << i: str(i + 1) for i in range(9)}
+DIGIT_BIT = {str(i + 1): 1 << i for i in range(9)}
+BLANKS = ".0"
+
+
+class BulkSudokuSolver:
+    """Solver for 9x9 Sudokus in the one-line format (81 characters, "." or
+    "0" for blanks). The values are bitmasks and every array is allocated
+    once, load resets them in place for the next puzzle."""
+
+    __slots__ = ("cells", "rows", "cols", "boxes", "empties")
+
+    cells: list[int]  # cell -> bit of its value, 0 if unset
+    rows: list[int]  # row -> bits of its values
+    cols: list[int]
+    boxes: list[int]
+    empties: list[int]  # unset cells
+
+    def __init__(self):
+        self.cells = [0] * 81
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        self.empties = []
+
+    def load(self, line):
+        """Sets up the puzzle of a line, False if its givens conflict"""
+        if len(line) != 81:
+            raise ValueError(f"Expected 81 characters, got {len(line)}")
+
+        cells, rows, cols, boxes = self.cells, self.rows, self.cols, self.boxes
+        rows[:] = cols[:] = boxes[:] = [0] * 9
+        self.empties.clear()
+        for i, char in enumerate(line):
+            if char in BLANKS:
+                cells[i] = 0
+                self.empties.append(i)
+                continue
+
+            bit = DIGIT_BIT.get(char)
+            if bit is None:
+                raise ValueError(f"Unexpected character {char!r}")
+
+            r, c, b = CELL_ROW[i], CELL_COL[i], CELL_BOX[i]
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                return False
+
+            cells[i] = bit
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+
+        return True
+
+    def _search(self):
+        empties = self.empties
+        if not empties:
+            return True
+
+        rows, cols, boxes = self.rows, self.cols, self.boxes
+        best_i, best_values, best_count = -1, 0, 10
+        for i, cell in enumerate(empties):
+            values = ALL_VALUES & ~(
+                rows[CELL_ROW[cell]] | cols[CELL_COL[cell]] | boxes[CELL_BOX[cell]]
+            )
+            count = BIT_COUNT[values]
+            if count < best_count:
+                best_i, best_values, best_count = i, values, count
+                if count <= 1:
+                    break
+
+        if best_count == 0:
+            return False
+
+        cell = empties[best_i]
+        empties[best_i] = empties[-1]
+        empties.pop()
+        r, c, b = CELL_ROW[cell], CELL_COL[cell], CELL_BOX[cell]
+        while best_values:
+            bit = best_values & -best_values
+            best_values ^= bit
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+            if self._search():
+                self.cells[cell] = bit
+                return True
+
+            rows[r] ^= bit
+            cols[c] ^= bit
+            boxes[b] ^= bit
+
+        empties.append(empties[best_i] if best_i < len(empties) else cell)
+        empties[best_i] = cell
+        return False
+
+    def solve(self, line):
+        """The first solution of a puzzle as a line, None if it has none"""
+        if not self.load(line) or not self._search():
+            return None
+
+        return "".join(BIT_DIGIT[x] for x in self.cells)
+
+
+def count_by_group(cells):
+    """The number of cells of each row, column and box holding each value,
+    for 9 x 9 x 9 x K boolean cells (row, column, value, puzzle)"""
+    boxes = cells.reshape(3, 3, 3, 3, 9, -1).sum(axis=(1, 3), dtype=np.uint8)
+    return cells.sum(axis=1, dtype=np.uint8), cells.sum(axis=0, dtype=np.uint8), boxes
+
+
+def spread_groups(rows, cols, boxes):
+    """The 9 x 9 x 9 x K cells of the groups in which the values are set, for
+    9 x 9 x K boolean rows and cols and 3 x 3 x 9 x K boxes"""
+    res = rows[:, None] | cols[None, :]
+    res = res.reshape(3, 3, 3, 3, 9, -1) | boxes[:, None, :, None]
+    return res.reshape(9, 9, 9, -1)
+
+
+class BatchSudokuSolver:
+    """Vectorized solver for batches of 9x9 Sudokus in the one-line format,
+    through NumPy. A batch of K puzzles is a K x 81 x 9 boolean tensor of
+    the candidates of each cell, naked and hidden singles are applied to all
+    the puzzles at once until nothing changes, and only the puzzles left
+    unsolved are searched one by one, by BulkSudokuSolver, starting from the
+    cells found by the singles. The singles hold in every solution, but the
+    search then branches on other cells than solve_lines would, so puzzles
+    with several solutions may get a different, still valid, first one."""
+
+    __slots__ = ("fallback",)
+
+    fallback: BulkSudokuSolver
+
+    def __init__(self):
+        self.fallback = BulkSudokuSolver()
+
+    def load(self, lines):
+        """The candidates of the puzzles of the lines"""
+        for line in lines:
+            if len(line) != 81:
+                raise ValueError(f"Expected 81 characters, got {len(line)}")
+
+        chars = np.frombuffer(
+            "".join(lines).encode("ascii", "replace"), dtype=np.uint8
+        ).reshape(len(lines), 81)
+        blanks = np.isin(chars, np.frombuffer(BLANKS.encode(), dtype=np.uint8))
+        digits = chars.astype(np.int16) - ord("0")
+        unexpected = ~blanks & ((digits < 1) | (digits > 9))
+        if unexpected.any():
+            k, i = np.argwhere(unexpected)[0]
+            raise ValueError(f"Unexpected character {lines[k][i]!r}")
+
+        candidates = np.ones((len(lines), 81, 9), dtype=bool)
+        candidates[~blanks] = digits[~blanks, None] == np.arange(1, 10)
+        return candidates
+
+    def propagate(self, candidates):
+        """Applies naked and hidden singles to the candidates in place, until
+        nothing changes. Returns whether each puzzle is solved (True), has
+        no solution (False) or is left for the search (None)."""
+        res = np.full(len(candidates), None, dtype=object)
+        active = np.arange(len(candidates))
+        # the puzzles are the last axis, so that the rows, columns and boxes
+        # are reshapes and every count adds up contiguous vectors of puzzles
+        cells = candidates.reshape(-1, 9, 9, 9).transpose(1, 2, 3, 0)
+        cells = np.ascontiguousarray(cells)
+        while len(active):
+            fixed = cells & (cells.sum(axis=2, dtype=np.uint8) == 1)[:, :, None]
+
+            # naked singles, the values fixed in a group leave its other cells
+            fixed_counts = count_by_group(fixed)
+            failed = np.zeros(len(active), dtype=bool)
+            for x in fixed_counts:
+                failed |= (x > 1).reshape(-1, len(active)).any(axis=0)
+            solved = fixed.sum(axis=(0, 1, 2), dtype=np.int16) == 81
+            solved &= ~failed
+            new = cells & (fixed | ~spread_groups(*(x > 0 for x in fixed_counts)))
+
+            # hidden singles, a value fitting in a single cell of a group
+            counts = count_by_group(new)
+            for x in counts:
+                failed |= (x == 0).reshape(-1, len(active)).any(axis=0)
+            hidden = new & spread_groups(*(x == 1 for x in counts))
+            hidden_counts = hidden.sum(axis=2, dtype=np.uint8)
+            failed |= (hidden_counts > 1).any(axis=(0, 1))
+            new = np.where((hidden_counts == 1)[:, :, None], hidden, new)
+
+            res[active[solved]] = True
+            res[active[failed]] = False
+            done = solved | failed | ~(new != cells).any(axis=(0, 1, 2))
+            finished = new.compress(done, axis=3)
+            candidates[active[done]] = finished.transpose(3, 0, 1, 2).reshape(-1, 81, 9)
+            active, cells = active[~done], new.compress(~done, axis=3)
+
+        return res
+
+    def solve(self, lines):
+        """The first solution of each line, None for the puzzles without one"""
+        if not lines:
+            return []
+
+        candidates = self.load(lines)
+        solved = self.propagate(candidates)
+        digits = np.where(
+            candidates.sum(axis=2) == 1, candidates.argmax(axis=2) + ord("1"), ord(".")
+        ).astype(np.uint8)
+
+        res = []
+        for line, status in zip(digits, solved):
+            line = line.tobytes().decode()
+            if status is None:
+                # the search starts from the cells found by the singles
+                res.append(self.fallback.solve(line))
+            else:
+                res.append(line if status else None)
+
+        return res
+
+
+_solver = None  # one per worker process, reused across chunks
+_batch_solver = None
+
+
+def solve_lines(lines):
+    global _solver
+    if _solver is None:
+        _solver = BulkSudokuSolver()
+
+    return [_solver.solve(line) for line in lines]
+
+
+def solve_batch(lines):
+    """Same as solve_lines through BatchSudokuSolver, when NumPy is found"""
+    global _batch_solver
+    if np is None:
+        return solve_lines(lines)
+    if _batch_solver is None:
+        _batch_solver = BatchSudokuSolver()
+
+    return _batch_solver.solve(lines)
+
+
+def iter_chunks(lines, chunk_size):
+    lines = iter(lines)
+    while chunk := list(islice(lines, chunk_size)):
+        yield chunk
+
+
+def solve_stream(lines, jobs=None, chunk_size=1024, vectorized=False):
+    """Yields the solution of each line in order, None for the puzzles
+    without one, solving chunks of lines on a pool of jobs processes. Only
+    a few chunks per process are read ahead, so that the input can be
+    streamed. Vectorized solves each chunk as a batch, see
+    BatchSudokuSolver."""
+    solve = solve_batch if vectorized else solve_lines
+    chunks = iter_chunks(lines, chunk_size)
+    if jobs == 1:
+        for chunk in chunks:
+            yield from solve(chunk)
+        return
+
+    jobs = jobs or os.cpu_count()
+    with ProcessPoolExecutor(jobs) as executor:
+        window = 4 * jobs
+        while batch := list(islice(chunks, window)):
+            for solutions in executor.map(solve, batch):
+                yield from solutions
@@ -0,0 +1,198 @@
+from itertools import groupby, permutations, product
+from math import factorial, prod
+from logic_puzzles.symmetry import GridTransform, relabel_by_appearance
+
+
+class CanonicalSearchState:
+    """A partial canonical transform, the rows chosen so far and the column
+    orders which are still equally good. Columns are split into groups of
+    interchangeable stacks, each stack being an ordered list of cells, each
+    cell a set of interchangeable columns."""
+
+    rows: tuple[int]
+    groups: list[list[list[list[int]]]]
+    labels: dict[str, int]
+
+    def __init__(self, rows, groups, labels):
+        self.rows = rows
+        self.groups = groups
+        self.labels = labels
+
+
+class CanonicalSearchBudget:
+    """The number of search nodes the canonical search may still create, grids
+    with many givens tie on a lot of transforms and the frontier of equally
+    good states grows exponentially"""
+
+    nodes: int
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def spend(self, count):
+        self.nodes -= count
+        if self.nodes < 0:
+            raise CanonicalBudgetExceeded()
+
+
+class CanonicalBudgetExceeded(Exception):
+    pass
+
+
+def _refine_stack(stack, values, labels, new_key):
+    seq, cells = [], []
+    for cell in stack:
+        by_key = {}
+        for col in cell:
+            value = values[col]
+            key = 0 if value is None else labels.get(value, new_key)
+            by_key.setdefault(key, []).append(col)
+
+        for key in sorted(by_key):
+            seq.extend([key] * len(by_key[key]))
+            cells.append((key, by_key[key]))
+
+    return tuple(seq), cells
+
+
+def _count_new_value_orders(stack, new_key):
+    return prod(factorial(len(cols)) for key, cols in stack if key == new_key)
+
+
+def _iter_new_value_orders(stack, new_key):
+    """Values seen for the first time get their labels by order of appearance,
+    so the order of tied columns holding them has to be fixed by branching"""
+    options = []
+    for key, cols in stack:
+        if key == new_key and len(cols) > 1:
+            options.append(
+                [[(key, [col]) for col in perm] for perm in permutations(cols)]
+            )
+        else:
+            options.append([[(key, cols)]])
+
+    for choice in product(*options):
+        yield [cell for cells in choice for cell in cells]
+
+
+def _refine(state, values, new_key, budget):
+    """Computes the smallest row the values can produce given the state, along
+    with the alternative column orders producing it"""
+    budget.spend(1)
+    pattern, parts = [], []
+    for group in state.groups:
+        refined = sorted(
+            (_refine_stack(stack, values, state.labels, new_key) for stack in group),
+            key=lambda x: x[0],
+        )
+        for seq, subgroup in groupby(refined, key=lambda x: x[0]):
+            stacks = [cells for _, cells in subgroup]
+            pattern.extend(seq * len(stacks))
+            if new_key not in seq:
+                parts.append([[stacks]])
+                continue
+
+            budget.spend(
+                factorial(len(stacks))
+                * prod(_count_new_value_orders(stack, new_key) for stack in stacks)
+            )
+            parts.append(
+                [
+                    [[stack] for stack in ordered_stacks]
+                    for perm in permutations(stacks)
+                    for ordered_stacks in product(
+                        *(_iter_new_value_orders(stack, new_key) for stack in perm)
+                    )
+                ]
+            )
+
+    return tuple(pattern), parts
+
+
+def _iter_next_states(state, r, values, parts, new_key, budget):
+    budget.spend(prod(len(part) for part in parts))
+    for combination in product(*parts):
+        groups = [group for alternative in combination for group in alternative]
+        labels = dict(state.labels)
+        for group in groups:
+            for stack in group:
+                for key, cols in stack:
+                    if key == new_key:
+                        labels[values[cols[0]]] = len(labels) + 1
+
+        yield CanonicalSearchState(
+            state.rows + (r,),
+            [[[cols for _, cols in stack] for stack in group] for group in groups],
+            labels,
+        )
+
+
+def _iter_candidate_rows(rows, box_rows, size):
+    if len(rows) % box_rows:
+        # complete the band of the previous row
+        band = rows[-1] // box_rows
+        candidates = range(band * box_rows, (band + 1) * box_rows)
+    else:
+        used_bands = set(r // box_rows for r in rows)
+        candidates = (r for r in range(size) if r // box_rows not in used_bands)
+
+    return [r for r in candidates if r not in rows]
+
+
+def find_canonical_transform(grid, box_rows, box_cols, values, max_nodes=60000):
+    """Finds the transform mapping the grid onto the smallest equivalent grid,
+    read row by row with empty cells first and values renamed by order of
+    appearance. Equivalent grids differ by transposition (for square boxes),
+    permutations of bands, stacks, rows in a band, columns in a stack, and
+    relabelling of values. Returns None if the search needs more than
+    max_nodes nodes."""
+    budget = CanonicalSearchBudget(max_nodes)
+    try:
+        return _search_canonical_transform(grid, box_rows, box_cols, values, budget)
+    except CanonicalBudgetExceeded:
+        return None
+
+
+def _search_canonical_transform(grid, box_rows, box_cols, values, budget):
+    size = len(grid)
+    new_key = size + 1
+    stacks = [
+        [list(range(s * box_cols, (s + 1) * box_cols))] for s in range(size // box_cols)
+    ]
+
+    frontier = []
+    for transpose in (False, True) if box_rows == box_cols else (False,):
+        source = [list(col) for col in zip(*grid)] if transpose else grid
+        frontier.append((transpose, source, CanonicalSearchState((), [stacks], {})))
+
+    for _ in range(size):
+        best, next_frontier = None, []
+        for transpose, source, state in frontier:
+            for r in _iter_candidate_rows(state.rows, box_rows, size):
+                pattern, parts = _refine(state, source[r], new_key, budget)
+                if best is not None and pattern > best:
+                    continue
+                if best is None or pattern < best:
+                    best, next_frontier = pattern, []
+
+                next_frontier.extend(
+                    (transpose, source, x)
+                    for x in _iter_next_states(
+                        state, r, source[r], parts, new_key, budget
+                    )
+                )
+
+        frontier = next_frontier
+
+    transpose, _, state = frontier[0]
+    cols = [
+        col
+        for group in state.groups
+        for stack in group
+        for cell in stack
+        for col in cell
+    ]
+    labels = sorted(state.labels, key=state.labels.get)
+    value_map = relabel_by_appearance([labels], values, values)
+
+    return GridTransform(transpose, list(state.rows), cols, value_map)
@@ -0,0 +1,71 @@
+from math import factorial
+
+
+def get_band_cells(puzzle):
+    """The cells of the band holding the most givens, its first row first"""
+    height = puzzle.rows_square_size
+    bands = range(puzzle.grid_utils.rows // height)
+
+    def count_givens(band):
+        rows = puzzle.initial_grid[band * height : (band + 1) * height]
+        return sum(cell is not None for row in rows for cell in row)
+
+    band = max(bands, key=count_givens)
+    return [
+        (r, c)
+        for r in range(band * height, (band + 1) * height)
+        for c in range(puzzle.grid_utils.cols)
+    ]
+
+
+def iter_band_completions(puzzle, check_timeout):
+    """Iterates over the grids of the ways to fill the band with the most
+    givens in which the values missing from the givens appear in increasing
+    order along its first row. Those values are interchangeable, so each
+    grid stands for factorial(len(free)) completions, returned alongside."""
+    cells = [x for x in get_band_cells(puzzle) if puzzle.get_value(x) is None]
+    first_row = cells[0][0] if cells else None
+    givens = {x for row in puzzle.initial_grid for x in row if x is not None}
+    free = [x for x in puzzle.values if x not in givens]
+    free_index = {value: i for i, value in enumerate(free)}
+
+    def search(i, placed_free):
+        check_timeout()
+        if i == len(cells):
+            yield [row[:] for row in puzzle.state.grid]
+            return
+
+        location = cells[i]
+        for value in puzzle.get_valid_values(location):
+            index = free_index.get(value)
+            if location[0] == first_row and index is not None:
+                if index != placed_free:
+                    continue
+                next_placed_free = placed_free + 1
+            else:
+                next_placed_free = placed_free
+
+            puzzle.set_value(location, value)
+            try:
+                yield from search(i + 1, next_placed_free)
+            finally:
+                puzzle.unset_value(location)
+
+    return search(0, 0), factorial(len(free))
+
+
+def get_band_classes(puzzle, check_timeout=lambda: None):
+    """The completions of a band grouped by the canonical form of the grid
+    they make, see SudokuPuzzle.canonicalize: equivalent grids have the same
+    number of solutions. Returns each canonical puzzle with the number of
+    completions of the band equivalent to it."""
+    completions, relabellings = iter_band_completions(puzzle, check_timeout)
+    classes = {}  # canonical string -> [canonical puzzle, completions]
+    for grid in completions:
+        canonical, _ = type(puzzle)(grid).canonicalize()
+        key = canonical.to_string()
+        if key not in classes:
+            classes[key] = [canonical, 0]
+        classes[key][1] += relabellings
+
+    return list(classes.values())
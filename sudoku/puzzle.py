@@ -2,6 +2,20 @@ from math import isqrt
 from functools import cached_property
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils
+from logic_puzzles.location_groups import LocationGroups
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    matches_givens,
+    get_line_groups,
+    are_groups_distinct,
+    encode_grids,
+    batch_is_complete,
+    batch_matches_givens,
+    batch_groups_distinct,
+)
+from logic_puzzles.symmetry import GridTransform
+from .canonical import find_canonical_transform
 
 # fmt: off
 SUDOKU_VALUES = [
@@ -11,25 +25,63 @@ SUDOKU_VALUES = [
 # fmt: on
 
 
+def get_sudoku_values(size, tokens=()):
+    """The symbols of a size x size Sudoku: single characters while they
+    suffice, the numbers from 1 to size for larger grids or when the given
+    tokens have more than one character, e.g. 10 to 16 in a 16x16"""
+    if size <= len(SUDOKU_VALUES) and all(len(x) == 1 for x in tokens):
+        return SUDOKU_VALUES[:size]
+
+    return [str(x) for x in range(1, size + 1)]
+
+
 class SudokuPuzzleState(PuzzleState):
-    grid: list[list[int | None]]
-    found_by_row: dict[tuple[int, str], int]  # row, value -> count
-    found_by_col: dict[tuple[int, str], int]  # col, value -> count
-    found_by_square: dict[
-        tuple[int, int, str], int
-    ]  # square_r, square_c, value -> count
-
-    def __init__(self, grid, found_by_row, found_by_col, found_by_square):
+    __slots__ = (
+        "grid",
+        "found_by_row",
+        "found_by_col",
+        "found_by_square",
+        "candidate_counts",
+    )
+
+    grid: list[list[str | None]]
+    found_by_row: list[int]  # row -> bitmask of the values found
+    found_by_col: list[int]  # col -> bitmask of the values found
+    found_by_square: list[int]  # square index -> bitmask of the values found
+    # group, value index -> unset cells of the group the value fits in, None
+    # for puzzles not counting them
+    candidate_counts: bytearray | None
+
+    def __init__(
+        self, grid, found_by_row, found_by_col, found_by_square, candidate_counts
+    ):
         self.grid = grid
         self.found_by_row = found_by_row
         self.found_by_col = found_by_col
         self.found_by_square = found_by_square
+        self.candidate_counts = candidate_counts
 
 
 class SudokuPuzzle(Puzzle):
-    initial_grid: list[list[int | None]]
+    """n^2 x n^2 Sudoku (or n x m boxes, e.g. 12x12). The values found in
+    each row, column and square are kept as bitmasks, bit i for values[i],
+    so checking and listing the valid values of a cell takes a few integer
+    operations whatever the size of the grid. The state also counts where
+    each value fits in each group, updated from the peers of the cells set
+    and unset, so that hidden singles are found without a rescan."""
+
+    initial_grid: list[list[str | None]]
     grid_utils: GridUtils
     state: SudokuPuzzleState
+    values: list[str]
+    value_bits: dict[str, int]  # value -> its bit
+    all_values_mask: int
+    cell_groups: list[list[tuple[int, int, int]]]  # r, c -> row, col, square
+    # r, c -> offsets of its row, column and square in the candidate counts
+    count_offsets: list[list[tuple[int, int, int]]]
+    # subclasses with more constraints than the groups turn it off, their
+    # candidates change beyond the peers of a cell
+    count_candidates: bool = True
 
     @classmethod
     def from_string(cls, string):
@@ -41,25 +93,50 @@ class SudokuPuzzle(Puzzle):
 
         return cls(initial_grid)
 
+    def to_string(self):
+        return self._format_grid(self.initial_grid)
+
+    def _format_grid(self, grid):
+        # multi-character tokens are padded to keep the columns aligned
+        width = max(map(len, self.values))
+        return "\n".join(
+            " ".join((cell if cell is not None else ".").rjust(width) for cell in row)
+            for row in grid
+        )
+
     def __init__(self, initial_grid, state=None):
         self.initial_grid = initial_grid
         self.grid_utils = GridUtils(len(initial_grid), len(initial_grid[0]))
         self.state = state
 
+        givens = {x for row in initial_grid for x in row if x is not None}
+        self.values = get_sudoku_values(self.grid_utils.rows, givens)
+        self.value_bits = {value: 1 << i for i, value in enumerate(self.values)}
+        self.all_values_mask = (1 << len(self.values)) - 1
+        unknown = givens - self.value_bits.keys()
+        if unknown:
+            raise ValueError(f"Unexpected values {', '.join(sorted(unknown))}")
+
+        self.cell_groups = [
+            [(r, c, self.get_square_index(r, c)) for c in range(self.grid_utils.cols)]
+            for r in range(self.grid_utils.rows)
+        ]
+
+        # groups are laid out as in self.groups: rows, columns, squares
+        size = len(self.values)
+        self.count_offsets = [
+            [
+                (row * size, (size + col) * size, (2 * size + square) * size)
+                for row, col, square in cells
+            ]
+            for cells in self.cell_groups
+        ]
+
         if state is None:
             self.initialize_state()
 
     def __str__(self):
-        def stringify_cell(r, c):
-            if self.state.grid[r][c] is None:
-                return "."
-
-            return str(self.state.grid[r][c])
-
-        return "\n".join(
-            " ".join(stringify_cell(r, c) for c in range(self.grid_utils.cols))
-            for r in range(self.grid_utils.rows)
-        )
+        return self._format_grid(self.state.grid)
 
     @cached_property
     def rows_square_size(self):
@@ -87,75 +164,242 @@ class SudokuPuzzle(Puzzle):
             for dc in range(self.cols_square_size):
                 yield base_r + dr, base_c + dc
 
+    @cached_property
+    def groups(self):
+        """The cells of each row, column and square"""
+        return get_line_groups(self.grid_utils.rows, self.grid_utils.cols) + [
+            list(self.iter_square(square_r, square_c))
+            for square_r in range(self.rows_square_count)
+            for square_c in range(self.cols_square_count)
+        ]
+
+    @cached_property
+    def location_groups(self):
+        """The groups holding every value, indexed for the solvers"""
+        return LocationGroups(self.groups)
+
+    def validate(self, state):
+        return (
+            is_complete(state.grid, set(self.iter_values()))
+            and matches_givens(state.grid, self.initial_grid)
+            and are_groups_distinct(state.grid, self.groups)
+        )
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], self.values)
+        given_codes = encode_grids([self.initial_grid], self.values)[0]
+        res = (
+            batch_is_complete(codes)
+            & batch_matches_givens(codes, given_codes)
+            & batch_groups_distinct(codes, self.groups)
+        )
+        return res.tolist()
+
     def get_square_coords(self, r, c):
         square_r = r // self.rows_square_size
         square_c = c // self.cols_square_size
 
         return square_r, square_c
 
-    def initialize_state(self):
-        self.state = SudokuPuzzleState(
+    def get_square_index(self, r, c):
+        square_r, square_c = self.get_square_coords(r, c)
+        return square_r * self.cols_square_count + square_c
+
+    def canonicalize(self):
+        """Returns the canonical puzzle equivalent to this one, along with the
+        transform from this puzzle to it. Grids too symmetric for the search
+        budget are their own canonical form, with the identity transform."""
+        transform = find_canonical_transform(
+            self.initial_grid,
+            self.rows_square_size,
+            self.cols_square_size,
+            self.values,
+        )
+        if transform is None:
+            size = self.grid_utils.rows
+            return self, GridTransform(False, list(range(size)), list(range(size)))
+
+        return type(self)(transform.apply(self.initial_grid)), transform
+
+    def restore_state(self, transform, state):
+        """Maps a state of the canonical puzzle back to this puzzle"""
+        return type(self)(transform.invert(state.grid)).state
+
+    def new_state(self):
+        """An empty state, without the givens"""
+        candidate_counts = None
+        if self.count_candidates:
+            size = len(self.values)
+            candidate_counts = bytearray([size]) * (3 * size**2)
+
+        return SudokuPuzzleState(
             grid=[[None] * self.grid_utils.cols for _ in range(self.grid_utils.rows)],
-            found_by_row={
-                (row, value): 0
-                for row in range(self.grid_utils.rows)
-                for value in self.iter_values()
-            },
-            found_by_col={
-                (col, value): 0
-                for col in range(self.grid_utils.rows)
-                for value in self.iter_values()
-            },
-            found_by_square={
-                (square_r, square_c, value): 0
-                for square_r in range(self.rows_square_count)
-                for square_c in range(self.cols_square_count)
-                for value in self.iter_values()
-            },
+            found_by_row=[0] * self.grid_utils.rows,
+            found_by_col=[0] * self.grid_utils.cols,
+            found_by_square=[0] * (self.rows_square_count * self.cols_square_count),
+            candidate_counts=candidate_counts,
         )
 
+    def initialize_state(self):
+        self.state = self.new_state()
         for r, c in self.grid_utils.iter_grid():
             value = self.initial_grid[r][c]
             if value is not None:
                 self.set_value((r, c), value)
 
     def iter_values(self):
-        yield from SUDOKU_VALUES[: self.grid_utils.rows]
+        yield from self.values
 
     def iter_locations(self):
         yield from self.grid_utils.iter_grid()
 
-    def can_set(self, location, value):
+    def get_valid_mask(self, location):
+        """The bitmask of the values which can be set in a cell"""
         r, c = location
-        square_r, square_c = self.get_square_coords(r, c)
-
-        return (
-            self.state.found_by_col[c, value] == 0
-            and self.state.found_by_row[r, value] == 0
-            and self.state.found_by_square[square_r, square_c, value] == 0
+        row, col, square = self.cell_groups[r][c]
+        state = self.state
+        return self.all_values_mask & ~(
+            state.found_by_row[row]
+            | state.found_by_col[col]
+            | state.found_by_square[square]
         )
 
+    def count_valid_values(self, location):
+        return self.get_valid_mask(location).bit_count()
+
+    def get_valid_values(self, location):
+        mask = self.get_valid_mask(location)
+        res = []
+        while mask:
+            bit = mask & -mask
+            res.append(self.values[bit.bit_length() - 1])
+            mask ^= bit
+
+        return res
+
+    def can_set(self, location, value):
+        return self.get_valid_mask(location) & self.value_bits[value] != 0
+
     def get_value(self, location):
         r, c = location
         return self.state.grid[r][c]
 
-    def _update_value(self, location, value, delta):
+    def _update_counts(self, location, mask, delta):
+        """Adds delta to the counts of the values of mask in the groups of
+        a cell"""
         r, c = location
-        square_r, square_c = self.get_square_coords(r, c)
-
-        self.state.found_by_col[c, value] += delta
-        self.state.found_by_row[r, value] += delta
-        self.state.found_by_square[square_r, square_c, value] += delta
+        counts = self.state.candidate_counts
+        offsets = self.count_offsets[r][c]
+        while mask:
+            bit = mask & -mask
+            index = bit.bit_length() - 1
+            for offset in offsets:
+                counts[offset + index] += delta
+            mask ^= bit
+
+    def _update_peer_counts(self, location, bit, delta):
+        """Updates the counts of the unset peers of a cell which a value
+        fits in, after it was set or before it is unset"""
+        grid = self.state.grid
+        for peer in self.location_groups.peers[location]:
+            if grid[peer[0]][peer[1]] is None and self.get_valid_mask(peer) & bit:
+                self._update_counts(peer, bit, delta)
 
     def set_value(self, location, value):
         r, c = location
         assert self.state.grid[r][c] is None
+        bit = self.value_bits[value]
+        if self.count_candidates:
+            # the cell leaves its groups, the value the cells of the peers
+            self._update_counts(location, self.get_valid_mask(location), -1)
+            self._update_peer_counts(location, bit, -1)
         self.state.grid[r][c] = value
-        self._update_value(location, value, 1)
+        row, col, square = self.cell_groups[r][c]
+        self.state.found_by_row[row] |= bit
+        self.state.found_by_col[col] |= bit
+        self.state.found_by_square[square] |= bit
 
     def unset_value(self, location):
         r, c = location
         value = self.state.grid[r][c]
         assert value is not None
         self.state.grid[r][c] = None
-        self._update_value(location, value, -1)
+        row, col, square = self.cell_groups[r][c]
+        bit = self.value_bits[value]
+        self.state.found_by_row[row] &= ~bit
+        self.state.found_by_col[col] &= ~bit
+        self.state.found_by_square[square] &= ~bit
+        if self.count_candidates:
+            self._update_counts(location, self.get_valid_mask(location), 1)
+            self._update_peer_counts(location, bit, 1)
+
+    def scan_hidden_singles(self, groups):
+        """Same as find_hidden_singles for any groups holding every value,
+        scanning the valid masks of their unset cells: the values seen once
+        and those seen twice are accumulated as bitmasks"""
+        grid = self.state.grid
+        to_update = {}
+        for group in groups:
+            found = once = twice = 0
+            masks = []
+            for r, c in group:
+                value = grid[r][c]
+                if value is not None:
+                    found |= self.value_bits[value]
+                    continue
+
+                mask = self.get_valid_mask((r, c))
+                masks.append(((r, c), mask))
+                twice |= once & mask
+                once |= mask
+
+            if once | found != self.all_values_mask:
+                return None
+
+            singles = once & ~twice
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                location = next(x for x, mask in masks if mask & bit)
+                value = self.values[bit.bit_length() - 1]
+                if to_update.setdefault(location, value) != value:
+                    return None
+
+        return to_update
+
+    def find_hidden_singles(self):
+        """Map from location to value of the values fitting in a single
+        cell of a group, None if a value fits nowhere in a group missing it
+        or two values need the same cell. Only for puzzles counting the
+        candidates."""
+        state = self.state
+        counts = state.candidate_counts
+        size = len(self.values)
+        found = state.found_by_row + state.found_by_col + state.found_by_square
+
+        # a value found in a group fits nowhere else in it, any other zero
+        # is a contradiction
+        if counts.count(0) > sum(x.bit_count() for x in found):
+            return None
+
+        to_update = {}
+        i = counts.find(1)
+        while i != -1:
+            group, index = divmod(i, size)
+            bit = 1 << index
+            for location in self.groups[group]:
+                if self.get_value(location) is None and (
+                    self.get_valid_mask(location) & bit
+                ):
+                    break
+
+            value = self.values[index]
+            if to_update.setdefault(location, value) != value:
+                return None
+            i = counts.find(1, i + 1)
+
+        return to_update
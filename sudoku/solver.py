@@ -1,26 +1,58 @@
 from itertools import product
 from logic_puzzles.solver import SimpleBranchingSolver
 from logic_puzzles.sudoku_like import SudokuLike
+from .counting import get_band_classes
+
+class SudokuSolver(SudokuLike, SimpleBranchingSolver):
+    local_constraints = True
+    supports_exact_cover = True
+    exact_cover: bool
+    # whether counting the solutions of grids with fewer givens than their
+    # size fills a band first and counts each class of equivalent grids
+    # once, see sudoku/counting.py
+    count_symmetries = True
+    # the band of a 9x9 grid has millions of completions, each canonicalized,
+    # which costs more than counting the grid directly
+    count_symmetries_max_size = 6
+
+    def __init__(self, puzzle, *args, exact_cover=False, **kwargs):
+        super().__init__(puzzle, *args, **kwargs)
+        self.exact_cover = exact_cover
 
-class SudokuSolver(SimpleBranchingSolver, SudokuLike):
     def get_branching_score(self, location):
-        return -len(self.puzzle.get_valid_values(location))
+        return -self.puzzle.count_valid_values(location)
 
-    def get_constrained_locations(self):
-        res = []
-        res.extend(  # rows
-            [(r, c) for c in range(self.puzzle.grid_utils.cols)]
-            for r in range(self.puzzle.grid_utils.rows)
-        )
-        res.extend(  # cols
-            [(r, c) for r in range(self.puzzle.grid_utils.rows)]
-            for c in range(self.puzzle.grid_utils.cols)
-        )
-        res.extend(  # squares
-            list(self.puzzle.iter_square(square_r, square_c))
-            for square_r in range(self.puzzle.rows_square_count)
-            for square_c in range(self.puzzle.cols_square_count)
-        )
+    def find_hidden_singles(self):
+        if not self.puzzle.count_candidates:
+            return self.puzzle.scan_hidden_singles(self.get_constrained_locations())
+
+        # the puzzle keeps the candidate counts of its groups up to date
+        return self.puzzle.find_hidden_singles()
+
+    def _solve(self):
+        if self.exact_cover:
+            return self._solve_exact_cover()
+
+        return super()._solve()
+
+    def _count(self):
+        size = self.puzzle.rows_square_size * self.puzzle.cols_square_size
+        givens = sum(x is not None for row in self.puzzle.initial_grid for x in row)
+        if (
+            not self.count_symmetries
+            or size > self.count_symmetries_max_size
+            or givens >= size
+        ):
+            return super()._count()
+
+        puzzle = self.puzzle
+        res = 0
+        try:
+            for canonical, completions in get_band_classes(puzzle, self.check_timeout):
+                self.puzzle = canonical
+                res += completions * super()._count()
+        finally:
+            self.puzzle = puzzle
 
         return res
 
@@ -29,22 +61,16 @@ class SudokuSolver(SimpleBranchingSolver, SudokuLike):
         if res is not None:
             return res
 
+        res = self._solve_eliminations()
+        if res is not None:
+            return res
+
         return super()._branching_solve()
 
     def _compute_dirty(self, location):
-        dirty = set()
-        r, c = location
-        square_r, square_c = self.puzzle.get_square_coords(r, c)
-        for new_r in range(self.puzzle.grid_utils.rows):
-            if not self.is_location_set((new_r, c)):
-                dirty.add((new_r, c))
-
-        for new_c in range(self.puzzle.grid_utils.rows):
-            if not self.is_location_set((r, new_c)):
-                dirty.add((r, new_c))
-
-        for new_r, new_c in self.puzzle.iter_square(square_r, square_c):
-            if not self.is_location_set((new_r, new_c)):
-                dirty.add((new_r, new_c))
-
-        return dirty
+        grid = self.puzzle.state.grid
+        return set(
+            (r, c)
+            for r, c in self.puzzle.location_groups.peers[location]
+            if grid[r][c] is None
+        )
@@ -0,0 +1,317 @@
+import re
+from kakuro.puzzle import ALL_POSSIBLE_SUMS
+
+# (sum, count) -> bitmask of each combination of distinct digits, bit d - 1
+# for the digit d
+SUM_MASKS = {
+    key: [sum(1 << (x - 1) for x in combination) for combination in combinations]
+    for key, combinations in ALL_POSSIBLE_SUMS.items()
+}
+
+KNIGHT_MOVES = [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)]
+
+
+def parse_cell(token):
+    """A cell in the rXcY notation, 1-based, as a 0-based location"""
+    match = re.fullmatch(r"r(\d+)c(\d+)", token)
+    if match is None:
+        raise ValueError(f"Expected a cell as rXcY, got {token!r}")
+
+    return int(match[1]) - 1, int(match[2]) - 1
+
+
+def format_cell(location):
+    r, c = location
+    return f"r{r + 1}c{c + 1}"
+
+
+class VariantConstraint:
+    """A rule added on top of the groups of a Sudoku. The values are
+    numbered from 1 in their order, e.g. for killer sums and thermometers,
+    and handled as the bitmasks of SudokuPuzzle. A constraint restricts the
+    values of its cells through get_mask, which sees the state of the puzzle
+    and the data of the constraint, a small mutable list kept in the puzzle
+    state and updated as the values of its cells are set and unset."""
+
+    name: str
+    cells: list[tuple[int, int]]
+    # whether the cells must hold every value, e.g. a diagonal, in which
+    # case the solver treats it as one more group
+    is_group: bool = False
+    # whether get_mask only depends on the location, dancing links can then
+    # solve the puzzle from the valid values of the unset cells
+    is_static: bool = False
+
+    size: int
+    all_values_mask: int
+    value_index: dict[str, int]
+
+    def bind(self, values):
+        """Called once by the puzzle with its values, to precompute what
+        depends on them"""
+        self.size = len(values)
+        self.all_values_mask = (1 << self.size) - 1
+        self.value_index = {value: i for i, value in enumerate(values)}
+        for r, c in self.cells:
+            if not (0 <= r < self.size and 0 <= c < self.size):
+                raise ValueError(
+                    f"{self.name} cell {format_cell((r, c))} is off the grid"
+                )
+
+    def new_data(self):
+        return None
+
+    def get_mask(self, grid, data, location):
+        raise NotImplementedError
+
+    def update(self, data, location, index, delta):
+        """The value with the given index was set (delta 1) or unset (-1)"""
+        pass
+
+    def get_dirty(self, location):
+        """The cells whose masks may change with the value of a location"""
+        return self.cells
+
+    def get_indices(self, grid, cells):
+        return [
+            self.value_index[grid[r][c]] if grid[r][c] is not None else None
+            for r, c in cells
+        ]
+
+    def check(self, grid):
+        """Whether a complete grid satisfies the constraint"""
+        raise NotImplementedError
+
+    def to_string(self):
+        return " ".join([self.name] + [format_cell(x) for x in self.cells])
+
+
+class GroupConstraint(VariantConstraint):
+    """Cells holding every value once, besides the rows, columns and squares,
+    e.g. the diagonals"""
+
+    name = "group"
+    is_group = True
+
+    def __init__(self, cells):
+        self.cells = cells
+
+    def bind(self, values):
+        super().bind(values)
+        if len(self.cells) != self.size or len(set(self.cells)) != self.size:
+            raise ValueError(f"A group needs {self.size} distinct cells")
+
+    def new_data(self):
+        return [0]  # bitmask of the values found
+
+    def get_mask(self, grid, data, location):
+        return self.all_values_mask & ~data[0]
+
+    def update(self, data, location, index, delta):
+        if delta > 0:
+            data[0] |= 1 << index
+        else:
+            data[0] &= ~(1 << index)
+
+    def check(self, grid):
+        return len(set(self.get_indices(grid, self.cells))) == len(self.cells)
+
+
+class KillerCage(VariantConstraint):
+    """Cells with distinct values adding up to total, the values a cell can
+    take come from the combinations of Kakuro's ALL_POSSIBLE_SUMS which fit
+    the rest of the cage, they are cached by the residual sum, the number of
+    unset cells and the values already used"""
+
+    name = "killer"
+
+    total: int
+    sum_masks: dict[tuple[int, int], list[int]]
+    masks: dict[tuple[int, int, int], int]  # residual state -> valid values
+
+    def __init__(self, total, cells):
+        self.total = total
+        self.cells = cells
+        self.masks = {}
+
+    def bind(self, values):
+        super().bind(values)
+        if self.size > 9:
+            raise ValueError("Killer cages are supported for values up to 9")
+
+        self.sum_masks = {
+            key: [x for x in masks if x & ~self.all_values_mask == 0]
+            for key, masks in SUM_MASKS.items()
+        }
+        if not self.sum_masks.get((self.total, len(self.cells))):
+            raise ValueError(
+                f"No {len(self.cells)} distinct values add up to {self.total}"
+            )
+
+    def new_data(self):
+        return [0, 0, 0]  # sum, bitmask of the values used, cells set
+
+    def get_mask(self, grid, data, location):
+        key = (self.total - data[0], len(self.cells) - data[2], data[1])
+        res = self.masks.get(key)
+        if res is None:
+            res = 0
+            for combination in self.sum_masks.get(key[:2], ()):
+                if combination & key[2] == 0:
+                    res |= combination
+            self.masks[key] = res
+
+        return res
+
+    def update(self, data, location, index, delta):
+        data[0] += (index + 1) * delta
+        if delta > 0:
+            data[1] |= 1 << index
+        else:
+            data[1] &= ~(1 << index)
+        data[2] += delta
+
+    def check(self, grid):
+        indices = self.get_indices(grid, self.cells)
+        return (
+            len(set(indices)) == len(indices)
+            and sum(indices) + len(indices) == self.total
+        )
+
+    def to_string(self):
+        return " ".join(
+            [self.name, str(self.total)] + [format_cell(x) for x in self.cells]
+        )
+
+
+class Thermometer(VariantConstraint):
+    """Values strictly increasing from the bulb, the first cell. Each set
+    cell bounds the others by its distance from them."""
+
+    name = "thermo"
+
+    def __init__(self, cells):
+        self.cells = cells
+        self.positions = {x: i for i, x in enumerate(cells)}
+
+    def get_mask(self, grid, data, location):
+        i = self.positions[location]
+        low, high = i, self.size - len(self.cells) + i
+        for j, (r, c) in enumerate(self.cells):
+            value = grid[r][c]
+            if value is None or j == i:
+                continue
+
+            index = self.value_index[value]
+            if j < i:
+                low = max(low, index + i - j)
+            else:
+                high = min(high, index - j + i)
+
+        if low > high:
+            return 0
+
+        return (1 << (high + 1)) - (1 << low)
+
+    def check(self, grid):
+        indices = self.get_indices(grid, self.cells)
+        return all(x < y for x, y in zip(indices, indices[1:]))
+
+
+class AntiKnight(VariantConstraint):
+    """Cells a knight's move apart hold different values"""
+
+    name = "anti_knight"
+
+    neighbours: dict[tuple[int, int], list[tuple[int, int]]]
+
+    def __init__(self):
+        self.cells = []
+
+    def bind(self, values):
+        super().bind(values)
+        self.cells = [(r, c) for r in range(self.size) for c in range(self.size)]
+        self.neighbours = {
+            (r, c): [
+                (r + dr, c + dc)
+                for dr, dc in KNIGHT_MOVES
+                if 0 <= r + dr < self.size and 0 <= c + dc < self.size
+            ]
+            for r, c in self.cells
+        }
+
+    def get_mask(self, grid, data, location):
+        found = 0
+        for r, c in self.neighbours[location]:
+            value = grid[r][c]
+            if value is not None:
+                found |= 1 << self.value_index[value]
+
+        return self.all_values_mask & ~found
+
+    def get_dirty(self, location):
+        return self.neighbours[location]
+
+    def check(self, grid):
+        return all(
+            grid[r][c] != grid[new_r][new_c]
+            for r, c in self.cells
+            for new_r, new_c in self.neighbours[r, c]
+        )
+
+    def to_string(self):
+        return self.name
+
+
+class Parity(VariantConstraint):
+    """Cells holding even values, or odd ones"""
+
+    is_static = True
+
+    mask: int  # the values of the parity
+
+    def __init__(self, name, cells):
+        self.name = name
+        self.cells = cells
+
+    def bind(self, values):
+        super().bind(values)
+        # the value at index i is the number i + 1
+        remainder = 1 if self.name == "even" else 0
+        self.mask = sum(1 << i for i in range(self.size) if i % 2 == remainder)
+
+    def get_mask(self, grid, data, location):
+        return self.mask
+
+    def get_dirty(self, location):
+        return []
+
+    def check(self, grid):
+        return all(1 << x & self.mask for x in self.get_indices(grid, self.cells))
+
+
+def get_diagonals(size):
+    return [
+        GroupConstraint([(i, i) for i in range(size)]),
+        GroupConstraint([(i, size - 1 - i) for i in range(size)]),
+    ]
+
+
+def parse_constraints(line, size):
+    """The constraints of a line of a variant: its name followed by its
+    arguments, e.g. killer 15 r1c1 r1c2"""
+    name, *args = line.split()
+    if name == "diagonal" and not args:
+        return get_diagonals(size)
+    if name == "anti_knight" and not args:
+        return [AntiKnight()]
+    if name == "killer" and len(args) > 1:
+        return [KillerCage(int(args[0]), list(map(parse_cell, args[1:])))]
+    if name == "thermo" and len(args) > 1:
+        return [Thermometer(list(map(parse_cell, args)))]
+    if name == "group" and args:
+        return [GroupConstraint(list(map(parse_cell, args)))]
+    if name in ("even", "odd") and args:
+        return [Parity(name, list(map(parse_cell, args)))]
+
+    raise ValueError(f"Unexpected constraint {line!r}")
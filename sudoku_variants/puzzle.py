@@ -0,0 +1,153 @@
+from functools import cached_property
+from logic_puzzles.location_groups import LocationGroups
+from logic_puzzles.symmetry import GridTransform
+from sudoku.puzzle import SudokuPuzzle, SudokuPuzzleState, get_sudoku_values
+from .constraints import VariantConstraint, parse_constraints
+
+
+class SudokuVariantPuzzleState(SudokuPuzzleState):
+    __slots__ = ("constraint_data",)
+
+    constraint_data: list  # constraint index -> its data
+
+    def __init__(self, constraint_data, **kwargs):
+        super().__init__(**kwargs)
+        self.constraint_data = constraint_data
+
+
+class SudokuVariantPuzzle(SudokuPuzzle):
+    """A Sudoku with extra constraints, e.g. diagonals, killer cages,
+    thermometers, anti-knight, even and odd cells. The grid is followed by a
+    line per constraint, see sudoku_variants/constraints.py:
+
+    diagonal
+    anti_knight
+    killer 15 r1c1 r1c2 r2c1
+    thermo r1c1 r1c2 r1c3
+    even r5c5 r9c9
+    odd r1c9
+    group r1c1 r1c2 ...
+    """
+
+    state: SudokuVariantPuzzleState
+    constraints: list[VariantConstraint]
+    cell_constraints: list[list[list[int]]]  # r, c -> indices of its constraints
+    # whether the givens fit the rules and the constraints, the search only
+    # checks the values it sets itself
+    valid_givens: bool = True
+    count_candidates = False
+
+    @classmethod
+    def from_string(cls, string):
+        lines = [x.strip() for x in string.split("\n")]
+        lines = [x for x in lines if x and not x.startswith("#")]
+        size = len(lines[0].split())
+        initial_grid = [
+            [cell if cell != "." else None for cell in row.split()]
+            for row in lines[:size]
+        ]
+        constraints = [
+            x for line in lines[size:] for x in parse_constraints(line, size)
+        ]
+
+        return cls(initial_grid, constraints)
+
+    def to_string(self):
+        return "\n".join(
+            [super().to_string()] + [x.to_string() for x in self.constraints]
+        )
+
+    def __init__(self, initial_grid, constraints, state=None):
+        # bound before the state is initialized, as the givens are set
+        givens = {x for row in initial_grid for x in row if x is not None}
+        values = get_sudoku_values(len(initial_grid), givens)
+        self.constraints = constraints
+        self.cell_constraints = [[[] for _ in row] for row in initial_grid]
+        for i, constraint in enumerate(constraints):
+            constraint.bind(values)
+            for r, c in constraint.cells:
+                self.cell_constraints[r][c].append(i)
+
+        super().__init__(initial_grid, state)
+
+    @cached_property
+    def location_groups(self):
+        """The rows, columns and squares, then the group constraints"""
+        return LocationGroups(
+            self.groups + [x.cells for x in self.constraints if x.is_group]
+        )
+
+    def validate(self, state):
+        return super().validate(state) and all(
+            x.check(state.grid) for x in self.constraints
+        )
+
+    def validate_batch(self, states):
+        return [
+            valid and all(x.check(state.grid) for x in self.constraints)
+            for valid, state in zip(super().validate_batch(states), states)
+        ]
+
+    def canonicalize(self):
+        """The constraints break the symmetries of Sudoku, a variant is only
+        equivalent to itself"""
+        size = self.grid_utils.rows
+        return self, GridTransform(False, list(range(size)), list(range(size)))
+
+    def restore_state(self, transform, state):
+        return state
+
+    def new_state(self):
+        state = super().new_state()
+        return SudokuVariantPuzzleState(
+            constraint_data=[x.new_data() for x in self.constraints],
+            grid=state.grid,
+            found_by_row=state.found_by_row,
+            found_by_col=state.found_by_col,
+            found_by_square=state.found_by_square,
+            candidate_counts=state.candidate_counts,
+        )
+
+    def initialize_state(self):
+        self.state = self.new_state()
+        self.valid_givens = True
+        for r, c in self.grid_utils.iter_grid():
+            value = self.initial_grid[r][c]
+            if value is None:
+                continue
+
+            # checked against the givens set so far, the last given of each
+            # constraint sees all of the others
+            if not self.get_valid_mask((r, c)) & self.value_bits[value]:
+                self.valid_givens = False
+            self.set_value((r, c), value)
+
+    def get_valid_mask(self, location):
+        mask = super().get_valid_mask(location)
+        r, c = location
+        state = self.state
+        for i in self.cell_constraints[r][c]:
+            if not mask:
+                break
+            mask &= self.constraints[i].get_mask(
+                state.grid, state.constraint_data[i], location
+            )
+
+        return mask
+
+    def _update_constraints(self, location, value, delta):
+        r, c = location
+        index = self.value_bits[value].bit_length() - 1
+        for i in self.cell_constraints[r][c]:
+            self.constraints[i].update(
+                self.state.constraint_data[i], location, index, delta
+            )
+
+    def set_value(self, location, value):
+        super().set_value(location, value)
+        self._update_constraints(location, value, 1)
+
+    def unset_value(self, location):
+        value = self.get_value(location)
+        super().unset_value(location)
+        self._update_constraints(location, value, -1)
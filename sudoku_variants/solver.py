@@ -0,0 +1,39 @@
+from sudoku.solver import SudokuSolver
+
+
+class SudokuVariantSolver(SudokuSolver):
+    # the constraints break the symmetries of Sudoku
+    count_symmetries = False
+
+    def __init__(self, puzzle, *args, exact_cover=False, **kwargs):
+        if exact_cover and not all(
+            x.is_group or x.is_static for x in puzzle.constraints
+        ):
+            raise ValueError(
+                "Dancing links only handle the variants adding groups or "
+                "restricting cells to fixed values"
+            )
+
+        super().__init__(puzzle, *args, exact_cover=exact_cover, **kwargs)
+
+    def _solve(self):
+        if not self.puzzle.valid_givens:
+            return 0
+
+        return super()._solve()
+
+    def _count(self):
+        if not self.puzzle.valid_givens:
+            return 0
+
+        return super()._count()
+
+    def _compute_dirty(self, location):
+        dirty = super()._compute_dirty(location)
+        r, c = location
+        for i in self.puzzle.cell_constraints[r][c]:
+            for new_location in self.puzzle.constraints[i].get_dirty(location):
+                if not self.is_location_set(new_location):
+                    dirty.add(new_location)
+
+        return dirty
@@ -2,6 +2,8 @@ from logic_puzzles.puzzle import Puzzle, PuzzleState
 
 
 class TemplatePuzzleState(PuzzleState):
+    __slots__ = ()
+
     def __init__(self):
         pass
 
@@ -22,6 +24,9 @@ class TemplatePuzzle(Puzzle):
     def initialize_state(self):
         pass
 
+    def validate(self, state):
+        pass
+
     def iter_values(self):
         pass
 
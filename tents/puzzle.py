@@ -1,9 +1,18 @@
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils, ORTHOGONAL_DIRECTIONS, ARROWS
-from functools import cache
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    encode_grids,
+    batch_is_complete,
+    batch_neighbour_counts,
+)
+from functools import cache, cached_property
 
 
 class TentsPuzzleState(PuzzleState):
+    __slots__ = ("grid", "found_by_row", "found_by_col", "found_by_tree")
+
     grid: list[list[tuple[int, int]]]
     found_by_row: tuple[list[int], list[int]]
     found_by_col: tuple[list[int], list[int]]
@@ -65,6 +74,16 @@ class TentsPuzzle(Puzzle):
         for r, c in self.trees:
             self.set_value((r, c), (None, None))
 
+    def encode_solution(self, state):
+        arrow_map = {v: k for k, v in ARROWS.items()}
+
+        def encode_cell(cell):
+            if cell is None:
+                return None
+            return "/" if cell[0] is None else arrow_map[cell]
+
+        return [[encode_cell(cell) for cell in row] for row in state.grid]
+
     def __str__(self):
         arrow_map = {v: k for k, v in ARROWS.items()}
 
@@ -87,6 +106,85 @@ class TentsPuzzle(Puzzle):
         r, c = self.trees[tree_id]
         return len(list(self.grid_utils.orthogonal_iter(r, c, 1)))
 
+    @cached_property
+    def tree_tent_spots(self):
+        """(tree_id, r, c, direction) for each cell that could hold the tent of
+        a tree, pointing at it in the direction"""
+        return [
+            (tree_id, tree_r - dr, tree_c - dc, (dr, dc))
+            for tree_id, (tree_r, tree_c) in enumerate(self.trees)
+            for dr, dc in ORTHOGONAL_DIRECTIONS
+            if self.grid_utils.in_range(tree_r - dr, tree_c - dc)
+        ]
+
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, set(self.iter_values())):
+            return False
+        if any(grid[r][c] != (None, None) for r, c in self.trees):
+            return False
+
+        tents = [
+            (r, c) for r, c in self.grid_utils.iter_grid() if grid[r][c][0] is not None
+        ]
+        if any(
+            sum(r == row for r, _ in tents) != target
+            for row, target in enumerate(self.row_counts)
+        ) or any(
+            sum(c == col for _, c in tents) != target
+            for col, target in enumerate(self.col_counts)
+        ):
+            return False
+
+        # tents do not touch, not even diagonally
+        tent_cells = set(tents)
+        if any(
+            (new_r, new_c) in tent_cells
+            for r, c in tents
+            for new_r, new_c in self.grid_utils.all_directions_iter(r, c, 1)
+        ):
+            return False
+
+        # each tree has its own tent, since there are as many tents as trees
+        # every tent points at a tree
+        tents_by_tree = [0] * len(self.trees)
+        for tree_id, r, c, direction in self.tree_tent_spots:
+            tents_by_tree[tree_id] += grid[r][c] == direction
+
+        return len(tents) == len(self.trees) and all(x == 1 for x in tents_by_tree)
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        values = list(self.iter_values())
+        codes = encode_grids([state.grid for state in states], values)
+        empty = values.index((None, None))
+        tents = (codes >= 0) & (codes != empty)
+        res = (
+            batch_is_complete(codes)
+            & (tents.sum(axis=2) == self.row_counts).all(axis=1)
+            & (tents.sum(axis=1) == self.col_counts).all(axis=1)
+            & ~(tents & (batch_neighbour_counts(tents) > 0)).any(axis=(1, 2))
+            & (tents.sum(axis=(1, 2)) == len(self.trees))
+        )
+
+        if self.trees:
+            tree_r, tree_c = np.array(self.trees).T
+            res &= (codes[:, tree_r, tree_c] == empty).all(axis=1)
+
+            tree_ids, r, c, directions = zip(*self.tree_tent_spots)
+            direction_codes = np.array([values.index(x) for x in directions])
+            spots = codes[:, np.array(r), np.array(c)] == direction_codes
+            tents_by_tree = (
+                spots.astype(np.int16)
+                @ np.eye(len(self.trees), dtype=np.int16)[np.array(tree_ids)]
+            )
+            res &= (tents_by_tree == 1).all(axis=1)
+
+        return res.tolist()
+
     def iter_locations(self):
         yield from self.grid_utils.iter_grid()
 
@@ -3,6 +3,8 @@ from logic_puzzles.solver import SimpleBranchingSolver
 
 
 class TentsSolver(SimpleBranchingSolver):
+    empty_value = (None, None)
+
     def _compute_dirty(self, location):
         dirty = set()
 
@@ -1,8 +1,16 @@
 from logic_puzzles.puzzle import Puzzle, PuzzleState
 from logic_puzzles.grid_utils import GridUtils, ARROWS, ORTHOGONAL_DIRECTIONS, BENDS
+from logic_puzzles.validation import (
+    import_numpy,
+    is_complete,
+    encode_grids,
+    batch_is_complete,
+)
 
 
 class ThermometersPuzzleState(PuzzleState):
+    __slots__ = ("grid", "found_by_col", "found_by_row", "found_by_thermometer")
+
     grid: list[list[int | None]]
     found_by_col: tuple[list[int], list[int]]
     found_by_row: tuple[list[int], list[int]]
@@ -145,6 +153,45 @@ class ThermometersPuzzle(Puzzle):
 
         return min(res, min(i for i, x in enumerate(values) if x == 0) - 1)
 
+    def validate(self, state):
+        grid = state.grid
+        if not is_complete(grid, {0, 1}):
+            return False
+        if any(sum(row) != target for row, target in zip(grid, self.row_counts)):
+            return False
+        if any(sum(col) != target for col, target in zip(zip(*grid), self.col_counts)):
+            return False
+
+        # the thermometers are filled from the bulb without gaps
+        return all(
+            grid[r][c] >= grid[new_r][new_c]
+            for thermometer in self.thermometers
+            for (r, c), (new_r, new_c) in zip(thermometer, thermometer[1:])
+        )
+
+    def validate_batch(self, states):
+        np = import_numpy()
+        if np is None or len(states) == 0:
+            return super().validate_batch(states)
+
+        codes = encode_grids([state.grid for state in states], (0, 1))
+        res = (
+            batch_is_complete(codes)
+            & (codes.sum(axis=2) == self.row_counts).all(axis=1)
+            & (codes.sum(axis=1) == self.col_counts).all(axis=1)
+        )
+
+        cells = [cell for thermometer in self.thermometers for cell in thermometer[:-1]]
+        next_cells = [
+            cell for thermometer in self.thermometers for cell in thermometer[1:]
+        ]
+        if cells:
+            r, c = np.array(cells).T
+            new_r, new_c = np.array(next_cells).T
+            res &= (codes[:, r, c] >= codes[:, new_r, new_c]).all(axis=1)
+
+        return res.tolist()
+
     def iter_locations(self):
         yield from self.grid_utils.iter_grid()
 
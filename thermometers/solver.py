@@ -3,6 +3,8 @@ from logic_puzzles.solver import SimpleBranchingSolver
 
 
 class ThermometersSolver(SimpleBranchingSolver):
+    local_constraints = True
+
     def _compute_dirty(self, location):
         r, c = location
 